@@ -0,0 +1,45 @@
+"""denormalized rating stats on books
+
+Revision ID: 002_book_rating_stats
+Revises: 001_initial
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002_book_rating_stats"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "books",
+        sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "books",
+        sa.Column("review_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Backfill from existing reviews
+    op.execute(
+        """
+        UPDATE books SET
+            rating_sum = COALESCE(
+                (SELECT SUM(reviews.rating) FROM reviews WHERE reviews.book_id = books.id),
+                0
+            ),
+            review_count = (
+                SELECT COUNT(reviews.id) FROM reviews WHERE reviews.book_id = books.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("books", "review_count")
+    op.drop_column("books", "rating_sum")
@@ -0,0 +1,22 @@
+"""composite index for keyset pagination of the catalog
+
+Revision ID: 003_books_keyset_index
+Revises: 002_book_rating_stats
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "003_books_keyset_index"
+down_revision: Union[str, None] = "002_book_rating_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_books_created_at_id", "books", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_created_at_id", table_name="books")
@@ -0,0 +1,62 @@
+"""full-text search indexes for book title/author
+
+Revision ID: 004_books_full_text_search
+Revises: 003_books_keyset_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "004_books_full_text_search"
+down_revision: Union[str, None] = "003_books_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_books_search ON books "
+            "USING gin (to_tsvector('simple', title || ' ' || author))"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+            "title, author, content='books', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+            "INSERT INTO books_fts(rowid, title, author) "
+            "VALUES (new.id, new.title, new.author); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+            "INSERT INTO books_fts(books_fts, rowid, title, author) "
+            "VALUES ('delete', old.id, old.title, old.author); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author "
+            "ON books BEGIN "
+            "INSERT INTO books_fts(books_fts, rowid, title, author) "
+            "VALUES ('delete', old.id, old.title, old.author); "
+            "INSERT INTO books_fts(rowid, title, author) "
+            "VALUES (new.id, new.title, new.author); END"
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_books_search")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS books_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS books_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS books_fts_ai")
+        op.execute("DROP TABLE IF EXISTS books_fts")
@@ -0,0 +1,27 @@
+"""shared per-table versions for catalog ETags
+
+Revision ID: 005_table_versions
+Revises: 004_books_full_text_search
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005_table_versions"
+down_revision: Union[str, None] = "004_books_full_text_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
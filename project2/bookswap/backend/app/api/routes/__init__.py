@@ -3,11 +3,13 @@ API Routes — thin controllers that delegate to service layer.
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.core.dependencies import get_current_user
+from app.core.serialization import FastJSONResponse, render_json, respond
+from app.core.versions import ConditionalGet, not_modified
 from app.models import User, BookGenre, ExchangeStatus
 from app.services import (
     AuthService,
@@ -19,7 +21,10 @@ from app.services import (
     ChatService,
     FriendshipService,
 )
-from app.services.recommendations import RecommendationService
+from app.services.book_import import BookImportService
+from app.services.catalog_cache import catalog_cache, catalog_cache_key
+from app.services.collaborative import collaborative_recommender
+from app.services.recommendations import RecommendationService, parse_genres
 from app.schemas import (
     UserRegister,
     UserLogin,
@@ -31,6 +36,7 @@ from app.schemas import (
     BookUpdate,
     BookResponse,
     BookListResponse,
+    BookImportResult,
     ReviewCreate,
     ReviewUpdate,
     ReviewResponse,
@@ -116,38 +122,83 @@ async def get_user_reviews(user_id: int, db: AsyncSession = Depends(get_db)):
 
 books_router = APIRouter(prefix="/books", tags=["Books"])
 
+# Book responses embed rating stats and owner details
+catalog_etag = ConditionalGet("books", "reviews", "users")
+
 
 @books_router.get("", response_model=BookListResponse)
 async def list_books(
+    request: Request,
     q: Optional[str] = Query(None, description="Search by title or author"),
     genre: Optional[BookGenre] = None,
     available_only: bool = False,
     owner_id: Optional[int] = Query(None, description="Filter by owner ID"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination: next_cursor of the previous page, "
+        "or an empty value to start from the newest books",
+    ),
+    include_total: bool = Query(
+        True, description="Cursor mode only: include a cached total count"
+    ),
+    etag: dict = Depends(catalog_etag),
     db: AsyncSession = Depends(get_db),
 ):
-    service = BookService(db)
-    books, total = await service.search_books(
-        q, genre, available_only, owner_id, page, page_size
+    cacheable = catalog_cache_key(
+        cursor, q, genre, available_only, owner_id, page, page_size, include_total
     )
-    pages = (total + page_size - 1) // page_size
-    return {
-        "items": books,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": pages,
-    }
+    if cacheable is not None:
+        key, filters = cacheable
+        cached = catalog_cache.get(key)
+        if cached is not None:
+            # Served with the ETag it was stored under, which may be older
+            # than the current one if unrelated books changed since
+            return not_modified(request, cached.headers) or FastJSONResponse(
+                cached.body, headers=cached.headers
+            )
+        generation = catalog_cache.generation
+
+    service = BookService(db)
+    if cursor is not None:
+        books, next_cursor, total = await service.browse_books(
+            q, genre, available_only, owner_id, cursor, page_size, include_total
+        )
+        result = {
+            "items": books,
+            "total": total,
+            "page": None,
+            "page_size": page_size,
+            "pages": None,
+            "next_cursor": next_cursor,
+        }
+    else:
+        books, total = await service.search_books(
+            q, genre, available_only, owner_id, page, page_size
+        )
+        result = {
+            "items": books,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+        }
+
+    if cacheable is not None:
+        body = render_json(BookListResponse, result)
+        catalog_cache.set(key, body, etag, filters, books, generation)
+        return FastJSONResponse(body, headers=etag)
+    return respond(BookListResponse, result, headers=etag)
 
 
 @books_router.get("/{book_id}", response_model=BookResponse)
-async def get_book(book_id: int, db: AsyncSession = Depends(get_db)):
-    service = BookService(db)
-    book = await service.get_book(book_id)
-    book.average_rating = await service.book_repo.get_average_rating(book_id)
-    book.review_count = await service.book_repo.get_review_count(book_id)
-    return book
+async def get_book(
+    book_id: int,
+    etag: dict = Depends(catalog_etag),
+    db: AsyncSession = Depends(get_db),
+):
+    return await BookService(db).get_book(book_id)
 
 
 @books_router.post("", response_model=BookResponse, status_code=201)
@@ -159,6 +210,17 @@ async def create_book(
     return await BookService(db).create_book(data, current_user.id)
 
 
+@books_router.post("/import", response_model=BookImportResult)
+async def import_books(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await BookImportService(db).import_books(
+        request.stream(), request.headers.get("content-type"), current_user.id
+    )
+
+
 @books_router.patch("/{book_id}", response_model=BookResponse)
 async def update_book(
     book_id: int,
@@ -234,7 +296,8 @@ async def list_exchanges(
 ):
     from app.repositories import ExchangeRepository
 
-    return await ExchangeRepository(db).get_all_with_details(skip, limit)
+    exchanges = await ExchangeRepository(db).get_all_with_details(skip, limit)
+    return respond(list[ExchangeResponse], exchanges)
 
 
 @exchanges_router.get("/my", response_model=list[ExchangeResponse])
@@ -244,7 +307,8 @@ async def my_exchanges(
 ):
     from app.repositories import ExchangeRepository
 
-    return await ExchangeRepository(db).get_for_user(current_user.id)
+    exchanges = await ExchangeRepository(db).get_for_user(current_user.id)
+    return respond(list[ExchangeResponse], exchanges)
 
 
 @exchanges_router.get("/between", response_model=list[ExchangeResponse])
@@ -255,7 +319,8 @@ async def exchanges_between_users(
 ):
     from app.repositories import ExchangeRepository
 
-    return await ExchangeRepository(db).get_between_users(user1, user2)
+    exchanges = await ExchangeRepository(db).get_between_users(user1, user2)
+    return respond(list[ExchangeResponse], exchanges)
 
 
 @exchanges_router.post("", response_model=ExchangeResponse, status_code=201)
@@ -310,7 +375,8 @@ async def get_wishlist(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await WishlistService(db).get_wishlist(current_user.id)
+    items = await WishlistService(db).get_wishlist(current_user.id)
+    return respond(list[WishlistItemResponse], items)
 
 
 @wishlist_router.post(
@@ -344,7 +410,8 @@ async def get_messages(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await ChatService(db).get_messages(exchange_id, current_user.id)
+    messages = await ChatService(db).get_messages(exchange_id, current_user.id)
+    return respond(list[MessageResponse], messages)
 
 
 #  Friends
@@ -376,7 +443,8 @@ async def send_message(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await ChatService(db).send_message(exchange_id, current_user.id, data)
+    message = await ChatService(db).send_message(exchange_id, current_user.id, data)
+    return {**message, "sender": current_user}
 
 
 #  Recommendations
@@ -392,6 +460,13 @@ async def get_recommendations(
 ):
     genre_list = [g.strip() for g in genres.split(",")] if genres else []
 
+    # Books from our own catalog first, from the in-memory neighbour table
+    local = await collaborative_recommender.recommend_for_user(
+        db, current_user.id, count=3, genres=parse_genres(genre_list)
+    )
+    if local:
+        return local
+
     # Get user's reviewed books as context
     review_repo = ReviewRepository(db)
     user_reviews = await review_repo.get_by_user(current_user.id)
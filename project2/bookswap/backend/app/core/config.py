@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
+from typing import Dict
 
 
 class Settings(BaseSettings):
@@ -16,15 +17,82 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "postgresql+asyncpg://bookswap:bookswap@db:5432/bookswap"
+    # Rows per statement for BaseRepository bulk writes
+    bulk_chunk_size: int = 1000
 
     # Security
     secret_key: str = "change-me-in-production-super-secret-key"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_size: int = 4096
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+
+    # Catalog
+    catalog_count_cache_ttl_seconds: int = 30
+    search_backend: str = "auto"  # auto | fts | ilike
+    # Serialized /api/books pages (no text search, first pages), evicted by
+    # book/review/profile events; the TTL only covers missed events
+    catalog_cache_enabled: bool = True
+    catalog_cache_max_bytes: int = 32 * 1024 * 1024
+    catalog_cache_max_page: int = 5
+    catalog_cache_ttl_seconds: int = 300
+    # Streaming CSV/NDJSON import (POST /api/books/import)
+    book_import_batch_size: int = 500
+    book_import_max_errors: int = 100  # per-row errors listed in the response
+    book_import_max_record_bytes: int = 64 * 1024
 
     # AI
     gemini_api_key: str = ""
+    gemini_api_url: str = (
+        "https://generativelanguage.googleapis.com/v1beta/models"
+        "/gemini-2.0-flash:generateContent"
+    )
+    gemini_timeout_seconds: float = 15.0
+    gemini_max_concurrency: int = 8
+    gemini_max_connections: int = 16
+    recommendation_cache_ttl_seconds: int = 3600
+    recommendation_cache_size: int = 1024
+    recommendation_fallback_file: str = ""  # extra JSON pools, same format as app/data
+
+    # Local recommender
+    recommender_enabled: bool = True
+    recommender_top_k: int = 20
+    recommender_refresh_interval_seconds: int = 600
+
+    # Conditional GET: catalog responses may be stored but must be revalidated
+    catalog_cache_control: str = "public, no-cache"
+    # Re-read shared table versions, bounding staleness when a broadcast is lost
+    table_versions_sync_seconds: float = 5.0
+
+    # Encode list endpoints via pydantic TypeAdapters and everything else
+    # with orjson instead of jsonable_encoder + json.dumps
+    fast_json_responses: bool = False
+
+    # Metrics
+    metrics_enabled: bool = True
+    # Per-request SQL counters (Server-Timing) and the slow-query log
+    query_stats_enabled: bool = True
+    slow_query_ms: float = 200.0  # 0 disables the slow-query log
+
+    # Domain events
+    event_workers: int = 4
+    event_queue_size: int = 1000
+    event_queue_overflow: str = "drop"  # drop | block
+    event_observer_timeout_seconds: float = 5.0
+    event_drain_timeout_seconds: float = 10.0
+    event_history_size: int = 1000
+    # Per-type history capacity, e.g. {"message_sent": 5000}; others use the default
+    event_history_type_sizes: Dict[str, int] = {}
+
+    # WebSocket chat
+    ws_send_queue_size: int = 64
+    pubsub_backend: str = "memory"  # memory | postgres (needed for >1 worker)
+    message_batch_size: int = 100
+    message_flush_interval_ms: int = 50
 
     # CORS
     allowed_origins: str = (
@@ -0,0 +1,185 @@
+"""
+WebSocket rooms for exchange chats.
+Every connection gets a bounded send queue drained by its own writer task, so
+a broadcast only enqueues and never waits on a slow client; clients whose
+queue is full are disconnected instead of holding the room back.
+Broadcasts travel over a pub/sub bus, so with a cross-process bus they reach
+sockets held by every worker; a worker only subscribes to rooms it has local
+members in.
+"""
+
+import asyncio
+import functools
+import itertools
+import uuid
+from typing import Any, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.pubsub import InMemoryPubSub, PubSub
+
+# Close code for clients dropped because they cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """One accepted socket with its outgoing queue and writer task."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, client_id: str):
+        self.websocket = websocket
+        self.id = client_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.writer = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.websocket.send_json(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The peer is gone; the room drops us on the next broadcast
+            self.closed = True
+
+    def send(self, message: dict) -> bool:
+        """Enqueue without waiting; False if the client is closed or too slow."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def stop(self) -> None:
+        self.closed = True
+        self.writer.cancel()
+
+
+class ConnectionManager:
+    """Manages active WebSocket connections per exchange room."""
+
+    def __init__(
+        self, queue_size: Optional[int] = None, pubsub: Optional[PubSub] = None
+    ):
+        self.queue_size = queue_size or settings.ws_send_queue_size
+        self.pubsub = pubsub or InMemoryPubSub()
+        self.active: Dict[int, Set[WebSocket]] = {}
+        self._clients: Dict[WebSocket, ClientConnection] = {}
+        self._subscriptions: Dict[int, Callable[[dict], None]] = {}
+        self._background: Set[asyncio.Task] = set()
+        # Client ids must not collide across workers sharing the bus
+        self._instance = uuid.uuid4().hex[:8]
+        self._ids = itertools.count(1)
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_consumers_dropped = 0
+
+    @staticmethod
+    def channel(exchange_id: int) -> str:
+        return f"chat_exchange_{exchange_id}"
+
+    async def connect(self, websocket: WebSocket, exchange_id: int):
+        await websocket.accept()
+        client_id = f"{self._instance}:{next(self._ids)}"
+        self._clients[websocket] = ClientConnection(
+            websocket, self.queue_size, client_id
+        )
+        self.active.setdefault(exchange_id, set()).add(websocket)
+        if exchange_id not in self._subscriptions:
+            handler = functools.partial(self.deliver, exchange_id)
+            self._subscriptions[exchange_id] = handler
+            await self.pubsub.subscribe(self.channel(exchange_id), handler)
+
+    def disconnect(self, websocket: WebSocket, exchange_id: int):
+        room = self.active.get(exchange_id)
+        if room is not None:
+            room.discard(websocket)
+            if not room:
+                del self.active[exchange_id]
+                self._spawn(self._unsubscribe_if_empty(exchange_id))
+        client = self._clients.pop(websocket, None)
+        if client is not None:
+            client.stop()
+
+    async def _unsubscribe_if_empty(self, exchange_id: int) -> None:
+        # Someone may have joined again before this task ran
+        if exchange_id in self.active or exchange_id not in self._subscriptions:
+            return
+        handler = self._subscriptions.pop(exchange_id)
+        await self.pubsub.unsubscribe(self.channel(exchange_id), handler)
+
+    async def broadcast(
+        self, exchange_id: int, message: dict, exclude: Optional[WebSocket] = None
+    ):
+        excluded = self._clients.get(exclude) if exclude is not None else None
+        envelope = {"message": message, "exclude": excluded.id if excluded else None}
+        if not await self.pubsub.publish(self.channel(exchange_id), envelope):
+            # The bus is down: other workers miss this one, local members don't
+            self.deliver(exchange_id, envelope)
+
+    def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Enqueue a message for one local socket (e.g. an ack to its sender)."""
+        client = self._clients.get(websocket)
+        return client is not None and client.send(message)
+
+    def deliver(self, exchange_id: int, envelope: dict) -> None:
+        """Enqueue a published message for the local members of a room."""
+        message, exclude = envelope["message"], envelope.get("exclude")
+        for ws in list(self.active.get(exchange_id, ())):
+            client = self._clients[ws]
+            if client.id == exclude:
+                continue
+            if client.send(message):
+                self.messages_sent += 1
+            else:
+                self.messages_dropped += 1
+                self._drop(ws, exchange_id)
+
+    def _drop(self, websocket: WebSocket, exchange_id: int) -> None:
+        """Disconnect a client that is gone or cannot keep up with the room."""
+        client = self._clients.get(websocket)
+        if client is not None and not client.closed:
+            self.slow_consumers_dropped += 1
+            self._spawn(self._close(websocket))
+        self.disconnect(websocket, exchange_id)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def close_all(self) -> None:
+        """Stop every writer task; used on application shutdown."""
+        writers = [client.writer for client in self._clients.values()]
+        for client in self._clients.values():
+            client.stop()
+        self._clients.clear()
+        self.active.clear()
+        await asyncio.gather(*writers, *self._background, return_exceptions=True)
+        for exchange_id in list(self._subscriptions):
+            await self._unsubscribe_if_empty(exchange_id)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        sizes = [len(room) for room in self.active.values()]
+        return {
+            "rooms": len(sizes),
+            "connections": sum(sizes),
+            "max_room_size": max(sizes, default=0),
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "subscriptions": len(self._subscriptions),
+            "pubsub": self.pubsub.get_statistics(),
+        }
+
@@ -1,13 +1,91 @@
+import hashlib
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.db.session import get_db
 from app.core.security import decode_token
+from app.models import User
 from app.repositories import UserRepository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Verified access tokens: sha256(token) -> (user_id, exp)
+_token_cache = TTLCache(
+    maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
+# Column values of active users by id; rebuilt into each request's session
+_user_cache = TTLCache(
+    maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
+_USER_COLUMNS = [attr.key for attr in sa_inspect(User).column_attrs]
+# Bumped on every eviction; a lookup that raced one must not refill the cache
+_evictions = 0
+
+
+def _evict_user(user_id: int) -> None:
+    global _evictions
+    _evictions += 1
+    _user_cache.pop(user_id)
+
+
+def invalidate_cached_user(db: AsyncSession, user_id: int) -> None:
+    """
+    Drop a user from the auth cache once the current transaction of ``db``
+    commits. Flushed ``User`` changes (profile edits, deactivation) are
+    picked up automatically; call this for writes that bypass the unit of
+    work. Evicting earlier would let a concurrent request cache the old row
+    again before the change lands.
+    """
+    db.sync_session.info.setdefault("changed_users", set()).add(user_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_users(session: Session, flush_context, instances) -> None:
+    changed = {
+        user.id
+        for user in (*session.dirty, *session.deleted)
+        if isinstance(user, User) and user.id is not None and session.is_modified(user)
+    }
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session: Session) -> None:
+    for user_id in session.info.pop("changed_users", ()):
+        _evict_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("changed_users", None)
+
+
+def _resolve_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            return user_id
+        _token_cache.pop(key)
+        return None
+
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access" or not payload.get("sub"):
+        return None
+    user_id = int(payload["sub"])
+    _token_cache.set(key, (user_id, payload.get("exp")))
+    return user_id
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -18,16 +96,26 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
-    if not payload or payload.get("type") != "access":
+    user_id = _resolve_token(token)
+    if user_id is None:
         raise credentials_exception
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise credentials_exception
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        session = db.sync_session
+        user = session.identity_map.get(session.identity_key(User, user_id))
+        if user is None:
+            # Attach as a clean persistent instance without a SELECT
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            db.add(user)
+        return user
 
+    evictions = _evictions
     repo = UserRepository(db)
-    user = await repo.get(int(user_id))
+    user = await repo.get(user_id)
     if not user or not user.is_active:
         raise credentials_exception
+    if evictions == _evictions:
+        _user_cache.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
     return user
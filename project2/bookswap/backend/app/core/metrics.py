@@ -0,0 +1,292 @@
+"""
+Prometheus-style metrics.
+Histograms keep one shard of bucket counters per thread: a thread only ever
+writes its own shard, so observing a value takes no lock and threads never
+contend; shards are summed when ``/metrics`` is scraped. Component counters
+that already exist (``get_statistics()`` of the hasher, buffers, caches, ...)
+are exported through collectors evaluated at scrape time.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Shard:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram:
+    """Cumulative-bucket histogram with per-thread shards."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._shards: Dict[int, _Shard] = {}
+
+    def _shard(self) -> _Shard:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            # setdefault is atomic, so a racing first observation is harmless
+            shard = self._shards.setdefault(ident, _Shard(len(self.bounds) + 1))
+        return shard
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        shard.count += 1
+        shard.sum += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Merged (per-bucket counts incl. +Inf, count, sum) across shards."""
+        buckets = [0] * (len(self.bounds) + 1)
+        count, total = 0, 0.0
+        for shard in list(self._shards.values()):
+            for i, n in enumerate(shard.buckets):
+                buckets[i] += n
+            count += shard.count
+            total += shard.sum
+        return buckets, count, total
+
+
+class HistogramFamily:
+    """Histograms of one metric keyed by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...],
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            buckets, count, total = child.snapshot()
+            cumulative = 0
+            for bound, n in zip(child.bounds + (float("inf"),), buckets):
+                cumulative += n
+                le = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+        return lines
+
+
+def flatten_statistics(stats: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a nested ``get_statistics()`` dict, keys joined by _."""
+    flat: Dict[str, float] = {}
+    for key, value in stats.items():
+        name = f"{prefix}_{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten_statistics(value, name))
+        elif isinstance(value, bool):
+            flat[name] = int(value)
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+class MetricsRegistry:
+    """Holds histograms and scrape-time collectors; renders the text format."""
+
+    def __init__(self, namespace: str = "bookswap"):
+        self.namespace = namespace
+        self._histograms: Dict[str, HistogramFamily] = {}
+        # name -> (type, help, collect() -> samples)
+        self._collectors: Dict[str, Tuple[str, str, Callable[[], List[Sample]]]] = {}
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        name = f"{self.namespace}_{name}"
+        if name not in self._histograms:
+            self._histograms[name] = HistogramFamily(name, help, labelnames, buckets)
+        return self._histograms[name]
+
+    def register(
+        self, name: str, kind: str, help: str, collect: Callable[[], List[Sample]]
+    ) -> None:
+        """Add a collector whose samples are computed on every scrape."""
+        self._collectors[f"{self.namespace}_{name}"] = (kind, help, collect)
+
+    def register_statistics(
+        self, component: str, get_statistics: Callable[[], Dict[str, Any]]
+    ) -> None:
+        """Export every numeric field of ``get_statistics()`` as a gauge."""
+
+        def collect() -> List[Sample]:
+            return [
+                (f"_{key}", {}, value)
+                for key, value in flatten_statistics(get_statistics()).items()
+            ]
+
+        self.register(component, "gauge", f"{component} statistics", collect)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._histograms.values():
+            lines.extend(family.render())
+        for name, (kind, help, collect) in self._collectors.items():
+            try:
+                samples = collect()
+            except Exception as e:
+                print(f"Metrics collector {name} failed: {e!r}")
+                continue
+            # Each distinct suffix is its own metric; group samples by it
+            by_metric: Dict[str, List[Sample]] = {}
+            for suffix, labels, value in samples:
+                by_metric.setdefault(name + suffix, []).append((suffix, labels, value))
+            for metric, metric_samples in by_metric.items():
+                lines.append(f"# HELP {metric} {help}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for _, labels, value in metric_samples:
+                    lines.append(
+                        f"{metric}{_format_labels(labels)} {_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class PoolStatistics:
+    """Checkout counters for an engine's connection pool via pool events."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self._engine: Optional[AsyncEngine] = None
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        target = engine.sync_engine
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "connect", self._on_connect)
+
+    def _on_checkout(self, *args) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, *args) -> None:
+        self.checkins += 1
+
+    def _on_connect(self, *args) -> None:
+        self.connects += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = {
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+        }
+        pool = self._engine.pool if self._engine is not None else None
+        # QueuePool exposes live gauges; StaticPool/NullPool do not
+        for key in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, key, None)
+            if callable(method):
+                stats[key] = method()
+        return stats
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by method, route and status."""
+
+    def __init__(self, app, registry: "MetricsRegistry" = None):
+        self.app = app
+        registry = registry or metrics
+        self.latency = registry.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ("method", "route", "status"),
+        )
+        self.in_progress = 0
+        registry.register(
+            "http_requests_in_progress",
+            "gauge",
+            "HTTP requests currently being served",
+            lambda: [("", {}, self.in_progress)],
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_progress -= 1
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            self.latency.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+
+# Global registry and pool statistics
+metrics = MetricsRegistry()
+pool_statistics = PoolStatistics()
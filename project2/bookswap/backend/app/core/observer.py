@@ -5,17 +5,29 @@ all its dependents are notified and updated automatically.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import deque
+from itertools import islice
+from typing import Callable, List, Dict, Any, Optional, Set
 from enum import Enum
 import asyncio
 from datetime import datetime
 
+from sqlalchemy import event as orm_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
 
 class EventType(Enum):
     """Types of events that can be observed."""
 
     USER_REGISTERED = "user_registered"
+    USER_UPDATED = "user_updated"
     BOOK_CREATED = "book_created"
+    BOOK_UPDATED = "book_updated"
+    BOOK_DELETED = "book_deleted"
+    BOOKS_IMPORTED = "books_imported"
     BOOK_EXCHANGED = "book_exchanged"
     EXCHANGE_CREATED = "exchange_created"
     EXCHANGE_ACCEPTED = "exchange_accepted"
@@ -23,6 +35,8 @@ class EventType(Enum):
     MESSAGE_SENT = "message_sent"
     FRIEND_ADDED = "friend_added"
     REVIEW_CREATED = "review_created"
+    REVIEW_UPDATED = "review_updated"
+    REVIEW_DELETED = "review_deleted"
 
 
 class Event:
@@ -76,12 +90,36 @@ class EventManager(Subject):
     """
     Concrete implementation of Subject using Observer pattern.
     Manages event notifications to multiple observers.
+
+    By default ``notify`` awaits every observer inline. After ``start()`` it
+    only enqueues the event on a bounded queue and returns; a pool of worker
+    tasks runs the observers, each under a timeout, until ``stop()`` drains
+    the queue.
     """
 
-    def __init__(self):
+    def __init__(self, max_history: int = None):
         self._observers: List[Observer] = []
-        self._event_history: List[Event] = []
-        self._max_history = 1000
+        # Ring buffers: one across all types plus one per type, so appends
+        # and filtered lookups never copy or scan the whole history
+        self._max_history = max_history or settings.event_history_size
+        self._event_history: deque = deque(maxlen=self._max_history)
+        self._history_by_type: Dict[EventType, deque] = {}
+        self._type_capacity: Dict[EventType, int] = {
+            EventType(name): size
+            for name, size in settings.event_history_type_sizes.items()
+        }
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Inline-mode dispatches started by notify_nowait
+        self._background: Set[asyncio.Task] = set()
+        self.overflow_policy = "drop"
+        self.observer_timeout: Optional[float] = None
+        self._stats = {
+            "dispatched": 0,
+            "dropped": 0,
+            "observer_errors": 0,
+            "observer_timeouts": 0,
+        }
 
     def attach(self, observer: Observer) -> None:
         """Attach an observer."""
@@ -94,40 +132,161 @@ class EventManager(Subject):
             self._observers.remove(observer)
 
     async def notify(self, event: Event) -> None:
-        """Notify all observers about an event."""
-        # Add to history
-        self._event_history.append(event)
-
-        # Limit history size
-        if len(self._event_history) > self._max_history:
-            self._event_history = self._event_history[-self._max_history :]
+        """Notify all observers about an event (or queue it when started)."""
+        self._record(event)
+
+        if self._queue is None:
+            await self._dispatch(event)
+        elif self.overflow_policy == "block":
+            await self._queue.put(event)
+        else:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._stats["dropped"] += 1
+
+    def notify_nowait(self, event: Event) -> None:
+        """
+        Like ``notify`` but never waits, for callers that must not be held up
+        by observers: in queued mode a full queue drops the event whatever the
+        overflow policy; in inline mode the observers run in a background task.
+        """
+        self._record(event)
+
+        if self._queue is None:
+            task = asyncio.get_running_loop().create_task(self._dispatch(event))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
 
+    def _record(self, event: Event) -> None:
+        self._event_history.append(event)
+        history = self._history_by_type.get(event.event_type)
+        if history is None:
+            history = self._history_by_type[event.event_type] = deque(
+                maxlen=self._type_capacity.get(event.event_type, self._max_history)
+            )
+        history.append(event)
+
+    def set_history_capacity(self, event_type: EventType, maxlen: int) -> None:
+        """Change how many events of one type are kept (newest are retained)."""
+        self._type_capacity[event_type] = maxlen
+        history = self._history_by_type.get(event_type)
+        if history is not None:
+            self._history_by_type[event_type] = deque(history, maxlen=maxlen)
+
+    async def _dispatch(self, event: Event) -> None:
         # Notify all observers
         tasks = []
         for observer in self._observers:
             try:
-                task = asyncio.create_task(observer.update(event))
+                task = asyncio.create_task(self._run_observer(observer, event))
                 tasks.append(task)
             except Exception as e:
                 print(f"Error notifying observer: {e}")
 
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
+        self._stats["dispatched"] += 1
+
+    async def _run_observer(self, observer: Observer, event: Event) -> None:
+        try:
+            if self.observer_timeout:
+                await asyncio.wait_for(observer.update(event), self.observer_timeout)
+            else:
+                await observer.update(event)
+        except asyncio.TimeoutError:
+            self._stats["observer_timeouts"] += 1
+            print(
+                f"Observer {type(observer).__name__} timed out "
+                f"on {event.event_type.value}"
+            )
+        except Exception as e:
+            self._stats["observer_errors"] += 1
+            print(f"Error in observer {type(observer).__name__}: {e}")
+
+    async def _worker(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await self._dispatch(event)
+            finally:
+                self._queue.task_done()
+
+    async def start(
+        self,
+        workers: int = None,
+        queue_size: int = None,
+        observer_timeout: float = None,
+        overflow_policy: str = None,
+    ) -> None:
+        """Switch to queued dispatch with a pool of worker tasks."""
+        if self._queue is not None:
+            return
+        overflow_policy = overflow_policy or settings.event_queue_overflow
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.overflow_policy = overflow_policy
+        self.observer_timeout = (
+            observer_timeout or settings.event_observer_timeout_seconds
+        )
+        self._queue = asyncio.Queue(maxsize=queue_size or settings.event_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(workers or settings.event_workers)
+        ]
+
+    async def stop(self, timeout: float = None) -> None:
+        """Deliver queued events (up to ``timeout`` seconds), then stop workers."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self._queue.join(), timeout or settings.event_drain_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            print(f"Event queue drain timed out, {self._queue.qsize()} events left")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+        self.observer_timeout = None
+
+    def get_queue_statistics(self) -> Dict[str, Any]:
+        """Dispatch counters and the current queue depth."""
+        return {
+            **self._stats,
+            "mode": "queued" if self._queue is not None else "inline",
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self._queue.maxsize if self._queue is not None else 0,
+            "workers": len(self._workers),
+        }
 
     def get_event_history(
         self, event_type: EventType = None, limit: int = 100
     ) -> List[Event]:
-        """Get event history, optionally filtered by type."""
-        events = self._event_history
-
+        """Get event history (oldest first), optionally filtered by type."""
         if event_type:
-            events = [e for e in events if e.event_type == event_type]
+            events = self._history_by_type.get(event_type, ())
+        else:
+            events = self._event_history
 
-        return events[-limit:] if limit > 0 else events
+        if limit <= 0:
+            return list(events)
+        # Walk back from the newest entry: O(limit), no copy of the buffer
+        newest = list(islice(reversed(events), limit))
+        newest.reverse()
+        return newest
 
     def clear_history(self) -> None:
         """Clear event history."""
         self._event_history.clear()
+        self._history_by_type.clear()
 
 
 class LoggingObserver(Observer):
@@ -234,9 +393,54 @@ class EmailNotificationObserver(Observer):
 
 # Global event manager instance
 event_manager = EventManager()
+statistics_observer = StatisticsObserver()
 
 # Register default observers
 event_manager.attach(LoggingObserver())
-event_manager.attach(StatisticsObserver())
+event_manager.attach(statistics_observer)
 event_manager.attach(WebSocketObserver())
 event_manager.attach(EmailNotificationObserver())
+
+
+# Events whose observers must only see committed data (e.g. cache
+# invalidation) are held on the session until its transaction commits.
+_after_commit_tasks: set = set()
+# Called synchronously with each committed event before it is queued, for
+# work that must not be lost when the event queue drops (e.g. cache eviction)
+_commit_hooks: List[Callable[[Event], None]] = []
+
+
+def notify_after_commit(db: AsyncSession, event: Event) -> None:
+    """Emit ``event`` through ``event_manager`` once ``db`` commits."""
+    db.sync_session.info.setdefault("pending_events", []).append(event)
+
+
+def on_commit(hook: Callable[[Event], None]) -> None:
+    """Run ``hook`` inside the commit of every ``notify_after_commit`` event."""
+    _commit_hooks.append(hook)
+
+
+@orm_event.listens_for(Session, "after_commit")
+def _notify_pending_events(session: Session) -> None:
+    events = session.info.pop("pending_events", None)
+    if not events:
+        return
+    for pending in events:
+        for hook in _commit_hooks:
+            try:
+                hook(pending)
+            except Exception as e:
+                print(f"Error in commit hook {hook!r}: {e!r}")
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:  # committed outside the event loop
+        return
+    for pending in events:
+        task = loop.create_task(event_manager.notify(pending))
+        _after_commit_tasks.add(task)
+        task.add_done_callback(_after_commit_tasks.discard)
+
+
+@orm_event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop("pending_events", None)
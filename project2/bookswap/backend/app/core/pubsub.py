@@ -0,0 +1,170 @@
+"""
+Pub/sub bus used to fan chat messages out across uvicorn workers.
+Channels are strings, messages are JSON-serializable dicts and handlers are
+plain callables invoked on the event loop. The in-memory bus only reaches the
+current process; the PostgreSQL bus uses LISTEN/NOTIFY so every worker that
+listens on a channel receives every message published to it.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+Handler = Callable[[dict], None]
+
+
+class PubSub(ABC):
+    """Strategy interface for the broadcast bus."""
+
+    name: str = ""
+
+    def __init__(self):
+        self._handlers: Dict[str, Set[Handler]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.publish_errors = 0
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict) -> bool:
+        """
+        Deliver ``message`` to every subscriber of ``channel``. Returns False
+        (never raises) when the bus could not take the message, so callers
+        can fall back to local delivery.
+        """
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, set()).add(handler)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers is not None:
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[channel]
+
+    def _dispatch(self, channel: str, message: dict) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            self.delivered += 1
+            try:
+                handler(message)
+            except Exception as e:
+                print(f"Pub/sub handler error on {channel}: {e!r}")
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "channels": len(self._handlers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "publish_errors": self.publish_errors,
+        }
+
+
+class InMemoryPubSub(PubSub):
+    """Single-process bus: publish calls local handlers directly."""
+
+    name = "memory"
+
+    async def publish(self, channel, message):
+        self.published += 1
+        self._dispatch(channel, message)
+        return True
+
+
+class PostgresPubSub(PubSub):
+    """
+    LISTEN/NOTIFY bus over one dedicated asyncpg connection per worker.
+    ``connect`` returns an object with asyncpg's add_listener/remove_listener/
+    execute/close interface, so tests can substitute a local stand-in.
+    NOTIFY payloads are limited to 8000 bytes by PostgreSQL.
+    """
+
+    name = "postgres"
+
+    def __init__(self, connect: Callable[[], Awaitable[Any]]):
+        super().__init__()
+        self._connect = connect
+        self._connection = None
+        # asyncpg runs one operation at a time per connection ("another
+        # operation is in progress"), so every call on it is serialized
+        self._lock = asyncio.Lock()
+
+    async def _call(self, method: str, *args) -> Any:
+        async with self._lock:
+            if self._connection is None:
+                connection = await self._connect()
+                # Reconnecting after a failure: listen on every channel again
+                for channel in list(self._handlers):
+                    await connection.add_listener(channel, self._on_notify)
+                self._connection = connection
+            return await getattr(self._connection, method)(*args)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._dispatch(channel, json.loads(payload))
+
+    async def publish(self, channel, message):
+        try:
+            await self._call(
+                "execute",
+                "SELECT pg_notify($1, $2)",
+                channel,
+                json.dumps(message, default=str),
+            )
+        except Exception as e:
+            self.publish_errors += 1
+            print(f"Pub/sub publish error on {channel}: {e!r}")
+            await self._discard_if_closed()
+            return False
+        self.published += 1
+        return True
+
+    async def _discard_if_closed(self) -> None:
+        """Drop a dead connection so the next call reconnects."""
+        async with self._lock:
+            connection = self._connection
+            is_closed = getattr(connection, "is_closed", None)
+            if connection is not None and is_closed is not None and is_closed():
+                self._connection = None
+
+    async def subscribe(self, channel, handler):
+        first = channel not in self._handlers
+        await super().subscribe(channel, handler)
+        if first:
+            await self._call("add_listener", channel, self._on_notify)
+
+    async def unsubscribe(self, channel, handler):
+        await super().unsubscribe(channel, handler)
+        if channel not in self._handlers and self._connection is not None:
+            await self._call("remove_listener", channel, self._on_notify)
+
+    async def close(self):
+        await super().close()
+        async with self._lock:
+            if self._connection is not None:
+                await self._connection.close()
+                self._connection = None
+
+
+def _asyncpg_connect(database_url: str) -> Callable[[], Awaitable[Any]]:
+    async def connect():
+        import asyncpg
+
+        return await asyncpg.connect(database_url.replace("+asyncpg", ""))
+
+    return connect
+
+
+def create_pubsub(backend: Optional[str] = None) -> PubSub:
+    """Build the bus named by ``settings.pubsub_backend`` (memory | postgres)."""
+    backend = backend or settings.pubsub_backend
+    if backend == InMemoryPubSub.name:
+        return InMemoryPubSub()
+    if backend == PostgresPubSub.name:
+        return PostgresPubSub(_asyncpg_connect(settings.database_url))
+    raise ValueError(f"Unknown pub/sub backend: {backend}")
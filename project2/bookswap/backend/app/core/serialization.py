@@ -0,0 +1,71 @@
+"""
+Fast JSON path for large responses.
+FastAPI's default path validates the return value against ``response_model``,
+walks the result again with ``jsonable_encoder`` and encodes it with the
+stdlib ``json`` module. With ``settings.fast_json_responses`` on, list
+endpoints validate once through a cached pydantic ``TypeAdapter`` and let
+pydantic-core write the JSON bytes directly; everything else is encoded with
+orjson by ``FastJSONResponse``.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+import orjson
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter for ``schema`` (e.g. ``list[BookResponse]``), built once."""
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any) -> bytes:
+    """Validate ORM objects or dicts against ``schema`` and encode them."""
+    adapter = get_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def render_json(schema: Any, content: Any) -> bytes:
+    """
+    Encode ``content`` as ``schema`` into the bytes its route would send:
+    the fast path when it is enabled, FastAPI's default encoding otherwise.
+    For responses rendered once and replayed (e.g. cached catalog pages).
+    """
+    if settings.fast_json_responses:
+        return dump_json(schema, content)
+    adapter = get_adapter(schema)
+    value = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; pre-rendered bytes pass through."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def respond(
+    schema: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Any:
+    """
+    Return ``content`` serialized as ``schema`` through the fast path when
+    it is enabled; otherwise return it unchanged for FastAPI to serialize
+    via the route's ``response_model``.
+    """
+    if not settings.fast_json_responses:
+        return content
+    return FastJSONResponse(
+        dump_json(schema, content), status_code=status_code, headers=headers
+    )
+
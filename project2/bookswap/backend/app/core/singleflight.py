@@ -0,0 +1,45 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight call instead of
+each issuing a duplicate upstream request.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; other callers await its result."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.origin_calls = 0
+        self.coalesced_calls = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced_calls += 1
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(future)
+
+        self.origin_calls += 1
+        future = asyncio.ensure_future(fn())
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "origin_calls": self.origin_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,194 @@
+"""
+Per-table change versions and conditional GET.
+Services mark the tables a unit of work changes; the commit increments their
+rows in ``table_versions`` inside the same transaction, so every worker sees
+the same numbers and a version is never newer than the data it describes.
+Each worker mirrors the rows in memory: its own commits apply immediately,
+other workers' arrive over pub/sub, and a periodic re-read covers lost
+messages. Read endpoints derive a strong ETag from the mirrored versions of
+the tables they read, computed before any query runs, and answer a matching
+``If-None-Match`` with 304 without touching the database.
+"""
+
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import PubSub
+from app.models import TableVersion
+from app.repositories.base import upsert_insert
+
+VERSIONS_CHANNEL = "table_versions"
+
+
+class TableVersions:
+    """In-memory mirror of the ``table_versions`` rows, shared over pub/sub."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._pubsub: Optional[PubSub] = None
+        self._publishing: Set[asyncio.Task] = set()
+        self.publish_failures = 0
+        # Told which tables only a sync() caught up on, i.e. missed broadcasts
+        self._sync_listeners: List[Callable[[Dict[str, int]], None]] = []
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def update(
+        self, versions: Dict[str, int], publish: bool = True
+    ) -> Dict[str, int]:
+        """Apply committed ``versions``; counters only move forward."""
+        changed = {
+            table: version
+            for table, version in versions.items()
+            if version > self.get(table)
+        }
+        self._versions.update(changed)
+        if publish and self._pubsub is not None and changed:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:  # committed outside the event loop
+                return changed
+            task = loop.create_task(self._publish(changed))
+            self._publishing.add(task)
+            task.add_done_callback(self._publishing.discard)
+        return changed
+
+    async def _publish(self, versions: Dict[str, int]) -> None:
+        try:
+            delivered = await self._pubsub.publish(
+                VERSIONS_CHANNEL, {"versions": versions}
+            )
+        except Exception as e:
+            print(f"Table versions publish error: {e!r}")
+            delivered = False
+        if not delivered:
+            # Other workers pick the rows up on their next sync()
+            self.publish_failures += 1
+            print(f"Table versions not broadcast, left to periodic sync: {versions}")
+
+    def _on_remote_bump(self, message: dict) -> None:
+        self.update(message["versions"], publish=False)
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Catch up with the committed rows (startup and missed messages)."""
+        result = await db.execute(select(TableVersion.name, TableVersion.version))
+        missed = self.update(dict(result.tuples().all()), publish=False)
+        if missed:
+            for listener in self._sync_listeners:
+                listener(missed)
+
+    def on_sync(self, listener: Callable[[Dict[str, int]], None]) -> None:
+        """Call ``listener`` with the versions a sync() had to catch up on."""
+        self._sync_listeners.append(listener)
+
+    async def run_periodic(
+        self, session_factory: async_sessionmaker, interval: float
+    ) -> None:
+        """Re-read the rows every ``interval`` seconds; started from the app lifespan."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.sync(db)
+            except Exception as e:
+                print(f"Table versions sync error: {e!r}")
+
+    async def attach(self, pubsub: PubSub) -> None:
+        """Apply (and announce) commits across every worker sharing ``pubsub``."""
+        self._pubsub = pubsub
+        await pubsub.subscribe(VERSIONS_CHANNEL, self._on_remote_bump)
+
+    async def detach(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(VERSIONS_CHANNEL, self._on_remote_bump)
+            self._pubsub = None
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+    def etag(self, *tables: str) -> str:
+        versions = "-".join(str(self.get(table)) for table in tables)
+        return f'"{versions}"'
+
+
+# Global table versions
+table_versions = TableVersions()
+
+
+def mark_changed(db: AsyncSession, *tables: str) -> None:
+    """Bump ``tables`` as part of the current transaction of ``db``."""
+    db.sync_session.info.setdefault("changed_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_before_commit(session: Session) -> None:
+    tables = session.info.pop("changed_tables", None)
+    if not tables:
+        return
+    # Sorted rows lock in the same order in every transaction
+    stmt = upsert_insert(session.get_bind().dialect.name, TableVersion).values(
+        [{"name": table, "version": 1} for table in sorted(tables)]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"version": TableVersion.version + 1}
+    ).returning(TableVersion.name, TableVersion.version)
+    session.info["committed_versions"] = dict(session.execute(stmt).tuples().all())
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    versions = session.info.pop("committed_versions", None)
+    if versions:
+        table_versions.update(versions)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("changed_tables", None)
+    session.info.pop("committed_versions", None)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison is allowed for If-None-Match on GET/HEAD
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """304 response if the request's If-None-Match matches ``headers``' ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+class ConditionalGet:
+    """
+    Dependency that tags a response with the versions of ``tables``.
+    Raises a 304 when the client already holds the current representation;
+    otherwise sets ``ETag``/``Cache-Control`` and returns them, for routes
+    that build their own ``Response``.
+    """
+
+    def __init__(self, *tables: str):
+        self.tables = tables
+
+    def __call__(self, request: Request, response: Response) -> Dict[str, str]:
+        headers = {
+            "ETag": table_versions.etag(*self.tables),
+            "Cache-Control": settings.catalog_cache_control,
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return headers
@@ -0,0 +1,138 @@
+"""
+SQL instrumentation.
+Cursor-execute hooks on the engine time every statement. Statements run while
+a ``QueryStats`` is active in the current context (one per HTTP request, set by
+``QueryStatsMiddleware``) are counted towards it, and statements slower than
+``settings.slow_query_ms`` are logged without their parameters.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statement count and total database time for one unit of work."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed by the current task inside the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def normalize_sql(statement: str) -> str:
+    """Single-line SQL; bound values are placeholders, so nothing leaks."""
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class SlowQueryLog:
+    """Keeps the most recent slow statements and prints each one."""
+
+    def __init__(self, threshold_ms: float, keep: int = 100):
+        self.threshold_ms = threshold_ms
+        self.keep = keep
+        self.entries: list[tuple[float, str]] = []
+        self.total = 0
+
+    def record(self, elapsed_ms: float, statement: str) -> None:
+        sql = normalize_sql(statement)
+        self.total += 1
+        self.entries.append((elapsed_ms, sql))
+        del self.entries[: -self.keep]
+        print(f"Slow query ({elapsed_ms:.1f} ms): {sql}")
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_ms)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+    if slow_query_log.threshold_ms and elapsed * 1000 >= slow_query_log.threshold_ms:
+        slow_query_log.record(elapsed * 1000, statement)
+
+
+def _handle_error(context) -> None:
+    # after_cursor_execute is skipped for failed statements
+    connection = context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the timing hooks to an engine (idempotent)."""
+    target = engine.sync_engine
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware giving each HTTP request its own ``QueryStats``. The
+    totals go out as a ``Server-Timing`` header and into a per-route
+    histogram. Streaming responses report what ran before the headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.queries = metrics.histogram(
+            "db_queries_per_request",
+            "SQL statements executed per HTTP request",
+            ("method", "route"),
+            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+                route = getattr(scope.get("route"), "path", "unmatched")
+                self.queries.labels(scope["method"], route).observe(stats.count)
+            await send(message)
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send_wrapper)
@@ -1,13 +1,46 @@
 """
-Seed script — populates the DB with sample data for development.
-Run: python -m app.db.seed
+Seed script — populates the DB with sample data for development, or with a
+deterministic synthetic dataset at benchmark scale.
+Run:
+    python -m app.db.seed
+    python -m app.db.seed --synthetic --users 10000 --books 100000 --seed 42
 """
 
+import argparse
 import asyncio
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.db.session import AsyncSessionLocal, engine, Base
 from app.core.security import get_password_hash
-from app.models import User, Book, Review, BookGenre, BookCondition
+from app.models import User, BookGenre, BookCondition, ExchangeStatus
+from app.repositories import (
+    ExchangeRepository,
+    FriendshipRepository,
+    MessageRepository,
+    ReviewRepository,
+    UserRepository,
+    WishlistRepository,
+)
+from app.repositories.base import BaseRepository
+from app.repositories.book import BookRepository
 
 
 SAMPLE_USERS = [
@@ -158,34 +191,44 @@ async def seed():
             return
 
         # Create users
-        users = []
-        for u in SAMPLE_USERS:
-            user = User(
-                **u,
-                hashed_password=get_password_hash("password123"),
-                is_active=True,
-            )
-            session.add(user)
-            users.append(user)
-        await session.flush()
+        user_rows = await UserRepository(session).bulk_create(
+            [
+                {
+                    **u,
+                    "hashed_password": get_password_hash("password123"),
+                    "is_active": True,
+                }
+                for u in SAMPLE_USERS
+            ],
+            returning=("email",),
+        )
+        user_ids = {email: user_id for user_id, email in user_rows}
+        users = [user_ids[u["email"]] for u in SAMPLE_USERS]
 
         # Create books
-        books = []
-        for i, b in enumerate(SAMPLE_BOOKS):
-            book = Book(**b, owner_id=users[i % len(users)].id)
-            session.add(book)
-            books.append(book)
-        await session.flush()
+        book_rows = await BookRepository(session).bulk_create(
+            [
+                {**b, "owner_id": users[i % len(users)]}
+                for i, b in enumerate(SAMPLE_BOOKS)
+            ],
+            returning=("title",),
+        )
+        book_ids = {title: book_id for book_id, title in book_rows}
+        books = [book_ids[b["title"]] for b in SAMPLE_BOOKS]
 
         # Create reviews
-        for r in SAMPLE_REVIEWS:
-            review = Review(
-                book_id=books[r["book_idx"]].id,
-                user_id=users[r["user_idx"]].id,
-                rating=r["rating"],
-                content=r["content"],
-            )
-            session.add(review)
+        await ReviewRepository(session).bulk_create(
+            [
+                {
+                    "book_id": books[r["book_idx"]],
+                    "user_id": users[r["user_idx"]],
+                    "rating": r["rating"],
+                    "content": r["content"],
+                }
+                for r in SAMPLE_REVIEWS
+            ]
+        )
+        await BookRepository(session).recalculate_rating_stats()
 
         await session.commit()
         print(
@@ -194,5 +237,529 @@ async def seed():
         print(" Login: alice@bookswap.ua / password123")
 
 
+# Synthetic dataset
+#
+# ``SyntheticDataGenerator`` scales the same schema to benchmark size. Every
+# value comes from one ``random.Random(seed)``, so a given seed and set of
+# counts always produces the same rows on SQLite and PostgreSQL alike.
+# Activity is skewed the way a real catalogue is: a few users own, review and
+# trade most of the books, a few books attract most of the reviews and
+# requests, and each author writes mostly in one genre.
+
+SYNTHETIC_PASSWORD = "password123"
+
+# Roughly the shelf mix of a general-interest book swap
+GENRE_WEIGHTS = {
+    BookGenre.fiction: 22,
+    BookGenre.fantasy: 11,
+    BookGenre.romance: 9,
+    BookGenre.mystery: 8,
+    BookGenre.non_fiction: 8,
+    BookGenre.thriller: 7,
+    BookGenre.sci_fi: 6,
+    BookGenre.children: 6,
+    BookGenre.history: 5,
+    BookGenre.self_help: 5,
+    BookGenre.biography: 4,
+    BookGenre.science: 4,
+    BookGenre.poetry: 3,
+    BookGenre.horror: 2,
+    BookGenre.other: 1,
+}
+CONDITION_WEIGHTS = {
+    BookCondition.new: 15,
+    BookCondition.good: 55,
+    BookCondition.fair: 22,
+    BookCondition.poor: 8,
+}
+LANGUAGE_WEIGHTS = {"Ukrainian": 70, "English": 20, "Polish": 6, "German": 4}
+CITY_WEIGHTS = {
+    "Київ": 30, "Львів": 14, "Харків": 10, "Одеса": 10, "Дніпро": 9,
+    "Вінниця": 5, "Запоріжжя": 5, "Івано-Франківськ": 5, "Тернопіль": 4,
+    "Чернігів": 4, "Полтава": 4,
+}
+# Reviews on swap sites lean positive
+RATING_WEIGHTS = {5: 35, 4: 33, 3: 17, 2: 9, 1: 6}
+EXCHANGE_STATUS_WEIGHTS = {
+    ExchangeStatus.pending: 35,
+    ExchangeStatus.accepted: 20,
+    ExchangeStatus.completed: 30,
+    ExchangeStatus.rejected: 10,
+    ExchangeStatus.cancelled: 5,
+}
+
+# Title vocabulary and the most popular authors; the search benchmark's
+# queries are written against these
+TITLE_WORDS = [
+    "тінь", "вітер", "місто", "зоря", "море", "дорога", "сад", "ніч", "вогонь",
+    "ліс", "shadow", "river", "empire", "garden", "night", "storm", "crown",
+    "glass", "winter", "silence", "dream", "castle", "північ", "серце", "степ",
+]
+POPULAR_AUTHORS = [
+    "Ліна Костенко", "Сергій Жадан", "Андрій Курков", "Оксана Забужко",
+    "Neil Gaiman", "Ursula Le Guin", "Terry Pratchett", "Haruki Murakami",
+    "Margaret Atwood", "Kazuo Ishiguro", "Юрій Андрухович", "Марія Матіос",
+]
+FIRST_NAMES = [
+    "Олена", "Андрій", "Марія", "Тарас", "Ірина", "Богдан", "Оксана", "Дмитро",
+    "Наталія", "Юрій", "Софія", "Максим", "Катерина", "Олег", "Anna", "Mark",
+]
+LAST_NAMES = [
+    "Коваленко", "Шевченко", "Бондаренко", "Ткаченко", "Кравченко", "Олійник",
+    "Мельник", "Поліщук", "Лисенко", "Савчук", "Руденко", "Марченко", "Novak",
+]
+INITIALS = "АБВГДЕЄЖЗІКЛМНОПРСТУФХЦЧШЮЯ"
+REVIEW_PHRASES = [
+    "Читав на одному диханні.",
+    "Сильний початок, але фінал слабший.",
+    "Рекомендую всім, хто любить жанр.",
+    "Перечитуватиму ще не раз.",
+    "Не моє, але мова чудова.",
+    "Great characters, slow middle.",
+]
+MESSAGE_PHRASES = [
+    "Привіт! Книга ще доступна?",
+    "Можемо зустрітися в центрі в суботу.",
+    "Стан книги точно як на фото?",
+    "Дякую, отримав(ла)!",
+    "Можу запропонувати іншу книгу замість цієї.",
+    "Sounds good, see you then.",
+]
+
+# Synthetic timestamps span the two years before this fixed point
+SYNTHETIC_EPOCH = datetime(2025, 1, 1)
+SYNTHETIC_SPAN = 2 * 365 * 24 * 3600
+
+
+def synthetic_email(index: int) -> str:
+    return f"user{index}@bookswap.ua"
+
+
+def isbn13(number: int) -> str:
+    """A valid ISBN-13 in the 978 range for a serial ``number``."""
+    digits = f"978{number:09d}"
+    check = -sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10
+    return f"{digits}{check}"
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+
+def _zipf(count: int, exponent: float, rng: random.Random) -> List[float]:
+    """
+    Cumulative Zipf weights over ``count`` items. Ranks are shuffled so the
+    heavy hitters are spread over the id range instead of being the first ids.
+    """
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return _cumulative([rank ** -exponent for rank in ranks])
+
+
+class _Weighted:
+    """``random.choices`` over a fixed population with precomputed weights."""
+
+    def __init__(self, weights: Dict[Any, float]):
+        self.population = list(weights)
+        self.cum_weights = _cumulative(list(weights.values()))
+
+    def pick(self, rng: random.Random) -> Any:
+        return rng.choices(self.population, cum_weights=self.cum_weights)[0]
+
+
+class SyntheticDataGenerator:
+    """
+    Generates and bulk-inserts a realistic dataset of any size.
+
+        counts = await SyntheticDataGenerator(seed=42).generate(
+            session, users=10_000, books=100_000
+        )
+
+    Counts not given are derived from ``users`` and ``books``. Rows are built
+    and written ``batch_size`` at a time, so memory stays proportional to
+    the number of entities rather than the size of their rows. The session
+    is flushed but not committed.
+    """
+
+    def __init__(self, seed: int = 42, batch_size: int = 10_000):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self._genres = _Weighted(GENRE_WEIGHTS)
+        self._conditions = _Weighted(CONDITION_WEIGHTS)
+        self._languages = _Weighted(LANGUAGE_WEIGHTS)
+        self._cities = _Weighted(CITY_WEIGHTS)
+        self._ratings = _Weighted(RATING_WEIGHTS)
+        self._statuses = _Weighted(EXCHANGE_STATUS_WEIGHTS)
+        self._authors: List[Tuple[str, BookGenre]] = []
+        self._author_weights: List[float] = []
+        # Per-entity state, indexed by generation order
+        self._user_ids: List[int] = []
+        self._joined: List[datetime] = []
+        self._activity: List[float] = []
+        self._owners: List[int] = []
+        self._available: List[bool] = []
+        self._book_ids: List[int] = []
+        self._popularity: List[float] = []
+        self._trades: List[Tuple[int, int, int, datetime, ExchangeStatus]] = []
+
+    # Row factories
+
+    def _timestamp(self, after: Optional[datetime] = None) -> datetime:
+        start = SYNTHETIC_EPOCH - timedelta(seconds=SYNTHETIC_SPAN)
+        if after is not None and after > start:
+            start = after
+        span = int((SYNTHETIC_EPOCH - start).total_seconds())
+        return start + timedelta(seconds=self.rng.randint(0, max(span, 0)))
+
+    def user_row(self, index: int, hashed_password: str) -> Dict[str, Any]:
+        rng = self.rng
+        return {
+            "email": synthetic_email(index),
+            "username": f"user{index}",
+            "hashed_password": hashed_password,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "city": self._cities.pick(rng),
+            "is_active": True,
+            "created_at": self._timestamp(),
+        }
+
+    def book_row(
+        self, index: int, owner_id: int, after: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        rng = self.rng
+        if not self._authors:
+            self._build_authors(0)
+        author, genre = rng.choices(self._authors, cum_weights=self._author_weights)[0]
+        # Authors mostly stay in their genre
+        if rng.random() > 0.8:
+            genre = self._genres.pick(rng)
+        year = max(2024 - int(rng.expovariate(1 / 25)), 1800)
+        return {
+            "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 4))).capitalize(),
+            "author": author,
+            "genre": genre,
+            "isbn": isbn13(index),
+            "published_year": year,
+            "language": self._languages.pick(rng),
+            "condition": self._conditions.pick(rng),
+            "is_available_for_exchange": rng.random() < 0.8,
+            "owner_id": owner_id,
+            "created_at": self._timestamp(after),
+        }
+
+    def _build_authors(self, books: int) -> None:
+        """Famous authors first, then a long tail of generated names."""
+        names = list(POPULAR_AUTHORS)
+        wanted = max(books // 20, len(names))
+        for first, initial, last in itertools.product(FIRST_NAMES, INITIALS, LAST_NAMES):
+            if len(names) >= wanted:
+                break
+            names.append(f"{first} {initial}. {last}")
+        self._authors = [(name, self._genres.pick(self.rng)) for name in names]
+        # Unshuffled: popularity falls off with position in the list
+        self._author_weights = _cumulative(
+            [rank ** -0.6 for rank in range(1, len(names) + 1)]
+        )
+
+    # Generation
+
+    async def generate(
+        self,
+        session: AsyncSession,
+        users: int,
+        books: int,
+        reviews: Optional[int] = None,
+        wishlist_items: Optional[int] = None,
+        exchanges: Optional[int] = None,
+        messages: Optional[int] = None,
+        friendships: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Insert the dataset and return the number of rows written per table."""
+        counts = {"users": await self._users(session, users)}
+        if not self._user_ids:
+            return counts
+        counts["books"] = await self._books(session, books)
+        counts["reviews"] = await self._reviews(
+            session, books * 2 if reviews is None else reviews
+        )
+        counts["wishlist_items"] = await self._wishlists(
+            session, users * 5 if wishlist_items is None else wishlist_items
+        )
+        counts["exchanges"] = await self._exchanges(
+            session, users * 2 if exchanges is None else exchanges
+        )
+        counts["messages"] = await self._messages(
+            session, counts["exchanges"] * 4 if messages is None else messages
+        )
+        counts["friendships"] = await self._friendships(
+            session, users * 3 if friendships is None else friendships
+        )
+        return counts
+
+    async def _write(
+        self,
+        repo: BaseRepository,
+        rows: Iterable[Dict[str, Any]],
+        returning: Sequence[str] = (),
+    ) -> List[Row]:
+        """Bulk-insert ``rows`` batch by batch; returns the RETURNING rows."""
+        rows = iter(rows)
+        results: List[Row] = []
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                return results
+            results.extend(await repo.bulk_create(batch, returning=returning))
+
+    def _user(self) -> int:
+        return self.rng.choices(range(len(self._user_ids)), cum_weights=self._activity)[0]
+
+    def _book(self) -> int:
+        return self.rng.choices(range(len(self._book_ids)), cum_weights=self._popularity)[0]
+
+    def _unique_pairs(
+        self, count: int, pick: Callable[[], Optional[Tuple[int, int]]]
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Up to ``count`` distinct pairs from ``pick``, which returns None to
+        reject a draw. Draws are bounded, so a small dataset with too few
+        possible pairs yields fewer rows instead of looping forever.
+        """
+        seen: Set[Tuple[int, int]] = set()
+        for _ in range(count * 5):
+            if len(seen) >= count:
+                return
+            pair = pick()
+            if pair is None or pair in seen:
+                continue
+            seen.add(pair)
+            yield pair
+
+    def _reader_and_book(self) -> Optional[Tuple[int, int]]:
+        user, book = self._user(), self._book()
+        return None if self._owners[book] == user else (user, book)
+
+    async def _users(self, session: AsyncSession, count: int) -> int:
+        # One bcrypt hash for everyone: hashing per user would dominate the run
+        hashed = get_password_hash(SYNTHETIC_PASSWORD)
+        rows = [self.user_row(i, hashed) for i in range(count)]
+        created = await self._write(UserRepository(session), rows, ("email",))
+        ids = {email: user_id for user_id, email in created}
+        self._user_ids = [ids[row["email"]] for row in rows]
+        self._joined = [row["created_at"] for row in rows]
+        self._activity = _zipf(count, 0.8, self.rng)
+        return count
+
+    async def _books(self, session: AsyncSession, count: int) -> int:
+        self._build_authors(count)
+        self._owners = self.rng.choices(
+            range(len(self._user_ids)), cum_weights=self._activity, k=count
+        )
+        self._available = []
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            for i, owner in enumerate(self._owners):
+                row = self.book_row(i, self._user_ids[owner], after=self._joined[owner])
+                self._available.append(row["is_available_for_exchange"])
+                yield row
+
+        created = await self._write(BookRepository(session), rows(), ("isbn",))
+        ids = {isbn: book_id for book_id, isbn in created}
+        self._book_ids = [ids[isbn13(i)] for i in range(count)]
+        self._popularity = _zipf(count, 0.9, self.rng)
+        return count
+
+    async def _reviews(self, session: AsyncSession, count: int) -> int:
+        if not self._book_ids:
+            return 0
+        rng = self.rng
+        stats: Dict[int, List[int]] = {}
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            for user, book in self._unique_pairs(count, self._reader_and_book):
+                rating = self._ratings.pick(rng)
+                book_stats = stats.setdefault(self._book_ids[book], [0, 0])
+                book_stats[0] += rating
+                book_stats[1] += 1
+                yield {
+                    "user_id": self._user_ids[user],
+                    "book_id": self._book_ids[book],
+                    "rating": rating,
+                    "content": rng.choice(REVIEW_PHRASES) if rng.random() < 0.6 else None,
+                    "created_at": self._timestamp(),
+                }
+
+        written = len(await self._write(ReviewRepository(session), rows()))
+        # The totals are known here; recalculate_rating_stats() would rescan
+        # the reviews once per book
+        await BookRepository(session).bulk_update(
+            [
+                {"id": book_id, "rating_sum": rating_sum, "review_count": review_count}
+                for book_id, (rating_sum, review_count) in stats.items()
+            ]
+        )
+        return written
+
+    async def _wishlists(self, session: AsyncSession, count: int) -> int:
+        if not self._book_ids:
+            return 0
+        rows = (
+            {
+                "user_id": self._user_ids[user],
+                "book_id": self._book_ids[book],
+                "added_at": self._timestamp(),
+            }
+            for user, book in self._unique_pairs(count, self._reader_and_book)
+        )
+        return len(await self._write(WishlistRepository(session), rows))
+
+    async def _exchanges(self, session: AsyncSession, count: int) -> int:
+        self._trades = []
+        if not self._book_ids:
+            return 0
+        rng = self.rng
+        shelves: Dict[int, List[int]] = {}
+        for book, owner in enumerate(self._owners):
+            shelves.setdefault(owner, []).append(book)
+
+        # The requester offers one of their own books for someone else's
+        # available one; each (requester, requested book) pair occurs once
+        def pick() -> Optional[Tuple[int, int]]:
+            pair = self._reader_and_book()
+            if pair is None or pair[0] not in shelves or not self._available[pair[1]]:
+                return None
+            return pair
+
+        rows = []
+        for requester, book in self._unique_pairs(count, pick):
+            status = self._statuses.pick(rng)
+            created_at = self._timestamp()
+            rows.append(
+                {
+                    "requester_id": self._user_ids[requester],
+                    "owner_id": self._user_ids[self._owners[book]],
+                    "offered_book_id": self._book_ids[rng.choice(shelves[requester])],
+                    "requested_book_id": self._book_ids[book],
+                    "status": status,
+                    "message": rng.choice(MESSAGE_PHRASES),
+                    "created_at": created_at,
+                    "updated_at": (
+                        None if status == ExchangeStatus.pending
+                        else self._timestamp(created_at)
+                    ),
+                }
+            )
+        created = await self._write(
+            ExchangeRepository(session), rows, ("requester_id", "requested_book_id")
+        )
+        ids = {(requester, book): exchange_id for exchange_id, requester, book in created}
+        self._trades = [
+            (
+                ids[row["requester_id"], row["requested_book_id"]],
+                row["requester_id"],
+                row["owner_id"],
+                row["created_at"],
+                row["status"],
+            )
+            for row in rows
+        ]
+        return len(rows)
+
+    async def _messages(self, session: AsyncSession, count: int) -> int:
+        if not self._trades:
+            return 0
+        rng = self.rng
+        # Negotiations that went somewhere have longer threads
+        weights = _cumulative(
+            [
+                3 if status in (ExchangeStatus.accepted, ExchangeStatus.completed) else 1
+                for *_, status in self._trades
+            ]
+        )
+        rows = (
+            {
+                "exchange_id": exchange_id,
+                "sender_id": rng.choice((requester_id, owner_id)),
+                "content": rng.choice(MESSAGE_PHRASES),
+                "is_read": rng.random() < 0.7,
+                "created_at": self._timestamp(created_at),
+            }
+            for exchange_id, requester_id, owner_id, created_at, _ in rng.choices(
+                self._trades, cum_weights=weights, k=count
+            )
+        )
+        return len(await self._write(MessageRepository(session), rows))
+
+    async def _friendships(self, session: AsyncSession, count: int) -> int:
+        rng = self.rng
+
+        def pick() -> Optional[Tuple[int, int]]:
+            first, second = self._user(), self._user()
+            return None if first == second else (min(first, second), max(first, second))
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            for first, second in self._unique_pairs(count, pick):
+                # Either side may have sent the request
+                if rng.random() < 0.5:
+                    first, second = second, first
+                status = rng.choices(("accepted", "pending", "rejected"), (75, 20, 5))[0]
+                created_at = self._timestamp()
+                yield {
+                    "requester_id": self._user_ids[first],
+                    "addressee_id": self._user_ids[second],
+                    "status": status,
+                    "created_at": created_at,
+                    "updated_at": None if status == "pending" else self._timestamp(created_at),
+                }
+
+        return len(await self._write(FriendshipRepository(session), rows()))
+
+
+async def seed_synthetic(args) -> None:
+    db_engine = create_async_engine(args.database_url) if args.database_url else engine
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(
+        db_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async with session_factory() as session:
+        if await UserRepository(session).count():
+            print("⚠️  Database is not empty, skipping.")
+            return
+        started = time.perf_counter()
+        counts = await SyntheticDataGenerator(args.seed).generate(
+            session,
+            users=args.users,
+            books=args.books,
+            reviews=args.reviews,
+            wishlist_items=args.wishlist_items,
+            exchanges=args.exchanges,
+            messages=args.messages,
+            friendships=args.friendships,
+        )
+        await session.commit()
+        elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"Seeded {total} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/sec).")
+    print(f" Login: {synthetic_email(0)} / {SYNTHETIC_PASSWORD}")
+    if db_engine is not engine:
+        await db_engine.dispose()
+
+
 if __name__ == "__main__":
-    asyncio.run(seed())
+    parser = argparse.ArgumentParser(description="Seed the BookSwap database.")
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--reviews", type=int, default=None)
+    parser.add_argument("--wishlist-items", type=int, default=None)
+    parser.add_argument("--exchanges", type=int, default=None)
+    parser.add_argument("--messages", type=int, default=None)
+    parser.add_argument("--friendships", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    asyncio.run(seed_synthetic(args) if args.synthetic else seed())
@@ -28,7 +28,9 @@ AsyncSessionLocal = async_sessionmaker(
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated values (ids, created_at, onupdate timestamps) in
+    # the INSERT/UPDATE itself via RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 async def get_db() -> AsyncSession:
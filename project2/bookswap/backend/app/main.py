@@ -1,12 +1,32 @@
+import asyncio
 import json
 from contextlib import asynccontextmanager
-from typing import Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.connections import ConnectionManager
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics, pool_statistics
+from app.core.pubsub import create_pubsub
+from app.core.serialization import FastJSONResponse
+from app.core.versions import table_versions
 from app.core.security import decode_token
+from app.db.instrumentation import QueryStatsMiddleware, instrument_engine
+from app.db.session import engine, get_db
+from app.schemas import MessageCreate
+from app.services import ChatService
+from app.services.message_buffer import message_buffer
 from app.api.routes import (
     auth_router,
     users_router,
@@ -22,33 +42,7 @@ from app.api.routes import (
 
 #  WebSocket Connection Manager
 
-
-class ConnectionManager:
-    """Manages active WebSocket connections per exchange room."""
-
-    def __init__(self):
-        self.active: dict[int, list[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, exchange_id: int):
-        await websocket.accept()
-        self.active.setdefault(exchange_id, []).append(websocket)
-
-    def disconnect(self, websocket: WebSocket, exchange_id: int):
-        if exchange_id in self.active:
-            self.active[exchange_id].discard(websocket)
-
-    async def broadcast(
-        self, exchange_id: int, message: dict, exclude: Optional[WebSocket] = None
-    ):
-        for ws in list(self.active.get(exchange_id, [])):
-            if ws != exclude:
-                try:
-                    await ws.send_json(message)
-                except Exception:
-                    pass
-
-
-manager = ConnectionManager()
+manager = ConnectionManager(pubsub=create_pubsub())
 
 
 #  App factory
@@ -57,13 +51,55 @@ manager = ConnectionManager()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: create tables (use alembic in production)
-    from app.db.session import engine, Base
+    from app.db.session import Base
     import app.models  # noqa: F401 — register models
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    from app.core.observer import event_manager
+    from app.db.session import AsyncSessionLocal
+    from app.services.catalog_cache import catalog_invalidator
+    from app.services.collaborative import collaborative_recommender
+
+    # Observers run on background workers instead of inside requests
+    await event_manager.start()
+    # Catalog ETags and cached pages must change on every worker when any
+    # worker writes
+    async with AsyncSessionLocal() as db:
+        await table_versions.sync(db)
+    await table_versions.attach(manager.pubsub)
+    await catalog_invalidator.attach(manager.pubsub)
+    versions_task = asyncio.create_task(
+        table_versions.run_periodic(
+            AsyncSessionLocal, settings.table_versions_sync_seconds
+        )
+    )
+    recommender_task = None
+    if settings.recommender_enabled:
+        recommender_task = asyncio.create_task(
+            collaborative_recommender.run_periodic(
+                AsyncSessionLocal, settings.recommender_refresh_interval_seconds
+            )
+        )
     yield
-    # Shutdown
+    # Shutdown: drain buffered messages before their events
+    from app.core.security import password_hasher
+    from app.services.gemini import gemini_client
+
+    if recommender_task is not None:
+        recommender_task.cancel()
+        await asyncio.gather(recommender_task, return_exceptions=True)
+    versions_task.cancel()
+    await asyncio.gather(versions_task, return_exceptions=True)
+    await manager.close_all()
+    await message_buffer.stop()
+    await event_manager.stop()
+    await catalog_invalidator.detach()
+    await table_versions.detach()
+    await manager.pubsub.close()
+    await gemini_client.aclose()
+    password_hasher.shutdown()
     await engine.dispose()
 
 
@@ -72,6 +108,11 @@ app = FastAPI(
     version="1.0.0",
     description="BookSwap — Book Recommendations & Exchange Platform",
     lifespan=lifespan,
+    **(
+        {"default_response_class": FastJSONResponse}
+        if settings.fast_json_responses
+        else {}
+    ),
 )
 
 # CORS
@@ -84,6 +125,12 @@ app.add_middleware(
     allow_headers=["*"],  # Дозволяє всі заголовки
 )
 
+if settings.query_stats_enabled:
+    instrument_engine(engine)
+    app.add_middleware(QueryStatsMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
@@ -104,33 +151,129 @@ async def websocket_chat(
     websocket: WebSocket,
     exchange_id: int,
     token: str = Query(...),
+    db: AsyncSession = Depends(get_db),
 ):
     payload = decode_token(token)
     if not payload:
         await websocket.close(code=4001)
         return
-
-    await manager.connect(websocket, exchange_id)
     user_id = int(payload["sub"])
 
+    try:
+        await ChatService(db).ensure_participant(exchange_id, user_id)
+    except HTTPException:
+        await websocket.close(code=4003)
+        return
+    # Don't hold a pooled connection for the lifetime of the socket
+    await db.close()
+
+    await manager.connect(websocket, exchange_id)
     try:
         while True:
             data = await websocket.receive_text()
             msg = json.loads(data)
+            client_id = msg.get("client_id")
+            try:
+                content = MessageCreate(content=msg.get("content", "")).content
+                saved = await message_buffer.submit(exchange_id, user_id, content)
+            except ValidationError:
+                manager.send(
+                    websocket,
+                    {"type": "error", "client_id": client_id, "detail": "Invalid message"},
+                )
+                continue
+            except Exception:
+                manager.send(
+                    websocket,
+                    {
+                        "type": "error",
+                        "client_id": client_id,
+                        "detail": "Message could not be saved",
+                    },
+                )
+                continue
+
+            created_at = saved["created_at"].isoformat()
             await manager.broadcast(
                 exchange_id,
                 {
                     "type": "message",
+                    "id": saved["id"],
                     "exchange_id": exchange_id,
                     "sender_id": user_id,
-                    "content": msg.get("content", ""),
+                    "content": content,
+                    "created_at": created_at,
                 },
                 exclude=websocket,
             )
+            # Acknowledge only after the message is committed
+            manager.send(
+                websocket,
+                {
+                    "type": "ack",
+                    "client_id": client_id,
+                    "id": saved["id"],
+                    "created_at": created_at,
+                },
+            )
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, exchange_id)
 
 
 @app.get("/health", tags=["Health"])
 async def health():
     return {"status": "ok", "version": "1.0.0"}
+
+
+#  Metrics
+
+
+def _register_metrics() -> None:
+    from app.core.dependencies import _token_cache, _user_cache
+    from app.core.observer import event_manager, statistics_observer
+    from app.core.security import password_hasher
+    from app.services import _catalog_count_cache
+    from app.services.catalog_cache import catalog_cache
+    from app.services.collaborative import collaborative_recommender
+    from app.services.recommendations import (
+        _recommendation_cache,
+        recommendation_flights,
+    )
+
+    pool_statistics.instrument(engine)
+    metrics.register(
+        "events_total",
+        "counter",
+        "Domain events seen by StatisticsObserver",
+        lambda: [
+            ("", {"type": event_type}, count)
+            for event_type, count in statistics_observer.get_statistics()[
+                "event_counts"
+            ].items()
+        ],
+    )
+    for component, get_statistics in (
+        ("db_pool", pool_statistics.get_statistics),
+        ("event_queue", event_manager.get_queue_statistics),
+        ("password_hasher", password_hasher.get_statistics),
+        ("message_buffer", message_buffer.get_statistics),
+        ("websocket", manager.get_statistics),
+        ("recommender", collaborative_recommender.get_statistics),
+        ("recommendation_flights", recommendation_flights.get_statistics),
+        ("recommendation_cache", _recommendation_cache.get_statistics),
+        ("catalog_count_cache", _catalog_count_cache.get_statistics),
+        ("catalog_response_cache", catalog_cache.get_statistics),
+        ("token_cache", _token_cache.get_statistics),
+        ("user_cache", _user_cache.get_statistics),
+    ):
+        metrics.register_statistics(component, get_statistics)
+
+
+if settings.metrics_enabled:
+    _register_metrics()
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics_endpoint():
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
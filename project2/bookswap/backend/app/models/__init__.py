@@ -3,15 +3,20 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import (
+    DDL,
     Boolean,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    event,
     func,
+    null,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -86,8 +91,16 @@ class BookCondition(str, enum.Enum):
     poor = "poor"
 
 
+# SQLite stores server-side now() without microseconds; keep Python-side values in
+# the same format so keyset comparisons on created_at match stored strings.
+KeysetDateTime = DateTime().with_variant(
+    sqlite.DATETIME(truncate_microseconds=True), "sqlite"
+)
+
+
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (Index("ix_books_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(300), nullable=False, index=True)
@@ -103,7 +116,16 @@ class Book(Base):
     )
     is_available_for_exchange: Mapped[bool] = mapped_column(Boolean, default=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Denormalized rating stats, maintained by ReviewService with atomic increments
+    rating_sum: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    review_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        KeysetDateTime, server_default=func.now()
+    )
 
     owner: Mapped["User"] = relationship("User", back_populates="books")
     reviews: Mapped[list["Review"]] = relationship(
@@ -123,6 +145,12 @@ class Book(Base):
         back_populates="requested_book",
     )
 
+    @property
+    def average_rating(self) -> Optional[float]:
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
 
 #  Review
 
@@ -136,8 +164,10 @@ class Review(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Explicit NULL insert default: the INSERT's RETURNING then covers this
+    # column too, instead of eager_defaults re-selecting it after the flush
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, onupdate=func.now()
+        DateTime, default=null(), onupdate=func.now()
     )
 
     user: Mapped["User"] = relationship("User", back_populates="reviews")
@@ -171,7 +201,7 @@ class Exchange(Base):
     message: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, onupdate=func.now()
+        DateTime, default=null(), onupdate=func.now()
     )
 
     requester: Mapped["User"] = relationship(
@@ -237,8 +267,61 @@ class Friendship(Base):
     )  # pending, accepted, rejected
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, onupdate=func.now()
+        DateTime, default=null(), onupdate=func.now()
     )
 
     requester: Mapped["User"] = relationship("User", foreign_keys=[requester_id])
     addressee: Mapped["User"] = relationship("User", foreign_keys=[addressee_id])
+
+
+#  Table versions
+
+
+class TableVersion(Base):
+    """Commit counter per table, shared by every worker (see app.core.versions)."""
+
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+#  Search
+
+# Full-text indexes used by app.repositories.search (mirrored by migration 004).
+# PostgreSQL indexes the title/author tsvector expression; SQLite keeps an FTS5
+# shadow table in sync with triggers that fire only when title or author change.
+BOOKS_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE INDEX IF NOT EXISTS ix_books_search ON books "
+        "USING gin (to_tsvector('simple', title || ' ' || author))",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+        "title, author, content='books', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+        "INSERT INTO books_fts(rowid, title, author) "
+        "VALUES (new.id, new.title, new.author); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); END",
+        "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author "
+        "ON books BEGIN "
+        "INSERT INTO books_fts(books_fts, rowid, title, author) "
+        "VALUES ('delete', old.id, old.title, old.author); "
+        "INSERT INTO books_fts(rowid, title, author) "
+        "VALUES (new.id, new.title, new.author); END",
+    ],
+}
+
+for _dialect, _statements in BOOKS_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Book.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect)
+        )
+event.listen(
+    Book.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS books_fts").execute_if(dialect="sqlite"),
+)
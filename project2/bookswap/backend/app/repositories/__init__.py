@@ -1,6 +1,6 @@
 from typing import Optional, Sequence
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, Select, select, and_
+from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
@@ -67,73 +67,145 @@ class ReviewRepository(BaseRepository[Review]):
         return result.scalar_one_or_none()
 
 
+# Columns serialized by UserPublic / BookResponse; nothing else is selected
+_USER_COLUMNS = ("id", "username", "full_name", "avatar_url", "city", "created_at")
+_BOOK_COLUMNS = (
+    "id",
+    "title",
+    "author",
+    "description",
+    "isbn",
+    "cover_url",
+    "genre",
+    "published_year",
+    "language",
+    "condition",
+    "is_available_for_exchange",
+    "owner_id",
+    "rating_sum",
+    "review_count",
+    "created_at",
+)
+_EXCHANGE_COLUMNS = ("id", "status", "message", "created_at", "updated_at")
+
+
 class ExchangeRepository(BaseRepository[Exchange]):
+    """
+    Exchange reads are projections: one joined SELECT of exactly the columns
+    ``ExchangeResponse`` needs, returned as plain dicts instead of ORM objects
+    (no identity map, no lazy state, no password hashes).
+    """
+
     def __init__(self, db: AsyncSession):
         super().__init__(Exchange, db)
 
-    async def get_with_details(self, exchange_id: int) -> Optional[Exchange]:
-        result = await self.db.execute(
-            select(Exchange)
-            .options(
-                selectinload(Exchange.requester),
-                selectinload(Exchange.owner),
-                selectinload(Exchange.offered_book).selectinload(Book.owner),
-                selectinload(Exchange.requested_book).selectinload(Book.owner),
+    @staticmethod
+    def _details_query() -> Select:
+        requester, owner = aliased(User), aliased(User)
+        offered, requested = aliased(Book), aliased(Book)
+        offered_owner, requested_owner = aliased(User), aliased(User)
+        # Column order must match the slices in _rows_to_dicts
+        entities = [
+            (Exchange, _EXCHANGE_COLUMNS),
+            (requester, _USER_COLUMNS),
+            (owner, _USER_COLUMNS),
+            (offered, _BOOK_COLUMNS),
+            (offered_owner, _USER_COLUMNS),
+            (requested, _BOOK_COLUMNS),
+            (requested_owner, _USER_COLUMNS),
+        ]
+        return (
+            select(
+                *(getattr(entity, name) for entity, names in entities for name in names)
             )
-            .where(Exchange.id == exchange_id)
+            .select_from(Exchange)
+            .join(requester, Exchange.requester_id == requester.id)
+            .join(owner, Exchange.owner_id == owner.id)
+            .join(requested, Exchange.requested_book_id == requested.id)
+            .join(requested_owner, requested.owner_id == requested_owner.id)
+            .outerjoin(offered, Exchange.offered_book_id == offered.id)
+            .outerjoin(offered_owner, offered.owner_id == offered_owner.id)
         )
-        return result.scalar_one_or_none()
 
-    async def get_for_user(self, user_id: int) -> Sequence[Exchange]:
-        result = await self.db.execute(
-            select(Exchange)
-            .options(
-                selectinload(Exchange.requester),
-                selectinload(Exchange.owner),
-                selectinload(Exchange.offered_book).selectinload(Book.owner),
-                selectinload(Exchange.requested_book).selectinload(Book.owner),
-            )
+    @staticmethod
+    def _rows_to_dicts(rows: Sequence[Row]) -> list[dict]:
+        """Slice flat rows into nested response dicts.
+
+        Users and books repeat across a listing, so each one is built once
+        and shared between the exchanges that reference it.
+        """
+        users: dict = {}
+        books: dict = {}
+
+        def user(values: tuple) -> dict:
+            found = users.get(values[0])
+            if found is None:
+                found = users[values[0]] = dict(zip(_USER_COLUMNS, values))
+            return found
+
+        def book(values: tuple, owner_values: tuple) -> Optional[dict]:
+            if values[0] is None:
+                return None
+            found = books.get(values[0])
+            if found is None:
+                found = books[values[0]] = dict(zip(_BOOK_COLUMNS, values))
+                rating_sum, review_count = found.pop("rating_sum"), found["review_count"]
+                found["average_rating"] = (
+                    round(rating_sum / review_count, 2) if review_count else None
+                )
+                found["owner"] = user(owner_values)
+            return found
+
+        e, u, b = len(_EXCHANGE_COLUMNS), len(_USER_COLUMNS), len(_BOOK_COLUMNS)
+        exchanges = []
+        for row in rows:
+            exchange = dict(zip(_EXCHANGE_COLUMNS, row[:e]))
+            at = e
+            exchange["requester"] = user(row[at : at + u])
+            at += u
+            exchange["owner"] = user(row[at : at + u])
+            at += u
+            exchange["offered_book"] = book(row[at : at + b], row[at + b : at + b + u])
+            at += b + u
+            exchange["requested_book"] = book(row[at : at + b], row[at + b : at + b + u])
+            exchanges.append(exchange)
+        return exchanges
+
+    async def _fetch(self, stmt: Select) -> list[dict]:
+        result = await self.db.execute(stmt)
+        return self._rows_to_dicts(result.all())
+
+    async def get_with_details(self, exchange_id: int) -> Optional[dict]:
+        rows = await self._fetch(
+            self._details_query().where(Exchange.id == exchange_id)
+        )
+        return rows[0] if rows else None
+
+    async def get_for_user(self, user_id: int) -> list[dict]:
+        return await self._fetch(
+            self._details_query()
             .where((Exchange.requester_id == user_id) | (Exchange.owner_id == user_id))
-            .order_by(Exchange.created_at.desc())
+            .order_by(Exchange.created_at.desc(), Exchange.id.desc())
         )
-        return result.scalars().all()
 
-    async def get_all_with_details(
-        self, skip: int = 0, limit: int = 20
-    ) -> Sequence[Exchange]:
-        result = await self.db.execute(
-            select(Exchange)
-            .options(
-                selectinload(Exchange.requester),
-                selectinload(Exchange.owner),
-                selectinload(Exchange.offered_book).selectinload(Book.owner),
-                selectinload(Exchange.requested_book).selectinload(Book.owner),
-            )
+    async def get_all_with_details(self, skip: int = 0, limit: int = 20) -> list[dict]:
+        return await self._fetch(
+            self._details_query()
             .where(Exchange.status == ExchangeStatus.pending)
-            .order_by(Exchange.created_at.desc())
+            .order_by(Exchange.created_at.desc(), Exchange.id.desc())
             .offset(skip)
             .limit(limit)
         )
-        return result.scalars().all()
 
-    async def get_between_users(
-        self, user1_id: int, user2_id: int
-    ) -> Sequence[Exchange]:
-        result = await self.db.execute(
-            select(Exchange)
-            .options(
-                selectinload(Exchange.requester),
-                selectinload(Exchange.owner),
-                selectinload(Exchange.offered_book).selectinload(Book.owner),
-                selectinload(Exchange.requested_book).selectinload(Book.owner),
-            )
+    async def get_between_users(self, user1_id: int, user2_id: int) -> list[dict]:
+        return await self._fetch(
+            self._details_query()
             .where(
                 (Exchange.requester_id == user1_id) & (Exchange.owner_id == user2_id)
                 | (Exchange.requester_id == user2_id) & (Exchange.owner_id == user1_id)
             )
-            .order_by(Exchange.created_at.desc())
+            .order_by(Exchange.created_at.desc(), Exchange.id.desc())
         )
-        return result.scalars().all()
 
 
 class WishlistRepository(BaseRepository[WishlistItem]):
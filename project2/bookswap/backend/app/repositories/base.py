@@ -1,11 +1,54 @@
-from typing import Generic, TypeVar, Type, Optional, Sequence
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Row, Insert, insert, select, func, update
+from sqlalchemy.dialects import postgresql, sqlite
 
+from app.core.config import settings
 from app.db.session import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Dialects with INSERT ... ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(dialect: str, target: Any) -> Insert:
+    """INSERT for ``target`` that supports ``on_conflict_do_update``."""
+    if dialect not in _UPSERT_INSERTS:
+        raise NotImplementedError(f"upsert is not supported on {dialect}")
+    return _UPSERT_INSERTS[dialect](target)
+
+
+def _batches(
+    rows: Sequence[Dict[str, Any]], chunk_size: Optional[int]
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split ``rows`` into chunks whose dicts share the same keys. SQLAlchemy
+    only packs rows with identical columns into one multi-row statement; a
+    mixed list would degrade to one statement per row. Keys set to None
+    count as absent, since ORM bulk INSERTs drop them so column defaults
+    apply.
+    """
+    size = chunk_size or settings.bulk_chunk_size
+    groups: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        key = frozenset(name for name, value in row.items() if value is not None)
+        groups.setdefault(key, []).append(row)
+    for group in groups.values():
+        for start in range(0, len(group), size):
+            yield group[start : start + size]
+
 
 class BaseRepository(Generic[ModelType]):
     """Generic repository implementing common CRUD operations."""
@@ -27,16 +70,93 @@ class BaseRepository(Generic[ModelType]):
         return result.scalar_one()
 
     async def create(self, obj: ModelType) -> ModelType:
+        """
+        Insert ``obj``; server defaults come back through RETURNING, so no
+        refresh is needed. Relationships are not loaded: callers set the ones
+        their response needs on ``obj`` before creating it.
+        """
         self.db.add(obj)
         await self.db.flush()
-        await self.db.refresh(obj)
         return obj
 
     async def update(self, obj: ModelType) -> ModelType:
         await self.db.flush()
-        await self.db.refresh(obj)
         return obj
 
     async def delete(self, obj: ModelType) -> None:
         await self.db.delete(obj)
         await self.db.flush()
+
+    # Bulk writes take plain column dicts and bypass the unit of work: no ORM
+    # objects are built and no flush events fire. Python-side column defaults
+    # still apply.
+
+    async def bulk_create(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        returning: Sequence[str] = (),
+    ) -> List[Row]:
+        """
+        Insert ``rows`` as multi-row INSERTs of up to ``chunk_size`` rows.
+        Returns an ``(id, *returning)`` row per record in no particular order;
+        asking for parameter order would force SQLite back to one INSERT per
+        row, so match results up by a natural key (e.g. ``returning=("email",)``).
+        """
+        return await self._insert_many(insert(self.model), rows, chunk_size, returning)
+
+    async def bulk_update(
+        self, rows: Sequence[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> None:
+        """
+        Update rows by primary key; every dict must contain ``id``. Each chunk
+        is a single executemany of one prepared UPDATE.
+        """
+        for batch in _batches(rows, chunk_size):
+            await self.db.execute(update(self.model), batch)
+
+    async def upsert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        on_conflict: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+        returning: Sequence[str] = (),
+    ) -> List[Row]:
+        """
+        INSERT ... ON CONFLICT (``on_conflict``) in multi-row chunks.
+        Conflicting rows get ``update_columns`` overwritten from the new
+        values (default: every supplied column except the key and ``id``);
+        pass ``update_columns=()`` to leave them untouched. Returns
+        ``(id, *returning)`` for the rows inserted or updated.
+        """
+        stmt = upsert_insert(self.db.get_bind().dialect.name, self.model)
+        if update_columns is None:
+            keys = set().union(*rows) if rows else set()
+            update_columns = sorted(keys - set(on_conflict) - {"id"})
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(on_conflict),
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(on_conflict))
+        return await self._insert_many(stmt, rows, chunk_size, returning)
+
+    async def _insert_many(
+        self,
+        stmt: Insert,
+        rows: Sequence[Dict[str, Any]],
+        chunk_size: Optional[int],
+        returning: Sequence[str],
+    ) -> List[Row]:
+        # RETURNING makes SQLAlchemy render each chunk as one multi-row
+        # VALUES list instead of a driver-level executemany
+        stmt = stmt.returning(
+            self.model.id, *(getattr(self.model, column) for column in returning)
+        )
+        results: List[Row] = []
+        for batch in _batches(rows, chunk_size):
+            result = await self.db.execute(stmt, batch)
+            results.extend(result.all())
+        return results
@@ -1,73 +1,185 @@
+import base64
+import json
+from datetime import datetime
 from typing import Optional, Sequence
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, select, update, func, and_, literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Book, Review, BookGenre
 from app.repositories.base import BaseRepository
+from app.repositories.search import BookSearchBackend, get_search_backend
+
+
+def encode_cursor(key: tuple[datetime, int]) -> str:
+    """Opaque, URL-safe cursor for a (created_at, id) keyset position."""
+    created_at, book_id = key
+    raw = json.dumps([created_at.isoformat(), book_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, book_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(book_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
 
 
 class BookRepository(BaseRepository[Book]):
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, db: AsyncSession, search_backend: Optional[BookSearchBackend] = None
+    ):
         super().__init__(Book, db)
+        self._search_backend = search_backend
+
+    @property
+    def search_backend(self) -> BookSearchBackend:
+        if self._search_backend is None:
+            self._search_backend = get_search_backend(self.db.bind.dialect.name)
+        return self._search_backend
 
     async def get_with_owner(self, book_id: int) -> Optional[Book]:
         result = await self.db.execute(
-            select(Book).options(selectinload(Book.owner)).where(Book.id == book_id)
+            select(Book).options(joinedload(Book.owner)).where(Book.id == book_id)
         )
         return result.scalar_one_or_none()
 
-    async def search(
+    def _apply_search(
         self,
+        stmt: Select,
         query: Optional[str] = None,
         genre: Optional[BookGenre] = None,
         available_only: bool = False,
         owner_id: Optional[int] = None,
-        skip: int = 0,
-        limit: int = 20,
-    ) -> tuple[Sequence[Book], int]:
-        filters = []
-
+    ) -> tuple[Select, Optional[ColumnElement]]:
+        rank = None
         if query:
-            filters.append(
-                or_(
-                    Book.title.ilike(f"%{query}%"),
-                    Book.author.ilike(f"%{query}%"),
-                )
-            )
+            stmt, rank = self.search_backend.apply(stmt, query)
+
+        filters = []
         if genre:
             filters.append(Book.genre == genre)
         if available_only:
             filters.append(Book.is_available_for_exchange)
         if owner_id:
             filters.append(Book.owner_id == owner_id)
-
-        base_q = select(Book).options(selectinload(Book.owner))
         if filters:
-            base_q = base_q.where(and_(*filters))
+            stmt = stmt.where(and_(*filters))
+        return stmt, rank
+
+    async def count_matching(
+        self,
+        query: Optional[str] = None,
+        genre: Optional[BookGenre] = None,
+        available_only: bool = False,
+        owner_id: Optional[int] = None,
+    ) -> int:
+        count_q, _ = self._apply_search(
+            select(func.count(Book.id)).select_from(Book),
+            query,
+            genre,
+            available_only,
+            owner_id,
+        )
+        result = await self.db.execute(count_q)
+        return result.scalar_one()
 
-        total_result = await self.db.execute(
-            select(func.count()).select_from(base_q.subquery())
+    async def search(
+        self,
+        query: Optional[str] = None,
+        genre: Optional[BookGenre] = None,
+        available_only: bool = False,
+        owner_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> tuple[Sequence[Book], int]:
+        """Offset page; text queries are ordered by relevance, then newest first."""
+        base_q, rank = self._apply_search(
+            select(Book).options(selectinload(Book.owner)),
+            query,
+            genre,
+            available_only,
+            owner_id,
         )
-        total = total_result.scalar_one()
 
+        total = await self.count_matching(query, genre, available_only, owner_id)
+
+        order_by = [Book.created_at.desc(), Book.id.desc()]
+        if rank is not None:
+            order_by.insert(0, rank.desc())
         result = await self.db.execute(
-            base_q.order_by(Book.created_at.desc()).offset(skip).limit(limit)
+            base_q.order_by(*order_by).offset(skip).limit(limit)
         )
         return result.scalars().all(), total
 
-    async def get_average_rating(self, book_id: int) -> Optional[float]:
-        result = await self.db.execute(
-            select(func.avg(Review.rating)).where(Review.book_id == book_id)
+    async def search_after(
+        self,
+        query: Optional[str] = None,
+        genre: Optional[BookGenre] = None,
+        available_only: bool = False,
+        owner_id: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+        limit: int = 20,
+    ) -> tuple[Sequence[Book], Optional[tuple[datetime, int]]]:
+        """
+        Keyset page ordered by (created_at, id) descending.
+        Text queries still use the search backend for filtering, but not for ordering.
+        Returns the books and the key of the last one if more rows follow.
+        """
+        page_q, _ = self._apply_search(
+            select(Book).options(selectinload(Book.owner)),
+            query,
+            genre,
+            available_only,
+            owner_id,
         )
-        val = result.scalar_one_or_none()
-        return round(float(val), 2) if val else None
+        if after:
+            created_at, book_id = after
+            page_q = page_q.where(
+                tuple_(Book.created_at, Book.id)
+                < tuple_(literal(created_at, Book.created_at.type), book_id)
+            )
 
-    async def get_review_count(self, book_id: int) -> int:
         result = await self.db.execute(
-            select(func.count()).where(Review.book_id == book_id)
+            page_q.order_by(Book.created_at.desc(), Book.id.desc()).limit(limit + 1)
+        )
+        books = result.scalars().all()
+        if len(books) <= limit:
+            return books, None
+        books = books[:limit]
+        return books, (books[-1].created_at, books[-1].id)
+
+    async def apply_rating_change(
+        self, book_id: int, rating_delta: int, count_delta: int = 0
+    ) -> None:
+        """Adjust the denormalized rating stats with one atomic UPDATE."""
+        await self.db.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(
+                rating_sum=Book.rating_sum + rating_delta,
+                review_count=Book.review_count + count_delta,
+            )
+        )
+
+    async def recalculate_rating_stats(self) -> None:
+        """Rebuild rating_sum/review_count from the reviews table (seeding, repair)."""
+        await self.db.execute(
+            update(Book)
+            .values(
+                rating_sum=select(func.coalesce(func.sum(Review.rating), 0))
+                .where(Review.book_id == Book.id)
+                .scalar_subquery(),
+                review_count=select(func.count(Review.id))
+                .where(Review.book_id == Book.id)
+                .scalar_subquery(),
+            )
+            .execution_options(synchronize_session=False)
         )
-        return result.scalar_one()
 
     async def get_by_owner(self, owner_id: int) -> Sequence[Book]:
         result = await self.db.execute(
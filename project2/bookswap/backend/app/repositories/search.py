@@ -0,0 +1,121 @@
+"""
+Pluggable search backends for the books catalog.
+A backend narrows a select by the user's query and provides a relevance
+expression (higher is better) that BookRepository can order by.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+from sqlalchemy import Select, func, literal_column, or_, table, column
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models import Book
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MAX_TOKENS = 8
+
+
+def tokenize(query: str) -> list[str]:
+    """Split a free-text query into safe word tokens for the FTS engines."""
+    return _TOKEN_RE.findall(query.lower())[:_MAX_TOKENS]
+
+
+class BookSearchBackend(ABC):
+    """Strategy interface for title/author search."""
+
+    name: str = ""
+
+    @abstractmethod
+    def apply(
+        self, stmt: Select, query: str
+    ) -> tuple[Select, Optional[ColumnElement]]:
+        """Filter ``stmt`` by ``query``; return it with a rank expression or None."""
+
+
+class IlikeSearchBackend(BookSearchBackend):
+    """Substring match with ILIKE; works everywhere but scans the table."""
+
+    name = "ilike"
+
+    def apply(self, stmt, query):
+        return (
+            stmt.where(
+                or_(
+                    Book.title.ilike(f"%{query}%"),
+                    Book.author.ilike(f"%{query}%"),
+                )
+            ),
+            None,
+        )
+
+
+class PostgresFullTextBackend(BookSearchBackend):
+    """tsvector search served by the ix_books_search GIN expression index."""
+
+    name = "postgresql"
+
+    # Must match the expression of ix_books_search exactly for the index to be used
+    document = func.to_tsvector(
+        literal_column("'simple'"),
+        Book.title.concat(literal_column("' '")).concat(Book.author),
+    )
+
+    def apply(self, stmt, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return IlikeSearchBackend().apply(stmt, query)
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{t}:*" for t in tokens)
+        )
+        return (
+            stmt.where(self.document.op("@@")(ts_query)),
+            func.ts_rank(self.document, ts_query),
+        )
+
+
+class SQLiteFTS5Backend(BookSearchBackend):
+    """FTS5 search over the books_fts shadow table kept in sync by triggers."""
+
+    name = "sqlite"
+
+    fts = table("books_fts", column("rowid"))
+
+    def apply(self, stmt, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return IlikeSearchBackend().apply(stmt, query)
+        match = " ".join(f'"{t}"*' for t in tokens)
+        return (
+            stmt.join(self.fts, self.fts.c.rowid == Book.id).where(
+                literal_column("books_fts").op("MATCH")(match)
+            ),
+            # bm25() is lower-is-better
+            -func.bm25(literal_column("books_fts")),
+        )
+
+
+SEARCH_BACKENDS: Dict[str, Type[BookSearchBackend]] = {
+    IlikeSearchBackend.name: IlikeSearchBackend,
+    PostgresFullTextBackend.name: PostgresFullTextBackend,
+    SQLiteFTS5Backend.name: SQLiteFTS5Backend,
+}
+
+
+def get_search_backend(dialect_name: str) -> BookSearchBackend:
+    """
+    Resolve the backend from ``settings.search_backend``:
+    "auto" picks the native full-text engine of the dialect, "fts" forces it,
+    and "ilike" keeps the portable substring search.
+    """
+    choice = settings.search_backend
+    if choice == "ilike":
+        return IlikeSearchBackend()
+    backend_class = SEARCH_BACKENDS.get(dialect_name)
+    if backend_class is None:
+        if choice == "fts":
+            raise ValueError(f"No full-text search backend for {dialect_name}")
+        return IlikeSearchBackend()
+    return backend_class()
@@ -117,10 +117,24 @@ class BookResponse(BaseModel):
 
 class BookListResponse(BaseModel):
     items: list[BookResponse]
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
-    pages: int
+    pages: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class BookImportError(BaseModel):
+    line: int
+    error: str
+
+
+class BookImportResult(BaseModel):
+    imported: int
+    duplicates: int
+    invalid: int
+    errors: list[BookImportError]
+    errors_truncated: bool = False
 
 
 #  Review
@@ -209,6 +223,7 @@ class MessageResponse(BaseModel):
 
 
 class RecommendationResponse(BaseModel):
+    book_id: Optional[int] = None  # set when the book is in our catalog
     title: str
     author: str
     genre: str
@@ -7,11 +7,14 @@ from typing import Sequence
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.versions import mark_changed
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    PasswordHasherBusy,
     create_access_token,
     create_refresh_token,
+    password_hasher,
 )
 from app.models import (
     User,
@@ -19,11 +22,10 @@ from app.models import (
     Review,
     Exchange,
     WishlistItem,
-    Message,
     ExchangeStatus,
     Friendship,
 )
-from app.repositories.book import BookRepository
+from app.repositories.book import BookRepository, encode_cursor, decode_cursor
 from app.repositories import (
     UserRepository,
     ReviewRepository,
@@ -32,7 +34,8 @@ from app.repositories import (
     MessageRepository,
     FriendshipRepository,
 )
-from app.core.observer import event_manager, Event, EventType
+from app.core.observer import event_manager, notify_after_commit, Event, EventType
+from app.services.message_buffer import MessageWriteBuffer, message_buffer
 from app.schemas import (
     UserRegister,
     UserUpdate,
@@ -63,13 +66,14 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Username already taken")
 
         # Create new user
+        hashed_password = await self._hash_off_loop(
+            password_hasher.hash(user_data.password)
+        )
         user = User(
             email=user_data.email,
             username=user_data.username,
             full_name=user_data.full_name,
-            hashed_password=get_password_hash(user_data.password),
-            bio=user_data.bio,
-            city=user_data.city,
+            hashed_password=hashed_password,
         )
         created_user = await self.user_repo.create(user)
 
@@ -87,23 +91,29 @@ class AuthService:
         )
 
         # Generate tokens
-        access_token = create_access_token(created_user.id)
-        refresh_token = create_refresh_token(created_user.id)
-
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "user": created_user,
-        }
+        return {**self._make_tokens(created_user), "user": created_user}
 
     async def login(self, email: str, password: str) -> dict:
         user = await self.user_repo.get_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await self._hash_off_loop(
+            password_hasher.verify(password, user.hashed_password)
+        ):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         if not user.is_active:
             raise HTTPException(status_code=403, detail="Account is disabled")
         return self._make_tokens(user)
 
+    @staticmethod
+    async def _hash_off_loop(call):
+        try:
+            return await call
+        except PasswordHasherBusy:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
     def _make_tokens(self, user: User) -> dict:
         payload = {"sub": str(user.id), "email": user.email}
         return {
@@ -129,11 +139,21 @@ class UserService:
     async def update_profile(self, user: User, data: UserUpdate) -> User:
         for field, value in data.model_dump(exclude_none=True).items():
             setattr(user, field, value)
+        # Owner details are embedded in book responses
+        mark_changed(self.user_repo.db, "users")
+        notify_after_commit(
+            self.user_repo.db, Event(EventType.USER_UPDATED, {"user_id": user.id})
+        )
         return await self.user_repo.update(user)
 
 
 # ─── Book Service ─────────────────────────────────────────────────────────────
 
+# Totals for cursor-paginated catalog browsing, keyed by normalized filters
+_catalog_count_cache = TTLCache(
+    maxsize=256, ttl=settings.catalog_count_cache_ttl_seconds
+)
+
 
 class BookService:
     def __init__(self, db: AsyncSession):
@@ -147,22 +167,50 @@ class BookService:
 
     async def create_book(self, data: BookCreate, owner_id: int) -> Book:
         book = Book(**data.model_dump(), owner_id=owner_id)
-        return await self.book_repo.create(book)
+        mark_changed(self.book_repo.db, "books")
+        created_book = await self.book_repo.create(book)
+        self._notify(EventType.BOOK_CREATED, created_book)
+        return created_book
 
     async def update_book(self, book_id: int, data: BookUpdate, user_id: int) -> Book:
         book = await self.get_book(book_id)
         if book.owner_id != user_id:
             raise HTTPException(status_code=403, detail="Not your book")
+        previous = {
+            "genre": book.genre.value,
+            "is_available_for_exchange": book.is_available_for_exchange,
+        }
         for field, value in data.model_dump(exclude_none=True).items():
             setattr(book, field, value)
-        return await self.book_repo.update(book)
+        mark_changed(self.book_repo.db, "books")
+        updated_book = await self.book_repo.update(book)
+        self._notify(EventType.BOOK_UPDATED, updated_book, previous=previous)
+        return updated_book
 
     async def delete_book(self, book_id: int, user_id: int) -> None:
         book = await self.get_book(book_id)
         if book.owner_id != user_id:
             raise HTTPException(status_code=403, detail="Not your book")
+        mark_changed(self.book_repo.db, "books")
+        self._notify(EventType.BOOK_DELETED, book)
         await self.book_repo.delete(book)
 
+    def _notify(self, event_type: EventType, book: Book, **extra) -> None:
+        # Emitted on commit so observers (e.g. the catalog cache) see the write
+        notify_after_commit(
+            self.book_repo.db,
+            Event(
+                event_type,
+                {
+                    "book_id": book.id,
+                    "owner_id": book.owner_id,
+                    "genre": book.genre.value,
+                    "is_available_for_exchange": book.is_available_for_exchange,
+                    **extra,
+                },
+            ),
+        )
+
     async def search_books(
         self,
         query=None,
@@ -173,20 +221,41 @@ class BookService:
         page_size=20,
     ):
         skip = (page - 1) * page_size
-        books, total = await self.book_repo.search(
+        # Rating stats are stored on the book row, no per-page enrichment needed
+        return await self.book_repo.search(
             query, genre, available_only, owner_id, skip, page_size
         )
 
-        # Enrich with ratings
-        enriched = []
-        for book in books:
-            avg = await self.book_repo.get_average_rating(book.id)
-            count = await self.book_repo.get_review_count(book.id)
-            book.average_rating = avg
-            book.review_count = count
-            enriched.append(book)
+    async def browse_books(
+        self,
+        query=None,
+        genre=None,
+        available_only=False,
+        owner_id=None,
+        cursor=None,
+        page_size=20,
+        include_total=True,
+    ):
+        """Keyset pagination: returns (books, next_cursor, total or None)."""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        books, last_key = await self.book_repo.search_after(
+            query, genre, available_only, owner_id, after, page_size
+        )
+        next_cursor = encode_cursor(last_key) if last_key else None
+
+        total = None
+        if include_total:
+            key = (query or None, genre, bool(available_only), owner_id)
+            total = _catalog_count_cache.get(key)
+            if total is None:
+                total = await self.book_repo.count_matching(*key)
+                _catalog_count_cache.set(key, total)
 
-        return enriched, total
+        return books, next_cursor, total
 
 
 # ─── Review Service ───────────────────────────────────────────────────────────
@@ -209,7 +278,14 @@ class ReviewService:
         if not book:
             raise HTTPException(status_code=404, detail="Book not found")
         review = Review(**data.model_dump(), user_id=user_id)
-        return await self.review_repo.create(review)
+        # Reviews move the rating stats stored on the book row
+        mark_changed(self.review_repo.db, "reviews", "books")
+        created_review = await self.review_repo.create(review)
+        await self.book_repo.apply_rating_change(
+            data.book_id, created_review.rating, count_delta=1
+        )
+        self._notify(EventType.REVIEW_CREATED, created_review)
+        return created_review
 
     async def update_review(
         self, review_id: int, data: ReviewUpdate, user_id: int
@@ -219,16 +295,43 @@ class ReviewService:
             raise HTTPException(status_code=404, detail="Review not found")
         if review.user_id != user_id:
             raise HTTPException(status_code=403, detail="Not your review")
+        old_rating = review.rating
         for field, value in data.model_dump(exclude_none=True).items():
             setattr(review, field, value)
-        return await self.review_repo.update(review)
+        mark_changed(self.review_repo.db, "reviews", "books")
+        updated_review = await self.review_repo.update(review)
+        if updated_review.rating != old_rating:
+            await self.book_repo.apply_rating_change(
+                review.book_id, updated_review.rating - old_rating
+            )
+        self._notify(EventType.REVIEW_UPDATED, updated_review)
+        return updated_review
 
     async def delete_review(self, review_id: int, user_id: int) -> None:
         review = await self.review_repo.get(review_id)
         if not review or review.user_id != user_id:
             raise HTTPException(status_code=403, detail="Not allowed")
+        mark_changed(self.review_repo.db, "reviews", "books")
+        await self.book_repo.apply_rating_change(
+            review.book_id, -review.rating, count_delta=-1
+        )
+        self._notify(EventType.REVIEW_DELETED, review)
         await self.review_repo.delete(review)
 
+    def _notify(self, event_type: EventType, review: Review) -> None:
+        notify_after_commit(
+            self.review_repo.db,
+            Event(
+                event_type,
+                {
+                    "review_id": review.id,
+                    "book_id": review.book_id,
+                    "user_id": review.user_id,
+                    "rating": review.rating,
+                },
+            ),
+        )
+
     async def get_book_reviews(
         self, book_id: int, skip=0, limit=20
     ) -> Sequence[Review]:
@@ -243,9 +346,7 @@ class ExchangeService:
         self.exchange_repo = ExchangeRepository(db)
         self.book_repo = BookRepository(db)
 
-    async def create_exchange(
-        self, data: ExchangeCreate, requester_id: int
-    ) -> Exchange:
+    async def create_exchange(self, data: ExchangeCreate, requester_id: int) -> dict:
         requested_book = await self.book_repo.get(data.requested_book_id)
         if not requested_book:
             raise HTTPException(status_code=404, detail="Requested book not found")
@@ -293,7 +394,7 @@ class ExchangeService:
 
     async def update_status(
         self, exchange_id: int, new_status: ExchangeStatus, user_id: int
-    ) -> Exchange:
+    ) -> dict:
         exchange = await self.exchange_repo.get(exchange_id)
         if not exchange:
             raise HTTPException(status_code=404, detail="Exchange not found")
@@ -334,15 +435,19 @@ class ExchangeService:
 class WishlistService:
     def __init__(self, db: AsyncSession):
         self.wishlist_repo = WishlistRepository(db)
+        self.book_repo = BookRepository(db)
 
     async def add_to_wishlist(self, user_id: int, book_id: int) -> WishlistItem:
         existing = await self.wishlist_repo.get_item(user_id, book_id)
         if existing:
             raise HTTPException(status_code=400, detail="Already in wishlist")
-        item = WishlistItem(user_id=user_id, book_id=book_id)
-        await self.wishlist_repo.create(item)
-        items = await self.wishlist_repo.get_user_wishlist(user_id)
-        return next(i for i in items if i.book_id == book_id)
+        # The response embeds the book and its owner; load just that
+        book = await self.book_repo.get_with_owner(book_id)
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found")
+        return await self.wishlist_repo.create(
+            WishlistItem(user_id=user_id, book_id=book_id, book=book)
+        )
 
     async def remove_from_wishlist(self, user_id: int, book_id: int) -> None:
         item = await self.wishlist_repo.get_item(user_id, book_id)
@@ -358,40 +463,32 @@ class WishlistService:
 
 
 class ChatService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, buffer: MessageWriteBuffer = None):
         self.message_repo = MessageRepository(db)
         self.exchange_repo = ExchangeRepository(db)
+        self.buffer = buffer or message_buffer
 
-    async def send_message(
-        self, exchange_id: int, sender_id: int, data: MessageCreate
-    ) -> Message:
+    async def ensure_participant(self, exchange_id: int, user_id: int) -> Exchange:
         exchange = await self.exchange_repo.get(exchange_id)
         if not exchange:
             raise HTTPException(status_code=404, detail="Exchange not found")
-        if sender_id not in (exchange.requester_id, exchange.owner_id):
+        if user_id not in (exchange.requester_id, exchange.owner_id):
             raise HTTPException(
                 status_code=403, detail="Not participant of this exchange"
             )
-        msg = Message(
-            exchange_id=exchange_id, sender_id=sender_id, content=data.content
-        )
-        created_message = await self.message_repo.create(msg)
+        return exchange
 
-        # Emit message sent event
-        await event_manager.notify(
-            Event(
-                EventType.MESSAGE_SENT,
-                {
-                    "message_id": created_message.id,
-                    "exchange_id": exchange_id,
-                    "sender_id": sender_id,
-                    "content": data.content,
-                    "created_at": created_message.created_at.isoformat(),
-                },
+    async def send_message(
+        self, exchange_id: int, sender_id: int, data: MessageCreate
+    ) -> dict:
+        """Save through the write-behind buffer; returns once the batch committed."""
+        await self.ensure_participant(exchange_id, sender_id)
+        try:
+            return await self.buffer.submit(exchange_id, sender_id, data.content)
+        except Exception:
+            raise HTTPException(
+                status_code=503, detail="Message could not be saved, try again"
             )
-        )
-
-        return created_message
 
     async def get_messages(self, exchange_id: int, user_id: int):
         exchange = await self.exchange_repo.get(exchange_id)
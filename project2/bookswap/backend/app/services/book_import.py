@@ -0,0 +1,265 @@
+"""
+Streaming book import from CSV or NDJSON uploads.
+The request body is decoded and parsed record by record as it arrives. Rows
+are validated against ``BookCreate``, collected into batches and written with
+one ``INSERT ... ON CONFLICT (isbn) DO NOTHING`` per batch, so an ISBN that is
+already in the catalog (or earlier in the file) is reported as a duplicate
+instead of failing the upload. Memory stays bounded by one batch, one record
+and the capped error list, whatever the file size.
+"""
+
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.observer import Event, EventType, notify_after_commit
+from app.core.versions import mark_changed
+from app.repositories.book import BookRepository
+from app.schemas import BookCreate
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# (line number, parsed fields or None, parse error or None)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def import_format(content_type: Optional[str]) -> str:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="Upload books as text/csv or application/x-ndjson",
+        )
+    return CONTENT_TYPES[media_type]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Decode UTF-8 (BOM allowed) incrementally and yield numbered lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                line_no += 1
+                yield line_no, line.rstrip("\r")
+            if len(pending) > settings.book_import_max_record_bytes:
+                raise HTTPException(
+                    status_code=413, detail=f"Line {line_no + 1} is too long"
+                )
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload is not valid UTF-8")
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+def _ends_in_quoted_field(line: str, in_quotes: bool) -> bool:
+    """
+    Scan one line the way ``csv.reader`` does: a quote opens a quoted field
+    only at the start of a field, ``""`` inside one is an escaped quote, and
+    a bare quote in an unquoted field (``12" Vinyl``) is a literal.
+    """
+    if not in_quotes and '"' not in line:
+        return False
+    field_start = not in_quotes
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_quotes:
+            if char == '"':
+                if line[i + 1:i + 2] == '"':
+                    i += 1
+                else:
+                    in_quotes = False
+        elif char == ",":
+            field_start = True
+        else:
+            in_quotes = char == '"' and field_start
+            field_start = False
+        i += 1
+    return in_quotes
+
+
+async def iter_csv_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[Record]:
+    """
+    CSV records keyed by the header row. A quoted field may span lines; a
+    record is complete once a line ends outside of any quoted field.
+    """
+    header: Optional[List[str]] = None
+    record, start, in_quotes = "", 0, False
+    async for line_no, line in lines:
+        if not record:
+            start = line_no
+        record = f"{record}\n{line}" if record else line
+        in_quotes = _ends_in_quoted_field(line, in_quotes)
+        if in_quotes:
+            if len(record) > settings.book_import_max_record_bytes:
+                raise HTTPException(
+                    status_code=413, detail=f"Record on line {start} is too long"
+                )
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not given", so BookCreate defaults apply
+        yield start, {
+            name: value.strip() for name, value in zip(header, values) if value.strip()
+        }, None
+    if record:
+        yield start, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[Tuple[int, str]]
+) -> AsyncIterator[Record]:
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(value, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, value, None
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class ImportReport:
+    """Counters plus the first ``book_import_max_errors`` per-row errors."""
+
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[dict] = []
+        self.errors_truncated = False
+        # (genre, is_available_for_exchange) pairs written, for cache eviction
+        self.attributes: Set[Tuple[str, bool]] = set()
+
+    def error(self, line: int, message: str) -> None:
+        if len(self.errors) < settings.book_import_max_errors:
+            self.errors.append({"line": line, "error": message})
+        else:
+            self.errors_truncated = True
+
+    def duplicate(self, line: int, isbn: str) -> None:
+        self.duplicates += 1
+        self.error(line, f"Duplicate ISBN {isbn}")
+
+    def to_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+class BookImportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.book_repo = BookRepository(db)
+
+    async def import_books(
+        self, chunks: AsyncIterator[bytes], content_type: Optional[str], owner_id: int
+    ) -> dict:
+        if import_format(content_type) == "csv":
+            records = iter_csv_records(iter_lines(chunks))
+        else:
+            records = iter_ndjson_records(iter_lines(chunks))
+        report = ImportReport()
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for line, fields, error in records:
+            if error is None:
+                try:
+                    book = BookCreate.model_validate(fields)
+                except ValidationError as exc:
+                    error = _validation_message(exc)
+            if error is not None:
+                report.invalid += 1
+                report.error(line, error)
+                continue
+            row = book.model_dump()
+            row["isbn"] = (row["isbn"] or "").strip() or None
+            row["owner_id"] = owner_id
+            batch.append((line, row))
+            if len(batch) >= settings.book_import_batch_size:
+                await self._write(batch, report)
+                batch = []
+        if batch:
+            await self._write(batch, report)
+
+        if report.imported:
+            mark_changed(self.db, "books")
+            notify_after_commit(
+                self.db,
+                Event(
+                    EventType.BOOKS_IMPORTED,
+                    {
+                        "owner_id": owner_id,
+                        "count": report.imported,
+                        "attributes": sorted(report.attributes),
+                    },
+                ),
+            )
+        return report.to_dict()
+
+    async def _write(
+        self, batch: List[Tuple[int, Dict[str, Any]]], report: ImportReport
+    ) -> None:
+        # Repeats inside the batch never reach the database; repeats of
+        # earlier batches or existing books are skipped by ON CONFLICT
+        rows, lines = [], {}
+        for line, row in batch:
+            isbn = row["isbn"]
+            if isbn is not None and isbn in lines:
+                report.duplicate(line, isbn)
+                continue
+            if isbn is not None:
+                lines[isbn] = line
+            rows.append(row)
+
+        inserted = await self.book_repo.upsert(
+            rows, on_conflict=("isbn",), update_columns=(), returning=("isbn",)
+        )
+        report.imported += len(inserted)
+        for _, isbn in inserted:
+            lines.pop(isbn, None)
+        for isbn, line in lines.items():
+            report.duplicate(line, isbn)
+        report.attributes.update(
+            (row["genre"].value, row["is_available_for_exchange"]) for row in rows
+        )
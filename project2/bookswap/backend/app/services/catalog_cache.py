@@ -0,0 +1,312 @@
+"""
+Response cache for the public catalog listing.
+Serialized ``GET /api/books`` pages for common filter combinations (no text
+search, first pages only) are kept as JSON bytes in an LRU bounded by total
+size. Committed book, review and profile events evict exactly the entries
+they can affect: pages whose filters match the book (its totals and ordering
+change), pages that contain the book, or pages listing the user's books.
+Evictions run inside the commit and are broadcast to the other workers; a
+worker that misses a broadcast drops its pages once its table versions sync.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.observer import Event, EventType, on_commit
+from app.core.pubsub import PubSub
+from app.core.versions import table_versions
+
+CATALOG_CHANNEL = "catalog_invalidations"
+
+# Tables embedded in catalog pages (see catalog_etag in the routes)
+CATALOG_TABLES = frozenset({"books", "reviews", "users"})
+
+# (genre value or None, available_only, owner_id)
+Filters = Tuple[Optional[str], bool, Optional[int]]
+
+
+class CachedPage:
+    __slots__ = ("body", "headers", "filters", "book_ids", "owner_ids", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        headers: Dict[str, str],
+        filters: Filters,
+        book_ids: FrozenSet[int],
+        owner_ids: FrozenSet[int],
+        expires_at: float,
+    ):
+        self.body = body
+        self.headers = headers
+        self.filters = filters
+        self.book_ids = book_ids
+        self.owner_ids = owner_ids
+        self.expires_at = expires_at
+
+    def matches(self, genre: str, available: bool, owner_id: int) -> bool:
+        """Could a book with these attributes appear under this page's filters?"""
+        filter_genre, available_only, filter_owner = self.filters
+        return (
+            (filter_genre is None or filter_genre == genre)
+            and (not available_only or available)
+            and (filter_owner is None or filter_owner == owner_id)
+        )
+
+
+class CatalogResponseCache:
+    """LRU of serialized catalog pages with a byte budget and targeted eviction."""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._pages: "OrderedDict[Hashable, CachedPage]" = OrderedDict()
+        self.size_bytes = 0
+        # Bumped by every invalidation; a fill that started before one is
+        # dropped, since it may have read the data being invalidated
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.rejected_fills = 0
+
+    def get(self, key: Hashable) -> Optional[CachedPage]:
+        page = self._pages.get(key)
+        if page is None or page.expires_at <= time.monotonic():
+            if page is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._pages.move_to_end(key)
+        self.hits += 1
+        return page
+
+    def set(
+        self,
+        key: Hashable,
+        body: bytes,
+        headers: Dict[str, str],
+        filters: Filters,
+        books: Iterable[Any],
+        generation: int,
+    ) -> None:
+        """Store a page unless an invalidation happened since ``generation``."""
+        if generation != self.generation or len(body) > self.max_bytes:
+            self.rejected_fills += 1
+            return
+        books = list(books)
+        if key in self._pages:
+            self._remove(key)
+        self._pages[key] = CachedPage(
+            body,
+            dict(headers),
+            filters,
+            frozenset(book.id for book in books),
+            frozenset(book.owner_id for book in books),
+            time.monotonic() + self.ttl,
+        )
+        self.size_bytes += len(body)
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._pages))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        page = self._pages.pop(key)
+        self.size_bytes -= len(page.body)
+
+    def invalidate_where(self, predicate) -> int:
+        self.generation += 1
+        stale = [key for key, page in self._pages.items() if predicate(page)]
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_book(self, book_id: int, *attributes: Tuple[str, bool, int]) -> int:
+        """Evict pages containing the book or whose filters match it."""
+        return self.invalidate_where(
+            lambda page: book_id in page.book_ids
+            or any(page.matches(*attrs) for attrs in attributes)
+        )
+
+    def invalidate_owner(self, user_id: int) -> int:
+        return self.invalidate_where(lambda page: user_id in page.owner_ids)
+
+    def apply(self, invalidation: Dict[str, Any]) -> int:
+        """Evict the pages described by an ``invalidation_for`` dict."""
+        kind = invalidation["kind"]
+        if kind == "book":
+            return self.invalidate_book(
+                invalidation["book_id"], *map(tuple, invalidation["attributes"])
+            )
+        if kind == "import":
+            owner_id = invalidation["owner_id"]
+            return self.invalidate_where(
+                lambda page: any(
+                    page.matches(genre, available, owner_id)
+                    for genre, available in invalidation["attributes"]
+                )
+            )
+        return self.invalidate_owner(invalidation["user_id"])
+
+    def clear(self) -> None:
+        self.invalidate_where(lambda page: True)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.catalog_cache_enabled,
+            "entries": len(self._pages),
+            "bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "rejected_fills": self.rejected_fills,
+        }
+
+
+def invalidation_for(event: Event) -> Optional[Dict[str, Any]]:
+    """JSON-safe description of the pages ``event`` makes stale, if any."""
+    data = event.data
+    if event.event_type in (
+        EventType.BOOK_CREATED,
+        EventType.BOOK_UPDATED,
+        EventType.BOOK_DELETED,
+    ):
+        attributes = [
+            [data["genre"], data["is_available_for_exchange"], data["owner_id"]]
+        ]
+        previous = data.get("previous")
+        if previous:
+            attributes.append(
+                [
+                    previous["genre"],
+                    previous["is_available_for_exchange"],
+                    data["owner_id"],
+                ]
+            )
+        return {"kind": "book", "book_id": data["book_id"], "attributes": attributes}
+    if event.event_type in (
+        EventType.REVIEW_CREATED,
+        EventType.REVIEW_UPDATED,
+        EventType.REVIEW_DELETED,
+    ):
+        # Only the book's rating stats change
+        return {"kind": "book", "book_id": data["book_id"], "attributes": []}
+    if event.event_type == EventType.BOOKS_IMPORTED:
+        return {
+            "kind": "import",
+            "owner_id": data["owner_id"],
+            "attributes": [list(attrs) for attrs in data["attributes"]],
+        }
+    if event.event_type == EventType.USER_UPDATED:
+        return {"kind": "owner", "user_id": data["user_id"]}
+    return None
+
+
+class CatalogCacheInvalidator:
+    """
+    Evicts catalog pages when book, import, review and profile writes commit,
+    and shares the evictions with every worker on ``pubsub``.
+    """
+
+    def __init__(self, cache: CatalogResponseCache):
+        self.cache = cache
+        # Our own broadcasts come back from the bus; they are skipped by origin
+        self.origin = uuid.uuid4().hex
+        self._pubsub: Optional[PubSub] = None
+        self._publishing: Set[asyncio.Task] = set()
+        self.publish_failures = 0
+
+    def on_commit(self, event: Event) -> None:
+        invalidation = invalidation_for(event)
+        if invalidation is None:
+            return
+        self.cache.apply(invalidation)
+        if self._pubsub is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # committed outside the event loop
+            return
+        task = loop.create_task(self._publish(invalidation))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def _publish(self, invalidation: Dict[str, Any]) -> None:
+        try:
+            delivered = await self._pubsub.publish(
+                CATALOG_CHANNEL, {"origin": self.origin, **invalidation}
+            )
+        except Exception as e:
+            print(f"Catalog invalidation publish error: {e!r}")
+            delivered = False
+        if not delivered:
+            # Other workers drop their pages on their next table versions sync
+            self.publish_failures += 1
+
+    def _on_remote_invalidation(self, message: dict) -> None:
+        if message.get("origin") != self.origin:
+            self.cache.apply(message)
+
+    def on_missed_versions(self, versions: Dict[str, int]) -> None:
+        """A sync caught up on catalog tables: some broadcast may be lost too."""
+        if CATALOG_TABLES.intersection(versions):
+            self.cache.clear()
+
+    async def attach(self, pubsub: PubSub) -> None:
+        self._pubsub = pubsub
+        await pubsub.subscribe(CATALOG_CHANNEL, self._on_remote_invalidation)
+
+    async def detach(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(CATALOG_CHANNEL, self._on_remote_invalidation)
+            self._pubsub = None
+
+
+def catalog_cache_key(
+    cursor: Optional[str],
+    query: Optional[str],
+    genre: Optional[Any],
+    available_only: bool,
+    owner_id: Optional[int],
+    page: int,
+    page_size: int,
+    include_total: bool,
+) -> Optional[Tuple[Hashable, Filters]]:
+    """Normalized (key, filters) for cacheable requests, None otherwise."""
+    if not settings.catalog_cache_enabled or query:
+        return None
+    filters: Filters = (
+        genre.value if genre is not None else None,
+        bool(available_only),
+        owner_id,
+    )
+    if cursor is None:
+        if page > settings.catalog_cache_max_page:
+            return None
+        return ("page", filters, page, page_size), filters
+    if cursor == "":
+        # First keyset page only; later cursors are unbounded
+        return ("cursor", filters, page_size, bool(include_total)), filters
+    return None
+
+
+# Global catalog cache
+catalog_cache = CatalogResponseCache(
+    max_bytes=settings.catalog_cache_max_bytes,
+    ttl=settings.catalog_cache_ttl_seconds,
+)
+catalog_invalidator = CatalogCacheInvalidator(catalog_cache)
+on_commit(catalog_invalidator.on_commit)
+table_versions.on_sync(catalog_invalidator.on_missed_versions)
@@ -0,0 +1,314 @@
+"""
+In-process item-item collaborative filtering over reviews and wishlists.
+A periodic job builds a sparse user×book interaction matrix, computes cosine
+similarity between book columns and keeps the top-K neighbours of every book
+in memory, so /api/recommendations can answer from our own catalog without
+calling the AI API.
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models import Book, BookGenre, Review, WishlistItem
+from app.services.recommendations import GENRE_LABELS
+
+# Wishlisting is a weaker signal than a good review
+WISHLIST_WEIGHT = 0.5
+
+Neighbours = Dict[int, tuple[np.ndarray, np.ndarray]]
+
+
+def interaction_weight(rating: Optional[int]) -> float:
+    """Implicit preference in [0, 1]: 5★ → 1.0, 3★ → 0.33, 1–2★ → 0 (ignored)."""
+    if rating is None:
+        return WISHLIST_WEIGHT
+    return max(rating - 2, 0) / 3
+
+
+def merge_interactions(
+    interactions: Dict[tuple[int, int], float],
+    wishlist: Sequence[tuple[int, int]],
+    reviews: Sequence[tuple[int, int, int]],
+) -> None:
+    """
+    Fold wishlist ``(user_id, book_id)`` and review ``(user_id, book_id,
+    rating)`` rows into ``interactions``, keeping the stronger signal per
+    pair. Zero weights are kept so later rows can still be compared.
+    """
+    for user_id, book_id in wishlist:
+        key = (user_id, book_id)
+        interactions[key] = max(WISHLIST_WEIGHT, interactions.get(key, 0))
+    for user_id, book_id, rating in reviews:
+        key = (user_id, book_id)
+        interactions[key] = max(interaction_weight(rating), interactions.get(key, 0))
+
+
+def build_neighbours(
+    interactions: Dict[tuple[int, int], float], top_k: int
+) -> Neighbours:
+    """
+    Map every book id to its ``top_k`` most similar book ids and cosine scores,
+    both sorted by descending similarity. ``interactions`` maps
+    (user_id, book_id) to a weight; pairs weighing zero are ignored.
+    """
+    interactions = {key: weight for key, weight in interactions.items() if weight > 0}
+    if not interactions:
+        return {}
+
+    keys = np.array(list(interactions.keys()), dtype=np.int64)
+    weights = np.fromiter(interactions.values(), dtype=np.float64)
+    user_ids, user_rows = np.unique(keys[:, 0], return_inverse=True)
+    book_ids, book_cols = np.unique(keys[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (weights, (user_rows, book_cols)), shape=(len(user_ids), len(book_ids))
+    )
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    normalized = matrix @ sparse.diags(1 / norms)
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity = (similarity - sparse.diags(similarity.diagonal())).tocsr()
+    similarity.eliminate_zeros()
+
+    neighbours: Neighbours = {}
+    for col in range(len(book_ids)):
+        start, end = similarity.indptr[col], similarity.indptr[col + 1]
+        if start == end:
+            continue
+        cols = similarity.indices[start:end]
+        scores = similarity.data[start:end]
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k)[:top_k]
+            cols, scores = cols[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        neighbours[int(book_ids[col])] = (book_ids[cols[order]], scores[order])
+    return neighbours
+
+
+class CollaborativeRecommender:
+    """Holds the latest neighbour table and rebuilds it when interactions change."""
+
+    def __init__(self, top_k: Optional[int] = None):
+        self.top_k = top_k or settings.recommender_top_k
+        self.neighbours: Neighbours = {}
+        self.watermark: Optional[tuple] = None
+        self.built_at: Optional[datetime] = None
+        self.rebuilds = 0
+        self.skipped_rebuilds = 0
+        self.incremental_loads = 0
+        # Every (user_id, book_id) pair seen so far, as of ``self.watermark``
+        self._interactions: Dict[tuple[int, int], float] = {}
+
+    #  Model building
+
+    async def _get_watermark(self, db: AsyncSession) -> tuple:
+        reviews = await db.execute(
+            select(func.count(Review.id), func.max(Review.id), func.max(Review.updated_at))
+        )
+        wishlist = await db.execute(
+            select(func.count(WishlistItem.id), func.max(WishlistItem.id))
+        )
+        return tuple(reviews.one()) + tuple(wishlist.one())
+
+    async def _fetch_rows(
+        self, db: AsyncSession, watermark: tuple, after: tuple = (0, 0)
+    ) -> tuple[list, list]:
+        """Wishlist and review rows with ids in (``after``, ``watermark``]."""
+        _, review_max, _, _, wishlist_max = watermark
+        wishlist = await db.execute(
+            select(WishlistItem.user_id, WishlistItem.book_id).where(
+                WishlistItem.id > after[1], WishlistItem.id <= (wishlist_max or 0)
+            )
+        )
+        reviews = await db.execute(
+            select(Review.user_id, Review.book_id, Review.rating).where(
+                Review.id > after[0], Review.id <= (review_max or 0)
+            )
+        )
+        return wishlist.tuples().all(), reviews.tuples().all()
+
+    async def _load_appended(
+        self, db: AsyncSession, watermark: tuple
+    ) -> Optional[tuple[list, list]]:
+        """
+        Rows added since the last build, or None when rows were also updated
+        or deleted and the interactions have to be reloaded from scratch.
+        """
+        if self.watermark is None:
+            return None
+        review_count, _, review_updated, wishlist_count, _ = watermark
+        old_reviews, old_review_max, old_updated, old_wishlist, old_wishlist_max = (
+            self.watermark
+        )
+        if review_updated != old_updated:
+            return None
+        wishlist, reviews = await self._fetch_rows(
+            db, watermark, after=(old_review_max or 0, old_wishlist_max or 0)
+        )
+        # Counts that don't add up mean rows were deleted as well
+        if (
+            old_reviews + len(reviews) != review_count
+            or old_wishlist + len(wishlist) != wishlist_count
+        ):
+            return None
+        return wishlist, reviews
+
+    def _rebuild(
+        self, wishlist: list, reviews: list, incremental: bool
+    ) -> Neighbours:
+        """Merge rows and recompute similarities; runs in a worker thread."""
+        interactions = self._interactions if incremental else {}
+        merge_interactions(interactions, wishlist, reviews)
+        self._interactions = interactions
+        return build_neighbours(interactions, self.top_k)
+
+    async def refresh(self, db: AsyncSession, force: bool = False) -> bool:
+        """
+        Rebuild the neighbour table if reviews or wishlists changed since the
+        last build. New rows are folded into the previous interactions; any
+        update or delete reloads them all. Returns True when a rebuild happened.
+        """
+        watermark = await self._get_watermark(db)
+        if not force and watermark == self.watermark:
+            self.skipped_rebuilds += 1
+            return False
+
+        appended = None if force else await self._load_appended(db, watermark)
+        rows = appended or await self._fetch_rows(db, watermark)
+        # Both the merge and the similarity computation are CPU-bound; keep
+        # them off the event loop
+        try:
+            neighbours = await asyncio.to_thread(
+                self._rebuild, *rows, incremental=appended is not None
+            )
+        except BaseException:
+            # A half-merged dict must not be extended later
+            self.watermark = None
+            raise
+        if appended is not None:
+            self.incremental_loads += 1
+        self.neighbours = neighbours
+        self.watermark = watermark
+        self.built_at = datetime.utcnow()
+        self.rebuilds += 1
+        return True
+
+    async def run_periodic(
+        self, session_factory: async_sessionmaker, interval: float
+    ) -> None:
+        """Refresh forever every ``interval`` seconds; started from the app lifespan."""
+        while True:
+            try:
+                async with session_factory() as db:
+                    await self.refresh(db)
+            except Exception as e:
+                print(f"Recommender refresh error: {e!r}")
+            await asyncio.sleep(interval)
+
+    #  Serving
+
+    def score(self, profile: Dict[int, float]) -> Dict[int, tuple[float, int]]:
+        """
+        Score unseen books for a user profile (book_id → weight). Returns
+        book_id → (score, id of the profile book that contributed most).
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        best_source: Dict[int, tuple[float, int]] = {}
+        for source_id, weight in profile.items():
+            if source_id not in self.neighbours:
+                continue
+            ids, similarities = self.neighbours[source_id]
+            for book_id, similarity in zip(ids.tolist(), similarities.tolist()):
+                if book_id in profile:
+                    continue
+                contribution = weight * similarity
+                scores[book_id] += contribution
+                if contribution > best_source.get(book_id, (0.0, 0))[0]:
+                    best_source[book_id] = (contribution, source_id)
+        return {
+            book_id: (score, best_source[book_id][1]) for book_id, score in scores.items()
+        }
+
+    async def recommend_for_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        count: int = 3,
+        genres: Optional[list[BookGenre]] = None,
+    ) -> list[dict]:
+        """Available books of other users, most similar to what the user liked."""
+        if not self.neighbours:
+            return []
+
+        profile: Dict[int, float] = {}
+        wishlist = await db.execute(
+            select(WishlistItem.book_id).where(WishlistItem.user_id == user_id)
+        )
+        for book_id in wishlist.scalars():
+            profile[book_id] = WISHLIST_WEIGHT
+        reviews = await db.execute(
+            select(Review.book_id, Review.rating).where(Review.user_id == user_id)
+        )
+        for book_id, rating in reviews:
+            profile[book_id] = max(interaction_weight(rating), profile.get(book_id, 0))
+
+        scored = self.score({k: w for k, w in profile.items() if w > 0})
+        if not scored:
+            return []
+
+        sources = {source_id for _, source_id in scored.values()}
+        result = await db.execute(
+            select(Book).where(Book.id.in_(set(scored) | sources))
+        )
+        books = {book.id: book for book in result.scalars()}
+
+        candidates = [
+            books[book_id]
+            for book_id in scored
+            if book_id in books
+            and books[book_id].is_available_for_exchange
+            and books[book_id].owner_id != user_id
+            and (not genres or books[book_id].genre in genres)
+        ]
+        candidates.sort(key=lambda book: (-scored[book.id][0], book.id))
+
+        recommendations = []
+        for book in candidates[:count]:
+            source = books.get(scored[book.id][1])
+            reason = (
+                f"Читачам, яким сподобалася «{source.title}», також подобається ця книга."
+                if source
+                else "Популярна серед читачів зі схожими вподобаннями."
+            )
+            recommendations.append(
+                {
+                    "book_id": book.id,
+                    "title": book.title,
+                    "author": book.author,
+                    "genre": GENRE_LABELS.get(book.genre, book.genre.value),
+                    "reason": reason,
+                    "description": book.description,
+                }
+            )
+        return recommendations
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "books": len(self.neighbours),
+            "top_k": self.top_k,
+            "rebuilds": self.rebuilds,
+            "skipped_rebuilds": self.skipped_rebuilds,
+            "incremental_loads": self.incremental_loads,
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+        }
+
+
+# Global recommender instance
+collaborative_recommender = CollaborativeRecommender()
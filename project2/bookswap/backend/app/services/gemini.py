@@ -0,0 +1,74 @@
+"""
+Async Gemini client shared by all requests.
+One pooled httpx.AsyncClient per process, a semaphore bounding concurrent
+upstream calls and a hard timeout on every call, so slow or unavailable AI
+responses never block the event loop.
+"""
+
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+class GeminiClient:
+    """Pooled, concurrency-limited client for the generateContent endpoint."""
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_connections: Optional[int] = None,
+    ):
+        self.api_url = api_url or settings.gemini_api_url
+        self.api_key = api_key if api_key is not None else settings.gemini_api_key
+        self.timeout = timeout or settings.gemini_timeout_seconds
+        self.max_concurrency = max_concurrency or settings.gemini_max_concurrency
+        self.max_connections = max_connections or settings.gemini_max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def generate(self, prompt: str, max_output_tokens: int = 1000) -> str:
+        """Return the model's text; raises on HTTP errors and timeouts."""
+        client = self._get_client()
+        body = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "maxOutputTokens": max_output_tokens,
+                "temperature": 0.7,
+            },
+        }
+        # The timeout covers waiting for a free slot as well as the call itself
+        async with asyncio.timeout(self.timeout):
+            async with self._semaphore:
+                response = await client.post(
+                    self.api_url, params={"key": self.api_key}, json=body
+                )
+        response.raise_for_status()
+        data = response.json()
+        return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global client instance
+gemini_client = GeminiClient()
@@ -0,0 +1,221 @@
+"""
+Write-behind buffer for chat messages.
+WebSocket and REST messages are queued here and bulk-inserted into
+``messages`` every ``flush_interval_ms`` or ``batch_size`` rows, whichever
+comes first. ``submit`` resolves only after the batch has committed, so a
+sender is never acknowledged for a message that was not saved.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.observer import Event, EventType, event_manager
+from app.db.session import AsyncSessionLocal
+from app.models import Message
+
+_STOP = object()
+
+
+class MessageWriteBuffer:
+    """Batches message inserts from every chat on one background task."""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.batch_size = batch_size or settings.message_batch_size
+        self.flush_interval = (
+            flush_interval_ms or settings.message_flush_interval_ms
+        ) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Metrics
+        self.batches = 0
+        self.messages = 0
+        self.failed_batches = 0
+        self.failed_messages = 0
+        self.max_batch_size = 0
+        self.total_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._fail_orphans()
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.batch_size * 10)
+            self._full = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def _fail_orphans(self) -> None:
+        """Fail messages left in the queue of a writer task that has died."""
+        if self._queue is None:
+            return
+        error = RuntimeError("Message buffer stopped before saving the message")
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _STOP:
+                continue
+            _, future = item
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_exception(error)
+
+    async def submit(self, exchange_id: int, sender_id: int, content: str) -> dict:
+        """Queue a message; returns the saved row once its batch has committed."""
+        self._ensure_running()
+        future = self._loop.create_future()
+        row = {"exchange_id": exchange_id, "sender_id": sender_id, "content": content}
+        await self._queue.put((row, future))
+        if self._queue.qsize() >= self.batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            first = await queue.get()
+            if first is _STOP:
+                return
+            if queue.qsize() + 1 < self.batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, stop = [first], False
+            while len(batch) < self.batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _insert(self, rows: list) -> Dict[tuple, list]:
+        """Insert ``rows`` in one transaction; generated columns by row values."""
+        async with self.session_factory() as session:
+            # One multi-row INSERT ... RETURNING. Rows are matched back to
+            # senders by their values rather than by position, so no
+            # ordering guarantee (or per-row sentinel) is needed.
+            result = await session.execute(
+                insert(Message).returning(
+                    Message.exchange_id,
+                    Message.sender_id,
+                    Message.content,
+                    Message.id,
+                    Message.created_at,
+                    Message.is_read,
+                ),
+                rows,
+            )
+            saved: Dict[tuple, list] = {}
+            for exchange_id, sender_id, content, *generated in result:
+                saved.setdefault((exchange_id, sender_id, content), []).append(
+                    generated
+                )
+            await session.commit()
+        return saved
+
+    async def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        try:
+            saved = await self._insert([row for row, _ in batch])
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Message batch of {len(batch)} failed: {e!r}")
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # One bad row must not fail every chat in the batch: retry the
+            # rows one by one and fail only the ones that still don't save
+            saved, retried = {}, []
+            for item in batch:
+                try:
+                    for key, generated in (await self._insert([item[0]])).items():
+                        saved.setdefault(key, []).extend(generated)
+                except Exception as row_error:
+                    self._fail([item], row_error)
+                else:
+                    retried.append(item)
+            batch = retried
+            if not batch:
+                return
+
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.messages += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.total_flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+
+        for row, future in batch:
+            key = (row["exchange_id"], row["sender_id"], row["content"])
+            message_id, created_at, is_read = saved[key].pop(0)
+            message = {
+                **row,
+                "id": message_id,
+                "created_at": created_at,
+                "is_read": is_read,
+            }
+            if not future.done():
+                future.set_result(message)
+            # Never wait on observers here: with a blocking event queue a slow
+            # observer would stall persistence for every chat
+            event_manager.notify_nowait(
+                Event(
+                    EventType.MESSAGE_SENT,
+                    {
+                        "message_id": message["id"],
+                        "exchange_id": message["exchange_id"],
+                        "sender_id": message["sender_id"],
+                        "content": message["content"],
+                        "created_at": message["created_at"].isoformat(),
+                    },
+                )
+            )
+
+    def _fail(self, batch: list, error: Exception) -> None:
+        self.failed_messages += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the background task."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        self._full.set()
+        await self._task
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "failed_batches": self.failed_batches,
+            "failed_messages": self.failed_messages,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": self.messages / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_flush_ms": (
+                self.total_flush_seconds / self.batches * 1000 if self.batches else 0.0
+            ),
+            "max_flush_ms": self.max_flush_seconds * 1000,
+        }
+
+
+# Global buffer instance
+message_buffer = MessageWriteBuffer()
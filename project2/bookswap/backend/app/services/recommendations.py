@@ -1,8 +1,14 @@
 import json
-import urllib.request
+import re
+import zlib
+from pathlib import Path
+from typing import Optional
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
 from app.models import BookGenre
+from app.services.gemini import GeminiClient, gemini_client
 
 
 GENRE_LABELS = {
@@ -23,19 +29,176 @@ GENRE_LABELS = {
     BookGenre.other: "Інше",
 }
 
-GEMINI_URL = (
-    "https://generativelanguage.googleapis.com/v1beta/models"
-    "/gemini-2.0-flash:generateContent?key={key}"
+
+def parse_genres(labels: list[str]) -> list[BookGenre]:
+    """Map genre labels from the UI (or raw enum values) to BookGenre members."""
+    lookup = {label.lower(): genre for genre, label in GENRE_LABELS.items()}
+    lookup.update({genre.value: genre for genre in BookGenre})
+    genres = [lookup.get(label.strip().lower()) for label in labels]
+    return [genre for genre in genres if genre is not None]
+
+
+# Coalesces concurrent cache misses for the same normalized request
+recommendation_flights = SingleFlight()
+
+# Parsed AI answers keyed by the normalized (genres, read_books, count) request
+_recommendation_cache = TTLCache(
+    maxsize=settings.recommendation_cache_size,
+    ttl=settings.recommendation_cache_ttl_seconds,
+)
+
+
+class FallbackIndex:
+    """
+    Curated books served while the AI API is unavailable, loaded once and
+    indexed by normalized genre token and BookGenre value.
+    """
+
+    _token_re = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self):
+        self.pools: dict[str, list[dict]] = {}
+        self.index: dict[str, list[str]] = {}
+        self.default: list[dict] = []
+
+    @classmethod
+    def load(cls, *paths: Optional[str]) -> "FallbackIndex":
+        """Merge data files in order; later files extend earlier pools."""
+        fallback = cls()
+        for path in paths:
+            if path:
+                fallback.add(json.loads(Path(path).read_text(encoding="utf-8")))
+        return fallback
+
+    def add(self, data: dict) -> None:
+        for pool in data.get("pools", []):
+            name = pool["name"].lower()
+            books = self.pools.setdefault(name, [])
+            books.extend(pool.get("books", []))
+
+            keys = {name, *self._token_re.findall(name)}
+            for value in pool.get("genres", []):
+                genre = BookGenre(value)
+                keys.update({genre.value, GENRE_LABELS[genre].lower()})
+            for key in keys:
+                if name not in self.index.setdefault(key, []):
+                    self.index[key].append(name)
+        self.default.extend(data.get("default", []))
+
+    def lookup(self, genre: str) -> list[str]:
+        """Pool names for one requested genre: whole label first, then its words."""
+        normalized = genre.strip().lower()
+        names: list[str] = []
+        for key in [normalized, *self._token_re.findall(normalized)]:
+            for name in self.index.get(key, []):
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def select(
+        self, favorite_genres: list[str], read_books: list[str], count: int
+    ) -> list[dict]:
+        """
+        Up to ``count`` books from the requested genres, topped up from the
+        default pool. Each pool is rotated by a hash of the request so the
+        same user always gets the same answer while different users don't
+        all see the head of every list.
+        """
+        genres, books, _ = normalize_request(favorite_genres, read_books, count)
+        offset = zlib.crc32(repr((genres, books)).encode())
+
+        pools = [self.pools[name] for genre in genres for name in self.lookup(genre)]
+        pools.append(self.default)
+
+        recommendations: list[dict] = []
+        used_titles: set[str] = set()
+        for pool in pools:
+            for i in range(len(pool)):
+                if len(recommendations) >= count:
+                    return recommendations
+                book = pool[(offset + i) % len(pool)]
+                if book["title"] not in used_titles:
+                    recommendations.append(dict(book))
+                    used_titles.add(book["title"])
+        return recommendations
+
+
+def normalize_request(
+    favorite_genres: list[str], read_books: list[str], count: int
+) -> tuple[tuple[str, ...], tuple[str, ...], int]:
+    """Order- and case-insensitive key for equivalent recommendation requests."""
+    genres = tuple(sorted({g.strip().lower() for g in favorite_genres if g.strip()}))
+    books = tuple(sorted({b.strip() for b in read_books[:10] if b.strip()}))
+    return genres, books, count
+
+
+FALLBACK_DATA_FILE = Path(__file__).resolve().parents[1] / "data" / "fallback_recommendations.json"
+
+fallback_index = FallbackIndex.load(
+    FALLBACK_DATA_FILE, settings.recommendation_fallback_file
 )
 
 
 class RecommendationService:
+    def __init__(
+        self,
+        client: GeminiClient = None,
+        cache: TTLCache = None,
+        flights: SingleFlight = None,
+    ):
+        self.client = client or gemini_client
+        self.cache = cache if cache is not None else _recommendation_cache
+        self.flights = flights or recommendation_flights
+
     async def get_recommendations(
         self,
         favorite_genres: list[str],
         read_books: list[str],
         count: int = 3,
     ) -> list[dict]:
+        key = normalize_request(favorite_genres, read_books, count)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Identical concurrent requests share one upstream call
+        return await self.flights.do(
+            key, lambda: self._fetch(key, favorite_genres, read_books, count)
+        )
+
+    async def _fetch(
+        self,
+        key: tuple,
+        favorite_genres: list[str],
+        read_books: list[str],
+        count: int,
+    ) -> list[dict]:
+        try:
+            raw = await self.client.generate(self._build_prompt(*key))
+        except Exception as e:
+            print(f"AI recommendation error: {e!r}")
+            # Dynamic fallback recommendations based on user preferences
+            return self._get_fallback_recommendations(
+                favorite_genres, read_books, count
+            )
+
+        # Strip markdown fences if present
+        if raw.startswith("```"):
+            raw = raw.split("```")[1]
+            if raw.startswith("json"):
+                raw = raw[4:]
+        raw = raw.strip()
+
+        try:
+            recommendations = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+        self.cache.set(key, recommendations)
+        return recommendations
+
+    def _build_prompt(
+        self, favorite_genres: tuple[str, ...], read_books: tuple[str, ...], count: int
+    ) -> str:
         genres_str = ", ".join(favorite_genres) if favorite_genres else "різні жанри"
         books_str = "; ".join(read_books[:10]) if read_books else "не вказано"
 
@@ -63,229 +226,10 @@ class RecommendationService:
 ]
 
 Обирай книги з різних країн та епох, які точно зацікавлять та розширять світогляд."""
-
-        body = json.dumps(
-            {
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {"maxOutputTokens": 1000, "temperature": 0.7},
-            }
-        ).encode()
-
-        url = GEMINI_URL.format(key=settings.gemini_api_key)
-        req = urllib.request.Request(
-            url,
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-
-        try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = json.loads(resp.read())
-            raw = data["candidates"][0]["content"]["parts"][0]["text"].strip()
-        except Exception as e:
-            print(f"AI recommendation error: {e}")
-            # Dynamic fallback recommendations based on user preferences
-            return self._get_fallback_recommendations(
-                favorite_genres, read_books, count
-            )
-
-        # Strip markdown fences if present
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        raw = raw.strip()
-
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            return []
+        return prompt
 
     def _get_fallback_recommendations(
         self, favorite_genres: list[str], read_books: list[str], count: int = 3
     ) -> list[dict]:
         """Dynamic fallback recommendations based on user preferences"""
-
-        # Genre-based book pools
-        genre_books = {
-            "детектив": [
-                {
-                    "title": "Дівчина з татуюванням дракона",
-                    "author": "Стьюг Ларссон",
-                    "genre": "Детектив",
-                    "reason": "Сучасний шведський детектив з інтригою та несподіваними поворотами",
-                    "description": "Перша книга трилогії про Мікаель Блумквіст та Лісбет Саландер",
-                },
-                {
-                    "title": "Убивство у Східному експресі",
-                    "author": "Агата Крісті",
-                    "genre": "Детектив",
-                    "reason": "Класичний детектив від королеви жанру з Еркюлем Пуаро",
-                    "description": "Ідеальний приклад детективного роману з логічним розв'язанням",
-                },
-                {
-                    "title": "Шерлок Холмс",
-                    "author": "Артур Конан Дойл",
-                    "genre": "Детектив",
-                    "reason": "Незабутні пригоди найвідомішого детектива світу",
-                    "description": "Класика, яка сформувала жанр детективної літератури",
-                },
-            ],
-            "поезія": [
-                {
-                    "title": "Кобзар",
-                    "author": "Тарас Шевченко",
-                    "genre": "Поезія",
-                    "reason": "Фундаментальна збірка української поезії, що визначила національну ідентичність",
-                    "description": "Найважливіша поетична збірка в історії української літератури",
-                },
-                {
-                    "title": "Лірика",
-                    "author": "Пабло Неруда",
-                    "genre": "Поезія",
-                    "reason": "Чуттєва лірика нобелівського лауреата про любов і природу",
-                    "description": "Вірші, які торкаються найглибших струн душі",
-                },
-                {
-                    "title": "Вірші",
-                    "author": "Ліна Костенко",
-                    "genre": "Поезія",
-                    "reason": "Сучасна українська поезія з філософським підтекстом",
-                    "description": "Поезія, що поєднує традиції та сучасність",
-                },
-            ],
-            "фантастика": [
-                {
-                    "title": "Дюна",
-                    "author": "Френк Герберт",
-                    "genre": "Наукова фантастика",
-                    "reason": "Епічна космічна опера про політику, екологію та людську природу",
-                    "description": "Впливовий науково-фантастичний роман, що надихнув багато творів",
-                },
-                {
-                    "title": "Хранителі",
-                    "author": "Сергій Лук'яненко",
-                    "genre": "Фентезі",
-                    "reason": "Сучасне українське фентезі про світ нічних людей",
-                    "description": "Унікальне поєднання міської фентезі та філософських роздумів",
-                },
-                {
-                    "title": "Метро 2033",
-                    "author": "Дмитро Глуховський",
-                    "genre": "Постапокаліпсис",
-                    "reason": "Постапокаліптичний світ московського метро від українського автора",
-                    "description": "Напружена атмосфера та глибокі роздуми про людяність",
-                },
-            ],
-            "романтика": [
-                {
-                    "title": "Гордість і упередження",
-                    "author": "Джейн Остін",
-                    "genre": "Роман",
-                    "reason": "Класична історія кохання з британським гумором та соціальною сатирою",
-                    "description": "Чарівна романтична комедія звичаїв XIX століття",
-                },
-                {
-                    "title": "Тіні забутих предків",
-                    "author": "Михайло Коцюбинський",
-                    "genre": "Роман",
-                    "reason": "Лірична історія кохання на тлі карпатських пейзажів",
-                    "description": "Перлинка української літератури з поетичним стилем",
-                },
-                {
-                    "title": "Любов у часи холери",
-                    "author": "Габрієль Гарсія Маркес",
-                    "genre": "Роман",
-                    "reason": "Чарівна історія кохання, що витримує випробування часом",
-                    "description": "Магічний реалізм в інтерпретації теми вічного кохання",
-                },
-            ],
-            "історія": [
-                {
-                    "title": "Спадщина козацтва",
-                    "author": "В'ячеслав Липинський",
-                    "genre": "Історія",
-                    "reason": "Фундаментальна праця про українську державність та ідентичність",
-                    "description": "Класичний аналіз української історії та політичної думки",
-                },
-                {
-                    "title": "Київська Русь",
-                    "author": "Михайло Грушевський",
-                    "genre": "Історія",
-                    "reason": "Авторитетна історія України від заснування до XIV століття",
-                    "description": "Найповніша праця з ранньої історії України",
-                },
-                {
-                    "title": "Sapiens",
-                    "author": "Юваль Ной Харарі",
-                    "genre": "Нон-фікшн",
-                    "reason": "Захоплююча історія людства від появи Homo Sapiens до сьогодення",
-                    "description": "Популярна книга, що пояснює історію людства простою мовою",
-                },
-            ],
-        }
-
-        # Default recommendations for any genre
-        default_books = [
-            {
-                "title": "Сто років самотності",
-                "author": "Габрієль Гарсія Маркес",
-                "genre": "Магічний реалізм",
-                "reason": "Геніальний роман про історію Латинської Америки через долю сім'ї Буендіа",
-                "description": "Шедевр світової літератури, що змінив уявлення про роман",
-            },
-            {
-                "title": "1984",
-                "author": "Джордж Орвелл",
-                "genre": "Антиутопія",
-                "reason": "Пророччий твір про тоталітаризм, який залишається актуальним досі",
-                "description": "Класика, що змусить замислитися про свободу та суспільство",
-            },
-            {
-                "title": "Маленький принц",
-                "author": "Антуан де Сент-Екзюпері",
-                "genre": "Філософська притча",
-                "reason": "Чарівна історія про дружбу, любов і сенс життя, доступна всім вікам",
-                "description": "Твір, який можна читати в будь-якому віці і знаходити новий сенс",
-            },
-            {
-                "title": "Майстер і Маргарита",
-                "author": "Михайло Булгаков",
-                "genre": "Сатира",
-                "reason": "Роман-міф про любов, добро та зло в радянській Москві",
-                "description": "Найвідоміший роман Булгакова з багатошаровими символами",
-            },
-            {
-                "title": "Аліса в Країні чудес",
-                "author": "Льюїс Керрол",
-                "genre": "Фентезі",
-                "reason": "Чарівна пригода, яка надихає мріяти та мислити креативно",
-                "description": "Класична казка для дорослих та дітей з філософським підтекстом",
-            },
-        ]
-
-        # Select books based on user genres
-        recommendations = []
-        used_titles = set()
-
-        # Add books from user's favorite genres
-        for genre in favorite_genres:
-            genre_lower = genre.lower()
-            for key, books in genre_books.items():
-                if key in genre_lower or genre_lower in key:
-                    for book in books:
-                        if (
-                            book["title"] not in used_titles
-                            and len(recommendations) < count
-                        ):
-                            recommendations.append(book)
-                            used_titles.add(book["title"])
-
-        # Fill remaining slots with default books
-        for book in default_books:
-            if book["title"] not in used_titles and len(recommendations) < count:
-                recommendations.append(book)
-                used_titles.add(book["title"])
-
-        return recommendations[:count]
+        return fallback_index.select(favorite_genres, read_books, count)
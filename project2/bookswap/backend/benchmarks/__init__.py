@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the BookSwap backend.
+Run from the backend directory, e.g. ``python -m benchmarks.search_latency``.
+"""
@@ -0,0 +1,126 @@
+"""
+Exchange listing benchmark: selectinload ORM graph vs the projection query.
+
+Generates a synthetic dataset (app.db.seed.SyntheticDataGenerator; 200 users
+and 5,000 exchanges by default) and times GET /api/exchanges/my in-process
+over ASGI for its busiest trader. Runs twice: "selectinload" restores
+the old repository method that hydrated requester, owner, both books and both
+book owners as ORM objects; "projection" is the current single joined SELECT.
+Query counts are read from the Server-Timing header.
+
+Run:
+    python -m benchmarks.exchange_listing --users 200 --exchanges 5000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+import app.models  # noqa: F401 — register models
+from app.core.security import create_access_token
+from app.db.instrumentation import instrument_engine
+from app.db.seed import SyntheticDataGenerator
+from app.db.session import Base, get_db
+from app.main import app
+from app.models import Book, Exchange
+from app.repositories import ExchangeRepository
+
+
+async def legacy_get_for_user(self, user_id: int):
+    """The previous implementation: five selectin round trips, full ORM rows."""
+    result = await self.db.execute(
+        select(Exchange)
+        .options(
+            selectinload(Exchange.requester),
+            selectinload(Exchange.owner),
+            selectinload(Exchange.offered_book).selectinload(Book.owner),
+            selectinload(Exchange.requested_book).selectinload(Book.owner),
+        )
+        .where((Exchange.requester_id == user_id) | (Exchange.owner_id == user_id))
+        .order_by(Exchange.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+async def seed(session_factory, users: int, exchanges: int) -> int:
+    """Generate the dataset and return the user with the most exchanges."""
+    async with session_factory() as session:
+        await SyntheticDataGenerator(seed=42).generate(
+            session, users=users, books=users * 10, exchanges=exchanges
+        )
+        await session.commit()
+        participant = union_all(
+            select(Exchange.requester_id.label("user_id")),
+            select(Exchange.owner_id.label("user_id")),
+        ).subquery()
+        result = await session.execute(
+            select(participant.c.user_id)
+            .group_by(participant.c.user_id)
+            .order_by(func.count().desc(), participant.c.user_id)
+            .limit(1)
+        )
+        return result.scalar_one()
+
+
+async def time_endpoint(client: AsyncClient, headers: dict, repeat: int):
+    latencies, queries = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get("/api/exchanges/my", headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        queries = int(re.search(r'"(\d+) queries"', response.headers["server-timing"])[1])
+    return latencies, queries, len(response.json())
+
+
+def report(name: str, latencies: list[float], queries: int, rows: int) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(
+        f"{name:>12}: p50 {statistics.median(latencies):8.2f} ms   "
+        f"p95 {p95:8.2f} ms   {queries} queries   {rows} exchanges"
+    )
+
+
+async def main(args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "exchange_listing.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    user_id = await seed(session_factory, args.users, args.exchanges)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    projection = ExchangeRepository.get_for_user
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, method in (("selectinload", legacy_get_for_user), ("projection", projection)):
+            ExchangeRepository.get_for_user = method
+            await time_endpoint(client, headers, 2)  # warm up
+            report(name, *await time_endpoint(client, headers, args.repeat))
+    ExchangeRepository.get_for_user = projection
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--exchanges", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
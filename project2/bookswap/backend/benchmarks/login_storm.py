@@ -0,0 +1,124 @@
+"""
+Login storm load test: latency of an unrelated endpoint while bcrypt runs.
+
+Fires a burst of concurrent /api/auth/login requests at the app (in-process,
+over ASGI) and meanwhile probes GET /health at a fixed rate. Runs twice:
+"inline" hashes on the event loop like the old AuthService did, "pool" uses
+the bounded password_hasher executor.
+
+Run:
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401 — register models
+import app.services as services
+from app.core.security import pwd_context
+from app.db.seed import SYNTHETIC_PASSWORD, SyntheticDataGenerator, synthetic_email
+from app.db.session import Base, get_db
+from app.main import app
+
+
+class InlineHasher:
+    """The previous behaviour: bcrypt directly on the event loop."""
+
+    async def hash(self, password: str) -> str:
+        return pwd_context.hash(password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """
+    Open-loop probe: latency is measured from when each request was *due*,
+    so time spent waiting for a blocked event loop is counted too.
+    """
+    latencies = []
+    due = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/health")
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += interval
+        await asyncio.sleep(max(due - time.perf_counter(), 0))
+    return latencies
+
+
+async def storm(client: AsyncClient, users: int, logins: int, concurrency: int) -> int:
+    limit = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def login(i: int):
+        async with limit:
+            response = await client.post(
+                "/api/auth/login",
+                json={"email": synthetic_email(i % users), "password": SYNTHETIC_PASSWORD},
+            )
+            statuses.append(response.status_code)
+
+    await asyncio.gather(*(login(i) for i in range(logins)))
+    return sum(status == 200 for status in statuses)
+
+
+def report(name: str, latencies: list[float], ok: int, logins: int, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(
+        f"{name:>6}: /health p50 {statistics.median(latencies):8.2f} ms   "
+        f"p99 {p99:8.2f} ms   max {latencies[-1]:8.2f} ms   "
+        f"logins {ok}/{logins} ok in {elapsed:.1f} s"
+    )
+
+
+async def main(args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "login_storm.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        await SyntheticDataGenerator(seed=42).generate(session, users=args.users, books=0)
+        await session.commit()
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    pooled = services.password_hasher
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, hasher in (("inline", InlineHasher()), ("pool", pooled)):
+            services.password_hasher = hasher
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop, args.probe_interval))
+            started = time.perf_counter()
+            ok = await storm(client, args.users, args.logins, args.concurrency)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            report(name, await prober, ok, args.logins, elapsed)
+        print(f"  pool stats: {pooled.get_statistics()}")
+
+    services.password_hasher = pooled
+    pooled.shutdown()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+Serialization benchmark: FastAPI's response_model path vs the fast JSON path.
+
+Builds transient ORM objects for the big list endpoints and measures the
+time to turn 100 of them into response bytes. "default" is what FastAPI does
+for a route with ``response_model`` (validate, jsonable_encoder, json.dumps);
+"fast" is ``app.core.serialization.dump_json`` (cached TypeAdapter, JSON
+written by pydantic-core).
+
+Run:
+    python -m benchmarks.serialization --items 100 --repeat 200
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import app.models  # noqa: F401 — register models
+from app.core.serialization import dump_json
+from app.models import (
+    Book,
+    BookCondition,
+    BookGenre,
+    Exchange,
+    ExchangeStatus,
+    Message,
+    User,
+)
+from app.schemas import BookResponse, ExchangeResponse, MessageResponse
+
+NOW = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def make_user(i: int) -> User:
+    return User(
+        id=i,
+        email=f"user{i}@bookswap.ua",
+        username=f"user{i}",
+        full_name=f"Користувач {i}",
+        city="Київ",
+        hashed_password="x",
+        created_at=NOW,
+    )
+
+
+def make_book(i: int, owner: User) -> Book:
+    return Book(
+        id=i,
+        title=f"Книга номер {i}",
+        author="Ліна Костенко",
+        description="Опис книги. " * 20,
+        genre=list(BookGenre)[i % len(BookGenre)],
+        published_year=1990 + i % 30,
+        language="Ukrainian",
+        condition=BookCondition.good,
+        is_available_for_exchange=True,
+        owner_id=owner.id,
+        owner=owner,
+        rating_sum=4 * (i % 5),
+        review_count=i % 5,
+        created_at=NOW - timedelta(minutes=i),
+    )
+
+
+def make_fixtures(items: int) -> dict:
+    users = [make_user(i) for i in range(1, 11)]
+    books = [make_book(i, users[i % len(users)]) for i in range(items)]
+    exchanges = [
+        Exchange(
+            id=i,
+            status=ExchangeStatus.pending,
+            message="Обміняємось?",
+            requester=users[i % 10],
+            owner=users[(i + 1) % 10],
+            offered_book=books[i],
+            requested_book=books[-i - 1],
+            created_at=NOW,
+        )
+        for i in range(items)
+    ]
+    messages = [
+        Message(
+            id=i,
+            exchange_id=1,
+            sender_id=users[i % 2].id,
+            sender=users[i % 2],
+            content=f"Повідомлення {i}",
+            is_read=bool(i % 2),
+            created_at=NOW + timedelta(seconds=i),
+        )
+        for i in range(items)
+    ]
+    return {
+        "books": (list[BookResponse], books),
+        "exchanges": (list[ExchangeResponse], exchanges),
+        "messages": (list[MessageResponse], messages),
+    }
+
+
+async def default_path(field, content) -> bytes:
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+async def time_ms(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main(args) -> None:
+    print(f"per {args.items} items, mean of {args.repeat} runs")
+    for name, (schema, content) in make_fixtures(args.items).items():
+        field = create_response_field(name=name, type_=schema)
+        default = await default_path(field, content)
+        fast = dump_json(schema, content)
+
+        async def run_default():
+            await default_path(field, content)
+
+        async def run_fast():
+            dump_json(schema, content)
+
+        before = await time_ms(run_default, args.repeat)
+        after = await time_ms(run_fast, args.repeat)
+        print(
+            f"{name:>10}: default {before:7.2f} ms   fast {after:7.2f} ms   "
+            f"x{before / after:4.1f}   ({len(default)} / {len(fast)} bytes)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,180 @@
+"""
+Write statement counts: flush + refresh vs INSERT/UPDATE ... RETURNING.
+
+Drives every write endpoint once in-process over ASGI against a fresh SQLite
+database and reads the number of SQL statements each request issued from the
+Server-Timing header. Runs twice: "refresh" restores the old repository
+writes (flush, then a SELECT to reload the row) and the old wishlist insert
+that re-read the whole wishlist; "returning" is the current code, where the
+flush itself hydrates server defaults and only the relationships a response
+needs are loaded.
+
+Run:
+    python -m benchmarks.write_statements
+"""
+
+import argparse
+import asyncio
+import re
+import tempfile
+
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401 — register models
+from app.core.dependencies import _token_cache, _user_cache
+from app.core.security import create_access_token
+from app.db.instrumentation import instrument_engine
+from app.db.session import Base, get_db
+from app.main import app
+from app.models import Book, BookGenre, User, WishlistItem
+from app.repositories.base import BaseRepository
+from app.services import WishlistService
+
+
+async def legacy_create(self, obj):
+    self.db.add(obj)
+    await self.db.flush()
+    await self.db.refresh(obj)
+    return obj
+
+
+async def legacy_update(self, obj):
+    await self.db.flush()
+    await self.db.refresh(obj)
+    return obj
+
+
+async def legacy_add_to_wishlist(self, user_id: int, book_id: int):
+    """The previous implementation: re-read the wishlist to find the new item."""
+    if await self.wishlist_repo.get_item(user_id, book_id):
+        raise HTTPException(status_code=400, detail="Already in wishlist")
+    await self.wishlist_repo.create(WishlistItem(user_id=user_id, book_id=book_id))
+    items = await self.wishlist_repo.get_user_wishlist(user_id)
+    return next(i for i in items if i.book_id == book_id)
+
+
+LEGACY = {
+    (BaseRepository, "create"): legacy_create,
+    (BaseRepository, "update"): legacy_update,
+    (WishlistService, "add_to_wishlist"): legacy_add_to_wishlist,
+}
+
+
+async def seed(session_factory) -> tuple[int, int, int, int]:
+    async with session_factory() as session:
+        alice = User(email="alice@bookswap.ua", username="alice", hashed_password="x")
+        bob = User(email="bob@bookswap.ua", username="bob", hashed_password="x")
+        session.add_all([alice, bob])
+        await session.flush()
+        alice_book = Book(title="Лісова пісня", author="Леся Українка", genre=BookGenre.poetry, owner_id=alice.id)
+        bob_book = Book(title="Тигролови", author="Іван Багряний", genre=BookGenre.fiction, owner_id=bob.id)
+        session.add_all([alice_book, bob_book])
+        await session.commit()
+        return alice.id, bob.id, alice_book.id, bob_book.id
+
+
+def statements(response) -> int:
+    response.raise_for_status()
+    return int(re.search(r'"(\d+) queries"', response.headers["server-timing"])[1])
+
+
+async def run_endpoints(client: AsyncClient, ids) -> dict[str, int]:
+    alice_id, bob_id, alice_book, bob_book = ids
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': str(alice_id)})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': str(bob_id)})}"}
+    # Warm the auth caches so counts only cover the endpoint's own work
+    for headers in (alice, bob):
+        await client.get("/api/users/me", headers=headers)
+
+    counts = {}
+    response = await client.post("/api/auth/register", json={
+        "email": "carol@bookswap.ua", "username": "carol", "password": "password123",
+    })
+    counts["POST /auth/register"] = statements(response)
+    response = await client.patch("/api/users/me", json={"city": "Львів"}, headers=alice)
+    counts["PATCH /users/me"] = statements(response)
+    response = await client.post("/api/books", json={
+        "title": "Тигролови", "author": "Іван Багряний", "genre": "history",
+    }, headers=alice)
+    counts["POST /books"] = statements(response)
+    new_book = response.json()["id"]
+    response = await client.patch(
+        f"/api/books/{alice_book}", json={"description": "Драма-феєрія"}, headers=alice
+    )
+    counts["PATCH /books/{id}"] = statements(response)
+    response = await client.post(
+        "/api/reviews", json={"book_id": alice_book, "rating": 4}, headers=bob
+    )
+    counts["POST /reviews"] = statements(response)
+    review = response.json()["id"]
+    response = await client.patch(f"/api/reviews/{review}", json={"rating": 5}, headers=bob)
+    counts["PATCH /reviews/{id}"] = statements(response)
+    response = await client.post("/api/exchanges", json={
+        "requested_book_id": alice_book, "offered_book_id": bob_book,
+    }, headers=bob)
+    counts["POST /exchanges"] = statements(response)
+    exchange = response.json()["id"]
+    response = await client.patch(f"/api/exchanges/{exchange}/accept", headers=alice)
+    counts["PATCH /exchanges/{id}/accept"] = statements(response)
+    response = await client.post(f"/api/wishlist/{alice_book}", headers=bob)
+    counts["POST /wishlist/{book_id}"] = statements(response)
+    response = await client.post(f"/api/friends/{alice_id}", headers=bob)
+    counts["POST /friends/{user_id}"] = statements(response)
+    response = await client.delete(f"/api/wishlist/{alice_book}", headers=bob)
+    counts["DELETE /wishlist/{book_id}"] = statements(response)
+    response = await client.delete(f"/api/reviews/{review}", headers=bob)
+    counts["DELETE /reviews/{id}"] = statements(response)
+    response = await client.delete(f"/api/books/{new_book}", headers=alice)
+    counts["DELETE /books/{id}"] = statements(response)
+    return counts
+
+
+async def measure(directory: str, name: str) -> dict[str, int]:
+    # Each run starts from an empty database and cold auth caches
+    _token_cache.clear()
+    _user_cache.clear()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/{name}.db")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    ids = await seed(session_factory)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_endpoints(client, ids)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+
+async def main(args) -> None:
+    directory = tempfile.mkdtemp()
+    current = {(owner, attr): getattr(owner, attr) for owner, attr in LEGACY}
+    for (owner, attr), method in LEGACY.items():
+        setattr(owner, attr, method)
+    try:
+        before = await measure(directory, "refresh")
+    finally:
+        for (owner, attr), method in current.items():
+            setattr(owner, attr, method)
+    after = await measure(directory, "returning")
+
+    print(f"{'endpoint':<30}{'refresh':>9}{'returning':>11}")
+    for endpoint, count in before.items():
+        print(f"{endpoint:<30}{count:>9}{after[endpoint]:>11}")
+    print(f"{'total':<30}{sum(before.values()):>9}{sum(after.values()):>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""
+Shared fixtures for tests that need a real (in-memory SQLite) database.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 — register models
+from app.db.instrumentation import instrument_engine
+from app.db.session import Base, get_db
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """User ids repeat across per-test databases; never share cached users."""
+    from app.core.dependencies import _token_cache, _user_cache
+
+    _token_cache.clear()
+    _user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    """Cached catalog pages belong to the previous test's database."""
+    from app.services.catalog_cache import catalog_cache
+
+    catalog_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_table_versions():
+    """Every test database starts its ``table_versions`` rows from zero."""
+    from app.core.versions import table_versions
+
+    table_versions.clear()
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    )
+
+
+@pytest.fixture
+async def db_session(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(session_factory):
+    """HTTP client for the app with ``get_db`` bound to the test database."""
+    from app.main import app
+
+    async def override_get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as http_client:
+        yield http_client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def statements(engine):
+    """Records every SQL statement executed against the test engine."""
+    executed: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def assert_max_queries(statements):
+    """
+    Fails the test if the block runs more than ``limit`` SQL statements::
+
+        with assert_max_queries(2):
+            await client.get("/api/books")
+    """
+
+    @contextmanager
+    def check(limit: int):
+        start = len(statements)
+        yield
+        executed = statements[start:]
+        assert len(executed) <= limit, (
+            f"{len(executed)} queries executed, expected at most {limit}:\n"
+            + "\n".join(executed)
+        )
+
+    return check
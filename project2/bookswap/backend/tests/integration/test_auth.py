@@ -0,0 +1,54 @@
+"""
+Tests for registration and login with off-loop password hashing.
+"""
+
+from app.core.security import PasswordHasherBusy
+
+USER = {
+    "email": "reader@bookswap.ua",
+    "username": "reader",
+    "password": "password123",
+}
+
+
+class TestAuthFlow:
+    async def test_register_then_login(self, client):
+        registered = await client.post("/api/auth/register", json=USER)
+        assert registered.status_code == 201
+        assert registered.json()["token_type"] == "bearer"
+
+        login = await client.post(
+            "/api/auth/login",
+            json={"email": USER["email"], "password": USER["password"]},
+        )
+        assert login.status_code == 200
+
+        me = await client.get(
+            "/api/users/me",
+            headers={"Authorization": f"Bearer {login.json()['access_token']}"},
+        )
+        assert me.json()["username"] == "reader"
+
+    async def test_wrong_password_is_rejected(self, client):
+        await client.post("/api/auth/register", json=USER)
+
+        response = await client.post(
+            "/api/auth/login", json={"email": USER["email"], "password": "nope"}
+        )
+
+        assert response.status_code == 401
+
+    async def test_saturated_hasher_sheds_load(self, client, monkeypatch):
+        await client.post("/api/auth/register", json=USER)
+
+        async def busy(*args):
+            raise PasswordHasherBusy()
+
+        monkeypatch.setattr("app.services.password_hasher.verify", busy)
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": USER["email"], "password": USER["password"]},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,113 @@
+"""
+Tests for cached user resolution in get_current_user.
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.core import dependencies
+from app.core.dependencies import _user_cache, invalidate_cached_user
+from app.core.security import create_access_token
+from app.models import User
+from app.repositories import UserRepository
+
+
+@pytest.fixture
+async def auth_headers(db_session):
+    user = User(email="reader@bookswap.ua", username="reader", hashed_password="x")
+    db_session.add(user)
+    await db_session.commit()
+    token = create_access_token({"sub": str(user.id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _user_selects(statements: list[str]) -> list[str]:
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM users" in s]
+
+
+class TestCurrentUserCache:
+    async def test_repeated_requests_skip_the_user_lookup(
+        self, client, auth_headers, statements
+    ):
+        first = await client.get("/api/users/me", headers=auth_headers)
+        assert first.status_code == 200
+        assert len(_user_selects(statements)) == 1
+
+        statements.clear()
+        second = await client.get("/api/users/me", headers=auth_headers)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert statements == []
+
+    async def test_profile_update_invalidates_the_cache(self, client, auth_headers):
+        await client.get("/api/users/me", headers=auth_headers)
+
+        response = await client.patch(
+            "/api/users/me", json={"city": "Львів"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        me = await client.get("/api/users/me", headers=auth_headers)
+        assert me.json()["city"] == "Львів"
+
+    async def test_cached_user_can_write(self, client, auth_headers):
+        """The rebuilt user is attached to the request session like a loaded one."""
+        await client.get("/api/users/me", headers=auth_headers)
+
+        response = await client.post(
+            "/api/books",
+            json={"title": "Кобзар", "author": "Тарас Шевченко", "genre": "poetry"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        assert response.json()["owner"]["username"] == "reader"
+
+    async def test_deactivated_user_is_rejected(self, client, db_session, auth_headers):
+        await client.get("/api/users/me", headers=auth_headers)
+
+        user = (await db_session.execute(select(User))).scalar_one()
+        user.is_active = False
+        await db_session.flush()
+        # Flushed but not committed: still the cached, active row
+        assert user.id in _user_cache
+        await db_session.commit()
+
+        me = await client.get("/api/users/me", headers=auth_headers)
+        assert me.status_code == 401
+
+    async def test_eviction_waits_for_commit(self, client, db_session, auth_headers):
+        await client.get("/api/users/me", headers=auth_headers)
+        user_id = (await db_session.execute(select(User.id))).scalar_one()
+
+        invalidate_cached_user(db_session, user_id)
+        await db_session.rollback()
+        assert user_id in _user_cache
+
+        invalidate_cached_user(db_session, user_id)
+        # Until the change is committed, requests may keep the old row
+        assert user_id in _user_cache
+        await db_session.commit()
+        assert user_id not in _user_cache
+
+    async def test_lookup_racing_an_eviction_is_not_cached(
+        self, client, auth_headers, monkeypatch
+    ):
+        original_get = UserRepository.get
+
+        async def get_during_eviction(self, user_id):
+            user = await original_get(self, user_id)
+            dependencies._evict_user(user_id)
+            return user
+
+        monkeypatch.setattr(UserRepository, "get", get_during_eviction)
+        response = await client.get("/api/users/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert len(_user_cache) == 0
+
+    async def test_invalid_token_is_rejected(self, client):
+        response = await client.get(
+            "/api/users/me", headers={"Authorization": "Bearer not-a-token"}
+        )
+        assert response.status_code == 401
@@ -0,0 +1,204 @@
+"""
+Tests for the streaming CSV/NDJSON book import endpoint.
+"""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.observer import _after_commit_tasks
+from app.core.security import create_access_token
+from app.models import Book, BookGenre, User
+from app.services.catalog_cache import catalog_cache
+
+CSV = "text/csv"
+NDJSON = "application/x-ndjson"
+
+
+@pytest.fixture
+async def reader(db_session):
+    alice = User(email="a@bookswap.ua", username="alice", hashed_password="x")
+    bob = User(email="b@bookswap.ua", username="bob", hashed_password="x")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    db_session.add(
+        Book(
+            title="Dune", author="Herbert", genre=BookGenre.sci_fi,
+            isbn="9780441013593", owner_id=bob.id,
+        )
+    )
+    await db_session.commit()
+    token = create_access_token({"sub": str(alice.id)})
+    return alice, {"Authorization": f"Bearer {token}"}
+
+
+async def _stream(body: bytes, chunk_size: int):
+    for start in range(0, len(body), chunk_size):
+        yield body[start : start + chunk_size]
+
+
+async def _import(client, headers, body: str, content_type: str, chunk_size: int = 0):
+    data = body.encode()
+    return await client.post(
+        "/api/books/import",
+        content=_stream(data, chunk_size) if chunk_size else data,
+        headers={**headers, "Content-Type": content_type},
+    )
+
+
+async def _titles(db_session, owner: User) -> list[str]:
+    result = await db_session.execute(
+        select(Book.title).where(Book.owner_id == owner.id).order_by(Book.id)
+    )
+    return list(result.scalars())
+
+
+class TestBookImport:
+    async def test_csv_import(self, client, db_session, reader):
+        alice, headers = reader
+        body = (
+            "\ufefftitle,author,genre,isbn,published_year,description\n"
+            'Кобзар,Тарас Шевченко,poetry,,1840,"Збірка,\nдва рядки"\n'
+            "Тигролови,Іван Багряний,fiction,978-966-03-4567-1,1944,\n"
+        )
+        # One-byte chunks split the multi-byte UTF-8 characters
+        response = await _import(client, headers, body, CSV, chunk_size=1)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "imported": 2,
+            "duplicates": 0,
+            "invalid": 0,
+            "errors": [],
+            "errors_truncated": False,
+        }
+        books = (
+            await db_session.execute(select(Book).where(Book.owner_id == alice.id))
+        ).scalars().all()
+        kobzar = next(book for book in books if book.title == "Кобзар")
+        assert kobzar.description == "Збірка,\nдва рядки"
+        assert kobzar.isbn is None
+        assert kobzar.published_year == 1840
+        assert kobzar.language == "Ukrainian"
+
+    async def test_ndjson_reports_row_errors(self, client, db_session, reader):
+        alice, headers = reader
+        lines = [
+            json.dumps({"title": "Emma", "author": "Austen", "genre": "romance",
+                        "isbn": "9780141439587"}),
+            "{not json",
+            json.dumps(["a", "list"]),
+            json.dumps({"title": "No genre", "author": "Nobody"}),
+            "",
+            json.dumps({"title": "Emma again", "author": "Austen", "genre": "romance",
+                        "isbn": "9780141439587"}),
+            json.dumps({"title": "Dune", "author": "Herbert", "genre": "sci_fi",
+                        "isbn": "9780441013593"}),
+        ]
+        response = await _import(client, headers, "\n".join(lines), NDJSON)
+
+        result = response.json()
+        assert (result["imported"], result["duplicates"], result["invalid"]) == (1, 2, 3)
+        errors = {error["line"]: error["error"] for error in result["errors"]}
+        assert errors[2].startswith("Invalid JSON")
+        assert errors[3] == "Expected a JSON object"
+        assert errors[4].startswith("genre:")
+        # In-file repeat and a book already in the catalog
+        assert errors[6] == errors[7].replace("9780441013593", "9780141439587")
+        assert await _titles(db_session, alice) == ["Emma"]
+
+    async def test_duplicates_across_batches(
+        self, client, db_session, reader, statements, monkeypatch
+    ):
+        alice, headers = reader
+        monkeypatch.setattr(settings, "book_import_batch_size", 2)
+        rows = [f"Book {i},Author,fiction,978000000000{i % 3}" for i in range(6)]
+        start = len(statements)
+        response = await _import(
+            client, headers, "title,author,genre,isbn\n" + "\n".join(rows), CSV
+        )
+
+        result = response.json()
+        assert (result["imported"], result["duplicates"]) == (3, 3)
+        inserts = [sql for sql in statements[start:] if sql.startswith("INSERT INTO books")]
+        assert len(inserts) == 3
+        assert await _titles(db_session, alice) == ["Book 0", "Book 1", "Book 2"]
+
+    async def test_error_list_is_capped(self, client, reader, monkeypatch):
+        _, headers = reader
+        monkeypatch.setattr(settings, "book_import_max_errors", 2)
+        body = "title,author,genre\n" + "\n".join(f"Book {i},,fiction" for i in range(5))
+        result = (await _import(client, headers, body, CSV)).json()
+
+        assert result["invalid"] == 5
+        assert [error["line"] for error in result["errors"]] == [2, 3]
+        assert result["errors_truncated"] is True
+
+    async def test_column_count_mismatch(self, client, reader):
+        _, headers = reader
+        body = "title,author,genre\nEmma,Austen\n"
+        result = (await _import(client, headers, body, CSV)).json()
+        assert result["errors"] == [{"line": 2, "error": "Expected 3 columns, got 2"}]
+
+    async def test_bare_quotes_stay_literal(self, client, db_session, reader):
+        alice, headers = reader
+        body = (
+            "title,author,genre\n"
+            '12" Vinyl Guide,Someone,other\n'
+            "Dune,Herbert,sci_fi\n"
+            '"Kobzar ""1840""",Шевченко,poetry\n'
+        )
+        result = (await _import(client, headers, body, CSV)).json()
+
+        assert (result["imported"], result["invalid"]) == (3, 0)
+        assert await _titles(db_session, alice) == [
+            '12" Vinyl Guide', "Dune", 'Kobzar "1840"',
+        ]
+
+    async def test_rejects_overlong_quoted_records(self, client, reader, monkeypatch):
+        _, headers = reader
+        monkeypatch.setattr(settings, "book_import_max_record_bytes", 64)
+        body = 'title,author,genre\nEmma,Austen,"romance\n' + "x,\n" * 40
+        response = await _import(client, headers, body, CSV)
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Record on line 2 is too long"
+
+    async def test_rejects_unknown_content_type(self, client, reader):
+        _, headers = reader
+        response = await _import(client, headers, "{}", "application/json")
+        assert response.status_code == 415
+
+    async def test_rejects_overlong_lines(self, client, db_session, reader, monkeypatch):
+        alice, headers = reader
+        monkeypatch.setattr(settings, "book_import_max_record_bytes", 64)
+        body = "title,author,genre\nEmma,Austen,romance\n" + "x" * 200
+        response = await _import(client, headers, body, CSV, chunk_size=16)
+        assert response.status_code == 413
+        # Nothing from the upload is committed
+        assert await _titles(db_session, alice) == []
+
+    async def test_requires_authentication(self, client):
+        response = await client.post(
+            "/api/books/import", content=b"", headers={"Content-Type": CSV}
+        )
+        assert response.status_code == 401
+
+    async def test_import_invalidates_catalog(self, client, db_session, reader):
+        _, headers = reader
+        first = await client.get("/api/books", params={"genre": "poetry"})
+        await client.get("/api/books", params={"genre": "romance"})
+        assert len(catalog_cache) == 2
+
+        body = "title,author,genre\nКобзар,Шевченко,poetry\n"
+        await _import(client, headers, body, CSV)
+        await asyncio.gather(*_after_commit_tasks)
+
+        assert len(catalog_cache) == 1
+        second = await client.get("/api/books", params={"genre": "poetry"})
+        assert second.headers["etag"] != first.headers["etag"]
+        assert second.json()["total"] == 1
+        count = await db_session.execute(select(func.count(Book.id)))
+        assert count.scalar_one() == 2
@@ -0,0 +1,112 @@
+"""
+Tests for the pluggable book search backends.
+"""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import Book, BookGenre, User
+from app.repositories.book import BookRepository
+from app.repositories.search import (
+    IlikeSearchBackend,
+    PostgresFullTextBackend,
+    SQLiteFTS5Backend,
+    get_search_backend,
+    tokenize,
+)
+
+
+@pytest.fixture
+async def catalog(db_session):
+    owner = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    db_session.add(owner)
+    await db_session.flush()
+    books = [
+        Book(title="Дюна", author="Френк Герберт", genre=BookGenre.sci_fi),
+        Book(title="Діти Дюни", author="Френк Герберт", genre=BookGenre.sci_fi),
+        Book(title="Кобзар", author="Тарас Шевченко", genre=BookGenre.poetry),
+        Book(title="The Hobbit", author="J. R. R. Tolkien", genre=BookGenre.fantasy),
+        Book(title="Tolkien: A Biography", author="Humphrey Carpenter", genre=BookGenre.biography),
+    ]
+    for book in books:
+        book.owner_id = owner.id
+    db_session.add_all(books)
+    await db_session.commit()
+    return books
+
+
+class TestSearchBackendSelection:
+    def test_auto_picks_native_engine(self):
+        assert isinstance(get_search_backend("sqlite"), SQLiteFTS5Backend)
+        assert isinstance(get_search_backend("postgresql"), PostgresFullTextBackend)
+        assert isinstance(get_search_backend("mysql"), IlikeSearchBackend)
+
+    def test_ilike_can_be_forced(self, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "search_backend", "ilike")
+        assert isinstance(get_search_backend("sqlite"), IlikeSearchBackend)
+
+    def test_tokenize_strips_query_syntax(self):
+        assert tokenize('Дюна" OR *:(') == ["дюна", "or"]
+
+    def test_postgres_query_uses_indexed_expression(self):
+        stmt, rank = PostgresFullTextBackend().apply(select(Book.id), "френк гер")
+        sql = str(
+            stmt.order_by(rank.desc()).compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+
+        assert "to_tsvector('simple', books.title || ' ' || books.author)" in sql
+        assert "@@ to_tsquery('simple', 'френк:* & гер:*')" in sql
+        assert "ts_rank(" in sql
+
+
+class TestSQLiteFullTextSearch:
+    async def test_prefix_and_cyrillic_match(self, db_session, catalog):
+        books, total = await BookRepository(db_session).search("дюн")
+
+        assert total == 2
+        assert {b.title for b in books} == {"Дюна", "Діти Дюни"}
+
+    async def test_results_are_ranked_by_relevance(self, db_session, catalog):
+        books, _ = await BookRepository(db_session).search("tolkien")
+
+        assert [b.title for b in books] == ["Tolkien: A Biography", "The Hobbit"]
+
+    async def test_all_tokens_must_match(self, db_session, catalog):
+        books, total = await BookRepository(db_session).search("френк діти")
+
+        assert total == 1
+        assert books[0].title == "Діти Дюни"
+
+    async def test_index_follows_updates_and_deletes(self, db_session, catalog):
+        repo = BookRepository(db_session)
+        kobzar = catalog[2]
+
+        kobzar.title = "Гайдамаки"
+        await repo.update(kobzar)
+        assert (await repo.search("кобзар"))[1] == 0
+        assert (await repo.search("гайдамаки"))[1] == 1
+
+        await repo.delete(kobzar)
+        assert (await repo.search("шевченко"))[1] == 0
+
+    async def test_combines_with_filters_and_cursor(self, db_session, catalog):
+        repo = BookRepository(db_session)
+
+        books, _ = await repo.search("френк", genre=BookGenre.poetry)
+        assert books == []
+
+        page, next_key = await repo.search_after("френк", limit=1)
+        rest, _ = await repo.search_after("френк", after=next_key, limit=1)
+        assert {page[0].title, rest[0].title} == {"Дюна", "Діти Дюни"}
+
+    async def test_ilike_backend_gives_same_matches(self, db_session, catalog):
+        repo = BookRepository(db_session, search_backend=IlikeSearchBackend())
+
+        books, total = await repo.search("Дюн")
+
+        assert total == 2
@@ -0,0 +1,119 @@
+"""
+Tests for cursor (keyset) pagination of the books catalog.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models import Book, BookGenre, User
+from app.services import _catalog_count_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    _catalog_count_cache.clear()
+    yield
+    _catalog_count_cache.clear()
+
+
+async def _seed_books(db_session, count: int) -> list[Book]:
+    owner = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    db_session.add(owner)
+    await db_session.flush()
+    # Several books share a timestamp so the id tie-breaker matters
+    books = [
+        Book(
+            title=f"Book {i}",
+            author="Author",
+            genre=BookGenre.fantasy if i % 2 else BookGenre.poetry,
+            owner_id=owner.id,
+            created_at=datetime(2026, 1, 1 + i // 4, 12, 0, 0),
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(books)
+    await db_session.commit()
+    return books
+
+
+async def _walk(client, **params) -> list[dict]:
+    pages = []
+    cursor = ""
+    while cursor is not None and len(pages) < 20:
+        response = await client.get(
+            "/api/books", params={"cursor": cursor, "page_size": 3, **params}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+    return pages
+
+
+class TestCursorPagination:
+    async def test_walks_every_book_once_in_order(self, client, db_session):
+        books = await _seed_books(db_session, 10)
+
+        pages = await _walk(client)
+        titles = [item["title"] for page in pages for item in page["items"]]
+
+        expected = sorted(books, key=lambda b: (b.created_at, b.id), reverse=True)
+        assert titles == [b.title for b in expected]
+        assert len(pages) == 4
+        assert pages[0]["page"] is None
+        assert pages[-1]["next_cursor"] is None
+
+    async def test_cursor_respects_filters(self, client, db_session):
+        await _seed_books(db_session, 10)
+
+        pages = await _walk(client, genre="fantasy")
+        items = [item for page in pages for item in page["items"]]
+
+        assert len(items) == 5
+        assert all(item["genre"] == "fantasy" for item in items)
+        assert pages[0]["total"] == 5
+
+    async def test_deep_pages_use_keyset_not_offset(
+        self, client, db_session, statements
+    ):
+        await _seed_books(db_session, 10)
+        first = await client.get("/api/books", params={"cursor": "", "page_size": 3})
+
+        statements.clear()
+        await client.get(
+            "/api/books",
+            params={"cursor": first.json()["next_cursor"], "page_size": 3},
+        )
+
+        # SQLite always renders "OFFSET ?" (bound to 0); the seek is done by the predicate
+        assert "(books.created_at, books.id) <" in statements[0]
+        # The total was cached by the first page
+        assert not any("count(" in s for s in statements)
+
+    async def test_total_is_optional(self, client, db_session, statements):
+        await _seed_books(db_session, 4)
+
+        statements.clear()
+        response = await client.get(
+            "/api/books", params={"cursor": "", "include_total": False}
+        )
+
+        assert response.json()["total"] is None
+        assert not any("count(" in s for s in statements)
+
+    async def test_invalid_cursor(self, client):
+        response = await client.get("/api/books", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    async def test_page_mode_still_works(self, client, db_session):
+        await _seed_books(db_session, 10)
+
+        response = await client.get("/api/books", params={"page": 2, "page_size": 3})
+        body = response.json()
+
+        assert body["page"] == 2
+        assert body["pages"] == 4
+        assert body["total"] == 10
+        assert len(body["items"]) == 3
+        assert body["next_cursor"] is None
@@ -0,0 +1,103 @@
+"""
+Query-count tests for the books catalog.
+"""
+
+from app.models import Book, BookGenre, Review, User
+from app.repositories.book import BookRepository
+
+
+async def _seed_catalog(db_session, books_count: int) -> list[Book]:
+    owner = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    reader = User(email="reader@bookswap.ua", username="reader", hashed_password="x")
+    db_session.add_all([owner, reader])
+    await db_session.flush()
+
+    books = [
+        Book(title=f"Book {i}", author="Author", genre=BookGenre.fiction, owner_id=owner.id)
+        for i in range(books_count)
+    ]
+    db_session.add_all(books)
+    await db_session.flush()
+
+    for i, book in enumerate(books):
+        db_session.add(Review(book_id=book.id, user_id=owner.id, rating=5))
+        if i % 2:
+            db_session.add(Review(book_id=book.id, user_id=reader.id, rating=2))
+    await db_session.flush()
+    await BookRepository(db_session).recalculate_rating_stats()
+    await db_session.commit()
+    return books
+
+
+class TestBookListQueries:
+    async def test_list_books_query_count_is_constant(
+        self, client, db_session, assert_max_queries
+    ):
+        """Rating enrichment must not issue one query per book."""
+        await _seed_catalog(db_session, 60)
+
+        for page_size in (5, 50):
+            with assert_max_queries(4):
+                response = await client.get("/api/books", params={"page_size": page_size})
+            assert response.status_code == 200
+            assert len(response.json()["items"]) == page_size
+
+    async def test_search_books_query_count_is_constant(
+        self, client, db_session, assert_max_queries
+    ):
+        """Searching must not issue one query per match."""
+        await _seed_catalog(db_session, 30)
+
+        with assert_max_queries(3):
+            response = await client.get(
+                "/api/books", params={"q": "Book", "page_size": 30}
+            )
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 30
+        assert "db;dur=" in response.headers["server-timing"]
+
+    async def test_list_books_ratings(self, client, db_session):
+        """Batched aggregation returns the same numbers as per-book queries."""
+        await _seed_catalog(db_session, 4)
+
+        response = await client.get("/api/books")
+        items = {item["title"]: item for item in response.json()["items"]}
+
+        assert items["Book 0"]["average_rating"] == 5.0
+        assert items["Book 0"]["review_count"] == 1
+        assert items["Book 1"]["average_rating"] == 3.5
+        assert items["Book 1"]["review_count"] == 2
+
+    async def test_recalculate_rating_stats(self, db_session):
+        """Backfill leaves unreviewed books at zero and sums the rest."""
+        books = await _seed_catalog(db_session, 2)
+        lonely = Book(
+            title="Lonely", author="A", genre=BookGenre.poetry, owner_id=books[0].owner_id
+        )
+        db_session.add(lonely)
+        await db_session.commit()
+
+        for book in books + [lonely]:
+            await db_session.refresh(book)
+
+        assert (books[0].rating_sum, books[0].review_count) == (5, 1)
+        assert (books[1].rating_sum, books[1].review_count) == (7, 2)
+        assert books[1].average_rating == 3.5
+        assert (lonely.rating_sum, lonely.review_count) == (0, 0)
+        assert lonely.average_rating is None
+
+    async def test_get_book_is_single_fetch(
+        self, client, db_session, statements, assert_max_queries
+    ):
+        """Book detail reads stats from the row instead of aggregating reviews."""
+        books = await _seed_catalog(db_session, 2)
+
+        statements.clear()
+        with assert_max_queries(1):
+            response = await client.get(f"/api/books/{books[1].id}")
+
+        assert response.status_code == 200
+        assert response.json()["average_rating"] == 3.5
+        assert response.json()["review_count"] == 2
+        assert "reviews" not in statements[0]
+        assert response.headers["server-timing"].endswith('desc="1 queries"')
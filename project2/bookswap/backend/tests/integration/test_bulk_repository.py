@@ -0,0 +1,143 @@
+"""
+Tests for the multi-row bulk writes on BaseRepository.
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Book, BookGenre, User
+from app.repositories import UserRepository
+from app.repositories.book import BookRepository
+
+
+@pytest.fixture
+async def owner(db_session):
+    user = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+def _books(owner: User, count: int, **extra) -> list[dict]:
+    return [
+        {
+            "title": f"Book {i}",
+            "author": "Author",
+            "genre": BookGenre.fiction,
+            "owner_id": owner.id,
+            "isbn": f"978-{i:06d}",
+            **extra,
+        }
+        for i in range(count)
+    ]
+
+
+class TestBulkCreate:
+    async def test_inserts_in_chunks(self, db_session, owner, statements):
+        start = len(statements)
+        rows = await BookRepository(db_session).bulk_create(
+            _books(owner, 250), chunk_size=100, returning=("isbn",)
+        )
+        inserts = [sql for sql in statements[start:] if sql.startswith("INSERT")]
+        assert len(inserts) == 3
+        assert len(rows) == 250
+        assert {isbn for _, isbn in rows} == {f"978-{i:06d}" for i in range(250)}
+
+        book = await db_session.get(Book, rows[0][0])
+        # Python-side defaults are applied to bulk rows too
+        assert book.language == "Ukrainian"
+        assert book.review_count == 0
+        assert book.created_at is not None
+
+    async def test_mixed_columns_stay_batched(self, db_session, owner, statements):
+        rows = _books(owner, 100)
+        for row in rows[::2]:
+            row["description"] = "Has a description"
+        start = len(statements)
+        created = await BookRepository(db_session).bulk_create(rows)
+        assert len(created) == 100
+        assert len(statements[start:]) == 2
+
+    async def test_none_values_stay_batched(self, db_session, owner, statements):
+        rows = _books(owner, 100, description=None, language=None)
+        for row in rows[::2]:
+            row["description"] = "Has a description"
+        start = len(statements)
+        created = await BookRepository(db_session).bulk_create(rows)
+        assert len(created) == 100
+        assert len(statements[start:]) == 2
+
+        # None means "not given": the column default still applies
+        book = await db_session.get(Book, created[0][0])
+        assert book.language == "Ukrainian"
+
+    async def test_returns_ids_for_natural_keys(self, db_session):
+        rows = await UserRepository(db_session).bulk_create(
+            [
+                {"email": f"u{i}@bookswap.ua", "username": f"u{i}", "hashed_password": "x"}
+                for i in range(5)
+            ],
+            returning=("email",),
+        )
+        ids = {email: user_id for user_id, email in rows}
+        user = await db_session.get(User, ids["u3@bookswap.ua"])
+        assert user.username == "u3"
+
+    async def test_empty_input(self, db_session, statements):
+        start = len(statements)
+        assert await BookRepository(db_session).bulk_create([]) == []
+        assert statements[start:] == []
+
+
+class TestBulkUpdate:
+    async def test_updates_by_primary_key(self, db_session, owner, statements):
+        repo = BookRepository(db_session)
+        ids = [book_id for book_id, in await repo.bulk_create(_books(owner, 30))]
+        start = len(statements)
+        await repo.bulk_update(
+            [{"id": book_id, "is_available_for_exchange": False} for book_id in ids],
+            chunk_size=10,
+        )
+        assert len(statements[start:]) == 3
+
+        result = await db_session.execute(
+            select(Book.id).where(Book.is_available_for_exchange.is_(True))
+        )
+        assert result.all() == []
+
+
+class TestUpsert:
+    async def test_updates_conflicting_rows(self, db_session, owner):
+        repo = BookRepository(db_session)
+        await repo.bulk_create(_books(owner, 3))
+
+        rows = _books(owner, 5, title="Updated")
+        affected = await repo.upsert(rows, on_conflict=("isbn",))
+        assert len(affected) == 5
+        result = await db_session.execute(select(Book.title).order_by(Book.isbn))
+        assert result.scalars().all() == ["Updated"] * 5
+
+    async def test_do_nothing_keeps_existing_rows(self, db_session, owner):
+        repo = BookRepository(db_session)
+        await repo.bulk_create(_books(owner, 3))
+
+        rows = _books(owner, 5, title="Updated")
+        inserted = await repo.upsert(
+            rows, on_conflict=("isbn",), update_columns=(), returning=("isbn",)
+        )
+        assert sorted(isbn for _, isbn in inserted) == ["978-000003", "978-000004"]
+        result = await db_session.execute(select(Book.title).order_by(Book.isbn))
+        assert result.scalars().all() == ["Book 0", "Book 1", "Book 2", "Updated", "Updated"]
+
+    async def test_only_listed_columns_are_updated(self, db_session, owner):
+        repo = BookRepository(db_session)
+        await repo.bulk_create(_books(owner, 1))
+
+        await repo.upsert(
+            _books(owner, 1, title="New title", author="New author"),
+            on_conflict=("isbn",),
+            update_columns=("title",),
+        )
+        book = (await db_session.execute(select(Book))).scalar_one()
+        await db_session.refresh(book)
+        assert (book.title, book.author) == ("New title", "Author")
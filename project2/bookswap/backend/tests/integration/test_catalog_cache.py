@@ -0,0 +1,216 @@
+"""
+Tests for the event-invalidated catalog response cache.
+"""
+
+import asyncio
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.observer import Event, EventType, _after_commit_tasks, event_manager
+from app.core.pubsub import InMemoryPubSub
+from app.core.security import create_access_token
+from app.core.versions import table_versions
+from app.models import Book, BookGenre, TableVersion, User
+from app.services.catalog_cache import (
+    CatalogCacheInvalidator,
+    CatalogResponseCache,
+    catalog_cache,
+)
+
+
+@pytest.fixture
+async def catalog(db_session):
+    alice = User(email="a@bookswap.ua", username="alice", hashed_password="x")
+    bob = User(email="b@bookswap.ua", username="bob", hashed_password="x")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    dune = Book(title="Dune", author="Herbert", genre=BookGenre.sci_fi, owner_id=alice.id)
+    emma = Book(title="Emma", author="Austen", genre=BookGenre.romance, owner_id=bob.id)
+    db_session.add_all([dune, emma])
+    await db_session.commit()
+
+    def headers(user):
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    return {"alice": headers(alice), "bob": headers(bob), "dune": dune, "emma": emma}
+
+
+async def _events_delivered():
+    await asyncio.gather(*_after_commit_tasks)
+
+
+def _page(book_id: int, owner_id: int = 1):
+    class Row:
+        id = book_id
+
+    Row.owner_id = owner_id
+    return [Row()]
+
+
+class TestCatalogResponseCache:
+    async def test_repeated_request_is_served_from_cache(
+        self, client, catalog, assert_max_queries
+    ):
+        first = await client.get("/api/books", params={"genre": "sci_fi"})
+
+        with assert_max_queries(0):
+            second = await client.get("/api/books", params={"genre": "sci_fi"})
+
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert catalog_cache.get_statistics()["hits"] == 1
+
+    async def test_new_book_evicts_only_matching_filters(self, client, catalog):
+        await client.get("/api/books")
+        await client.get("/api/books", params={"genre": "sci_fi"})
+        await client.get("/api/books", params={"genre": "romance"})
+        assert len(catalog_cache) == 3
+
+        response = await client.post(
+            "/api/books",
+            json={"title": "Hyperion", "author": "Simmons", "genre": "sci_fi"},
+            headers=catalog["alice"],
+        )
+        assert response.status_code == 201
+        await _events_delivered()
+
+        assert len(catalog_cache) == 1
+        sci_fi = (await client.get("/api/books", params={"genre": "sci_fi"})).json()
+        assert {b["title"] for b in sci_fi["items"]} == {"Dune", "Hyperion"}
+
+    async def test_review_evicts_pages_containing_the_book(self, client, catalog):
+        await client.get("/api/books", params={"genre": "sci_fi"})
+        await client.get("/api/books", params={"genre": "romance"})
+
+        await client.post(
+            "/api/reviews",
+            json={"book_id": catalog["emma"].id, "rating": 4},
+            headers=catalog["alice"],
+        )
+        await _events_delivered()
+
+        assert len(catalog_cache) == 1
+        romance = (await client.get("/api/books", params={"genre": "romance"})).json()
+        assert romance["items"][0]["average_rating"] == 4.0
+
+    async def test_profile_update_evicts_pages_with_the_owner(self, client, catalog):
+        await client.get("/api/books", params={"genre": "sci_fi"})
+        await client.get("/api/books", params={"genre": "romance"})
+
+        await client.patch("/api/users/me", json={"city": "Харків"}, headers=catalog["bob"])
+        await _events_delivered()
+
+        assert len(catalog_cache) == 1
+        romance = (await client.get("/api/books", params={"genre": "romance"})).json()
+        assert romance["items"][0]["owner"]["city"] == "Харків"
+
+    async def test_search_and_disabled_cache_are_not_cached(
+        self, client, catalog, monkeypatch
+    ):
+        await client.get("/api/books", params={"q": "Dune"})
+        await client.get("/api/books", params={"page": settings.catalog_cache_max_page + 1})
+        monkeypatch.setattr(settings, "catalog_cache_enabled", False)
+        await client.get("/api/books")
+
+        assert len(catalog_cache) == 0
+
+    async def test_pages_keep_the_default_encoder(self, client, catalog, monkeypatch):
+        monkeypatch.setattr(settings, "catalog_cache_enabled", False)
+        uncached = await client.get("/api/books")
+        monkeypatch.setattr(settings, "catalog_cache_enabled", True)
+
+        def fast_path(*args):
+            raise AssertionError("fast_json_responses is off")
+
+        monkeypatch.setattr(TypeAdapter, "dump_json", fast_path)
+        filled = await client.get("/api/books")
+        hits = catalog_cache.get_statistics()["hits"]
+        cached = await client.get("/api/books")
+
+        assert catalog_cache.get_statistics()["hits"] == hits + 1
+        assert filled.content == cached.content == uncached.content
+
+    async def test_cached_etag_short_circuits(self, client, catalog):
+        etag = (await client.get("/api/books")).headers["etag"]
+        await client.get("/api/books")  # served from cache
+
+        response = await client.get("/api/books", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+
+class TestInvalidationDelivery:
+    async def test_eviction_does_not_wait_for_the_event_queue(
+        self, client, catalog, monkeypatch
+    ):
+        async def stalled(event):
+            await asyncio.Event().wait()
+
+        monkeypatch.setattr(event_manager, "notify", stalled)
+        await client.get("/api/books", params={"genre": "romance"})
+
+        await client.patch("/api/users/me", json={"city": "Львів"}, headers=catalog["bob"])
+
+        assert len(catalog_cache) == 0
+        for task in list(_after_commit_tasks):
+            task.cancel()
+
+    async def test_evictions_reach_other_workers_over_pubsub(self):
+        pubsub = InMemoryPubSub()
+        worker_a = CatalogCacheInvalidator(CatalogResponseCache(max_bytes=1000, ttl=60))
+        worker_b = CatalogCacheInvalidator(CatalogResponseCache(max_bytes=1000, ttl=60))
+        await worker_a.attach(pubsub)
+        await worker_b.attach(pubsub)
+        for worker in (worker_a, worker_b):
+            cache = worker.cache
+            page = _page(7, owner_id=3)
+            cache.set("a", b"{}", {}, (None, False, None), page, cache.generation)
+
+        worker_a.on_commit(Event(EventType.USER_UPDATED, {"user_id": 3}))
+        await asyncio.sleep(0)  # let the publish task run
+
+        assert len(worker_a.cache) == len(worker_b.cache) == 0
+        assert worker_a.cache.get_statistics()["invalidations"] == 1
+        await worker_a.detach()
+        await worker_b.detach()
+
+    async def test_missed_broadcast_is_caught_by_version_sync(
+        self, client, catalog, db_session
+    ):
+        await client.get("/api/books")
+        await table_versions.sync(db_session)
+        assert len(catalog_cache) == 1
+
+        # Another worker committed a write whose broadcasts never arrived
+        db_session.add(TableVersion(name="books", version=1))
+        await db_session.commit()
+        await table_versions.sync(db_session)
+
+        assert len(catalog_cache) == 0
+
+
+class TestCacheBookkeeping:
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = CatalogResponseCache(max_bytes=10, ttl=60)
+        filters = (None, False, None)
+        cache.set("a", b"aaaa", {}, filters, _page(1), cache.generation)
+        cache.set("b", b"bbbb", {}, filters, _page(2), cache.generation)
+        cache.get("a")
+        cache.set("c", b"cccc", {}, filters, _page(3), cache.generation)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.size_bytes == 8
+        assert cache.get_statistics()["evictions"] == 1
+
+    def test_fill_started_before_invalidation_is_dropped(self):
+        cache = CatalogResponseCache(max_bytes=1000, ttl=60)
+        generation = cache.generation
+
+        cache.invalidate_book(7, ("fiction", True, 1))
+        cache.set("a", b"{}", {}, (None, False, None), _page(7), generation)
+
+        assert len(cache) == 0
+        assert cache.get_statistics()["rejected_fills"] == 1
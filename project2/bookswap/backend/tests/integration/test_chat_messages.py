@@ -0,0 +1,196 @@
+"""
+Tests for batched chat message persistence.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.observer import EventType, event_manager
+from app.core.security import create_access_token
+from app.models import Book, BookGenre, Exchange, Message, User
+from app.services.message_buffer import MessageWriteBuffer
+
+
+@pytest.fixture
+async def exchange(db_session):
+    requester = User(email="a@bookswap.ua", username="alice", hashed_password="x")
+    owner = User(email="b@bookswap.ua", username="bob", hashed_password="x")
+    outsider = User(email="c@bookswap.ua", username="carol", hashed_password="x")
+    db_session.add_all([requester, owner, outsider])
+    await db_session.flush()
+    offered = Book(title="Dune", author="Herbert", genre=BookGenre.sci_fi, owner_id=requester.id)
+    requested = Book(title="Emma", author="Austen", genre=BookGenre.romance, owner_id=owner.id)
+    db_session.add_all([offered, requested])
+    await db_session.flush()
+    exchange = Exchange(
+        requester_id=requester.id,
+        owner_id=owner.id,
+        offered_book_id=offered.id,
+        requested_book_id=requested.id,
+    )
+    db_session.add(exchange)
+    await db_session.commit()
+    return {"exchange": exchange, "requester": requester, "outsider": outsider}
+
+
+@pytest.fixture
+async def buffer(session_factory):
+    buffer = MessageWriteBuffer(session_factory, batch_size=10, flush_interval_ms=20)
+    yield buffer
+    await buffer.stop()
+
+
+async def _count_messages(session_factory) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count(Message.id)))).scalar_one()
+
+
+class TestMessageWriteBuffer:
+    async def test_concurrent_messages_are_bulk_inserted(
+        self, buffer, exchange, session_factory, statements
+    ):
+        exchange_id = exchange["exchange"].id
+        sender_id = exchange["requester"].id
+
+        saved = await asyncio.gather(
+            *(buffer.submit(exchange_id, sender_id, f"msg {i}") for i in range(25))
+        )
+
+        assert [m["content"] for m in saved] == [f"msg {i}" for i in range(25)]
+        assert len({m["id"] for m in saved}) == 25
+        assert await _count_messages(session_factory) == 25
+        stats = buffer.get_statistics()
+        assert stats["messages"] == 25
+        assert stats["batches"] <= 4
+        assert stats["max_batch_size"] == 10
+        inserts = [s for s in statements if s.startswith("INSERT INTO messages")]
+        assert len(inserts) == stats["batches"]
+
+    async def test_ack_only_after_commit(self, buffer, exchange, session_factory):
+        saved = await buffer.submit(
+            exchange["exchange"].id, exchange["requester"].id, "привіт"
+        )
+
+        async with session_factory() as session:
+            message = await session.get(Message, saved["id"])
+        assert message.content == "привіт"
+        assert saved["created_at"] is not None
+        assert saved["is_read"] is False
+
+    async def test_failed_batch_is_reported_to_every_sender(self, exchange):
+        class BrokenSession:
+            async def __aenter__(self):
+                raise RuntimeError("database is down")
+
+            async def __aexit__(self, *exc):
+                return False
+
+        buffer = MessageWriteBuffer(BrokenSession, batch_size=10, flush_interval_ms=10)
+        results = await asyncio.gather(
+            *(buffer.submit(1, 1, "lost") for _ in range(3)), return_exceptions=True
+        )
+        await buffer.stop()
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert buffer.get_statistics()["failed_batches"] >= 1
+
+    async def test_bad_row_fails_only_its_sender(self, buffer, exchange, session_factory):
+        exchange_id = exchange["exchange"].id
+        sender_id = exchange["requester"].id
+
+        results = await asyncio.gather(
+            *(buffer.submit(exchange_id, sender_id, f"msg {i}") for i in range(4)),
+            buffer.submit(exchange_id, sender_id, None),
+            return_exceptions=True,
+        )
+
+        assert [r["content"] for r in results[:4]] == [f"msg {i}" for i in range(4)]
+        assert isinstance(results[4], Exception)
+        assert await _count_messages(session_factory) == 4
+        stats = buffer.get_statistics()
+        assert (stats["failed_batches"], stats["failed_messages"]) == (1, 1)
+        assert stats["messages"] == 4
+
+    async def test_slow_observers_do_not_stall_persistence(
+        self, buffer, exchange, monkeypatch
+    ):
+        async def blocked_notify(event):
+            await asyncio.Event().wait()
+
+        # A full event queue under the "block" overflow policy
+        monkeypatch.setattr(event_manager, "notify", blocked_notify)
+        for content in ("first", "second"):
+            saved = await asyncio.wait_for(
+                buffer.submit(exchange["exchange"].id, exchange["requester"].id, content),
+                1,
+            )
+            assert saved["content"] == content
+
+    async def test_restart_fails_messages_of_a_dead_writer(self, buffer, exchange):
+        buffer._ensure_running()
+        buffer._task.cancel()
+        await asyncio.gather(buffer._task, return_exceptions=True)
+        orphan = asyncio.get_running_loop().create_future()
+        buffer._queue.put_nowait(({"exchange_id": 1}, orphan))
+
+        await buffer.submit(exchange["exchange"].id, exchange["requester"].id, "hi")
+
+        with pytest.raises(RuntimeError):
+            await orphan
+
+    async def test_stop_flushes_pending_messages(self, exchange, session_factory):
+        buffer = MessageWriteBuffer(session_factory, batch_size=100, flush_interval_ms=10_000)
+        pending = asyncio.create_task(
+            buffer.submit(exchange["exchange"].id, exchange["requester"].id, "bye")
+        )
+        await asyncio.sleep(0.01)
+
+        await buffer.stop()
+
+        assert (await pending)["content"] == "bye"
+        assert await _count_messages(session_factory) == 1
+
+    async def test_events_are_emitted_after_commit(self, buffer, exchange):
+        event_manager.clear_history()
+
+        saved = await buffer.submit(
+            exchange["exchange"].id, exchange["requester"].id, "hello"
+        )
+
+        events = event_manager.get_event_history(EventType.MESSAGE_SENT)
+        assert events[-1].data["message_id"] == saved["id"]
+
+
+class TestChatEndpoint:
+    async def test_rest_messages_use_the_buffer(
+        self, client, buffer, exchange, monkeypatch
+    ):
+        monkeypatch.setattr("app.services.message_buffer", buffer)
+        token = create_access_token({"sub": str(exchange["requester"].id)})
+
+        response = await client.post(
+            f"/api/chat/{exchange['exchange'].id}",
+            json={"content": "Обміняємось?"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["sender"]["username"] == "alice"
+        assert buffer.get_statistics()["messages"] == 1
+
+    async def test_non_participant_is_rejected(
+        self, client, buffer, exchange, monkeypatch
+    ):
+        monkeypatch.setattr("app.services.message_buffer", buffer)
+        token = create_access_token({"sub": str(exchange["outsider"].id)})
+
+        response = await client.post(
+            f"/api/chat/{exchange['exchange'].id}",
+            json={"content": "hi"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 403
+        assert buffer.get_statistics()["messages"] == 0
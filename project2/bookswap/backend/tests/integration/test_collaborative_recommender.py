@@ -0,0 +1,181 @@
+"""
+Tests for the in-process item-item collaborative recommender.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.security import create_access_token
+from app.models import Book, BookGenre, Review, User, WishlistItem
+from app.services.collaborative import CollaborativeRecommender, build_neighbours
+
+
+@pytest.fixture
+async def library(db_session):
+    """Three readers with overlapping taste and one owner of every book."""
+    owner = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    readers = [
+        User(email=f"r{i}@bookswap.ua", username=f"reader{i}", hashed_password="x")
+        for i in range(3)
+    ]
+    db_session.add_all([owner, *readers])
+    await db_session.flush()
+
+    books = {
+        name: Book(title=name, author="Author", genre=genre, owner_id=owner.id)
+        for name, genre in [
+            ("Dune", BookGenre.sci_fi),
+            ("Foundation", BookGenre.sci_fi),
+            ("Hyperion", BookGenre.sci_fi),
+            ("Emma", BookGenre.romance),
+            ("Persuasion", BookGenre.romance),
+        ]
+    }
+    db_session.add_all(books.values())
+    await db_session.flush()
+
+    a, b, c = readers
+    db_session.add_all(
+        [
+            Review(user_id=a.id, book_id=books["Dune"].id, rating=5),
+            Review(user_id=a.id, book_id=books["Foundation"].id, rating=5),
+            Review(user_id=b.id, book_id=books["Dune"].id, rating=4),
+            Review(user_id=b.id, book_id=books["Foundation"].id, rating=5),
+            Review(user_id=b.id, book_id=books["Hyperion"].id, rating=4),
+            Review(user_id=c.id, book_id=books["Emma"].id, rating=5),
+            Review(user_id=c.id, book_id=books["Dune"].id, rating=1),
+            WishlistItem(user_id=c.id, book_id=books["Persuasion"].id),
+        ]
+    )
+    await db_session.commit()
+    return {"owner": owner, "readers": readers, "books": books}
+
+
+class TestBuildNeighbours:
+    def test_cosine_similarity_and_top_k(self):
+        interactions = {(1, 10): 1.0, (1, 20): 1.0, (2, 10): 1.0, (2, 30): 1.0}
+
+        neighbours = build_neighbours(interactions, top_k=1)
+
+        ids, scores = neighbours[10]
+        assert ids.tolist() in ([20], [30])
+        assert scores[0] == pytest.approx(1 / np.sqrt(2))
+        assert neighbours[20][0].tolist() == [10]
+        assert neighbours[20][1][0] == pytest.approx(1 / np.sqrt(2))
+
+    def test_empty_interactions(self):
+        assert build_neighbours({}, top_k=5) == {}
+
+
+class TestCollaborativeRecommender:
+    async def test_recommends_co_liked_catalog_books(self, db_session, library):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+        reader = library["readers"][0]
+
+        result = await recommender.recommend_for_user(db_session, reader.id, count=3)
+
+        assert [r["title"] for r in result] == ["Hyperion"]
+        assert result[0]["book_id"] == library["books"]["Hyperion"].id
+        assert result[0]["genre"] == "Наукова фантастика"
+        assert "Dune" in result[0]["reason"] or "Foundation" in result[0]["reason"]
+
+    async def test_low_ratings_are_not_a_signal(self, db_session, library):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+
+        dune = library["books"]["Dune"].id
+        neighbour_ids = recommender.neighbours[dune][0].tolist()
+        assert library["books"]["Emma"].id not in neighbour_ids
+
+    async def test_skips_unavailable_owned_and_filtered_books(
+        self, db_session, library
+    ):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+        reader = library["readers"][0]
+
+        library["books"]["Hyperion"].is_available_for_exchange = False
+        await db_session.commit()
+        assert await recommender.recommend_for_user(db_session, reader.id) == []
+
+        library["books"]["Hyperion"].is_available_for_exchange = True
+        await db_session.commit()
+        assert (
+            await recommender.recommend_for_user(
+                db_session, reader.id, genres=[BookGenre.romance]
+            )
+            == []
+        )
+
+    async def test_rebuilds_only_when_interactions_change(self, db_session, library):
+        recommender = CollaborativeRecommender(top_k=10)
+
+        assert await recommender.refresh(db_session) is True
+        assert await recommender.refresh(db_session) is False
+
+        reader = library["readers"][2]
+        db_session.add(
+            WishlistItem(user_id=reader.id, book_id=library["books"]["Hyperion"].id)
+        )
+        await db_session.commit()
+
+        assert await recommender.refresh(db_session) is True
+        assert recommender.get_statistics()["rebuilds"] == 2
+        assert recommender.get_statistics()["skipped_rebuilds"] == 1
+
+    async def test_new_rows_are_folded_in_incrementally(self, db_session, library):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+
+        books, (a, _, c) = library["books"], library["readers"]
+        db_session.add_all(
+            [
+                Review(user_id=c.id, book_id=books["Persuasion"].id, rating=5),
+                WishlistItem(user_id=a.id, book_id=books["Hyperion"].id),
+            ]
+        )
+        await db_session.commit()
+        assert await recommender.refresh(db_session) is True
+        assert recommender.incremental_loads == 1
+
+        full = CollaborativeRecommender(top_k=10)
+        await full.refresh(db_session)
+        assert recommender.neighbours.keys() == full.neighbours.keys()
+        for book_id, (ids, scores) in full.neighbours.items():
+            assert recommender.neighbours[book_id][0].tolist() == ids.tolist()
+            assert np.allclose(recommender.neighbours[book_id][1], scores)
+
+    async def test_deletes_force_a_full_reload(self, db_session, library):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+
+        review = await db_session.get(Review, 1)
+        await db_session.delete(review)
+        db_session.add(
+            Review(user_id=review.user_id, book_id=library["books"]["Emma"].id, rating=5)
+        )
+        await db_session.commit()
+
+        assert await recommender.refresh(db_session) is True
+        assert recommender.incremental_loads == 0
+        assert (review.user_id, review.book_id) not in recommender._interactions
+
+    async def test_endpoint_serves_local_recommendations(
+        self, client, db_session, library, monkeypatch
+    ):
+        recommender = CollaborativeRecommender(top_k=10)
+        await recommender.refresh(db_session)
+        monkeypatch.setattr(
+            "app.api.routes.collaborative_recommender", recommender
+        )
+        token = create_access_token({"sub": str(library["readers"][0].id)})
+
+        response = await client.get(
+            "/api/recommendations",
+            params={"genres": "Наукова фантастика"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        assert [r["title"] for r in response.json()] == ["Hyperion"]
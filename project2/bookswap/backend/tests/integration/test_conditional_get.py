@@ -0,0 +1,152 @@
+"""
+Tests for ETags and conditional GET on the catalog.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.pubsub import InMemoryPubSub
+from app.core.security import create_access_token
+from app.core.versions import TableVersions, mark_changed, table_versions
+from app.models import Book, BookGenre, User
+
+
+@pytest.fixture
+async def owner(db_session):
+    user = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    db_session.add(Book(title="Dune", author="Herbert", genre=BookGenre.sci_fi, owner_id=user.id))
+    await db_session.commit()
+    token = create_access_token({"sub": str(user.id)})
+    return {"user": user, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+class TestConditionalGet:
+    async def test_matching_etag_returns_304_without_queries(
+        self, client, owner, assert_max_queries
+    ):
+        first = await client.get("/api/books")
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "public, no-cache"
+
+        with assert_max_queries(0):
+            again = await client.get("/api/books", headers={"If-None-Match": etag})
+
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+
+    async def test_book_write_changes_the_etag(self, client, owner):
+        book_id = (await client.get("/api/books")).json()["items"][0]["id"]
+        detail = await client.get(f"/api/books/{book_id}")
+        etag = detail.headers["etag"]
+
+        response = await client.patch(
+            f"/api/books/{book_id}", json={"title": "Dune Messiah"}, headers=owner["headers"]
+        )
+        assert response.status_code == 200
+
+        fresh = await client.get(f"/api/books/{book_id}", headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.json()["title"] == "Dune Messiah"
+        assert fresh.headers["etag"] != etag
+
+    async def test_review_and_profile_writes_change_the_etag(self, client, owner):
+        etag = (await client.get("/api/books")).headers["etag"]
+        book_id = (await client.get("/api/books")).json()["items"][0]["id"]
+
+        await client.post(
+            "/api/reviews", json={"book_id": book_id, "rating": 5}, headers=owner["headers"]
+        )
+        after_review = (await client.get("/api/books")).headers["etag"]
+        await client.patch("/api/users/me", json={"city": "Одеса"}, headers=owner["headers"])
+        after_profile = (await client.get("/api/books")).headers["etag"]
+
+        assert len({etag, after_review, after_profile}) == 3
+
+    async def test_failed_write_does_not_bump(self, client, owner):
+        etag = (await client.get("/api/books")).headers["etag"]
+
+        response = await client.patch(
+            "/api/books/999", json={"title": "Nope"}, headers=owner["headers"]
+        )
+
+        assert response.status_code == 404
+        assert (await client.get("/api/books")).headers["etag"] == etag
+
+    async def test_fast_json_path_keeps_headers(self, client, owner, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "fast_json_responses", True)
+        response = await client.get("/api/books")
+
+        assert response.headers["etag"] == table_versions.etag("books", "reviews", "users")
+        assert response.headers["cache-control"] == "public, no-cache"
+
+
+class _LossyPubSub(InMemoryPubSub):
+    async def publish(self, channel: str, message: dict) -> bool:
+        return False
+
+
+class TestTableVersions:
+    async def test_commits_reach_other_workers_over_pubsub(self):
+        pubsub = InMemoryPubSub()
+        worker_a, worker_b = TableVersions(), TableVersions()
+        await worker_a.attach(pubsub)
+        await worker_b.attach(pubsub)
+
+        worker_a.update({"books": 3})
+        await asyncio.sleep(0)  # let the publish task run
+        worker_b.update({"books": 2})  # a late message never moves back
+        await asyncio.sleep(0)
+
+        assert worker_a.get("books") == worker_b.get("books") == 3
+        assert worker_a.etag("books", "users") == worker_b.etag("books", "users")
+        await worker_a.detach()
+        await worker_b.detach()
+
+    async def test_versions_are_read_from_the_shared_rows(
+        self, client, owner, db_session
+    ):
+        book_id = (await client.get("/api/books")).json()["items"][0]["id"]
+        await client.patch(
+            f"/api/books/{book_id}", json={"title": "Dune Messiah"}, headers=owner["headers"]
+        )
+        await client.patch("/api/users/me", json={"city": "Одеса"}, headers=owner["headers"])
+
+        other_worker = TableVersions()
+        await other_worker.sync(db_session)
+
+        assert table_versions.get("books") == table_versions.get("users") == 1
+        assert other_worker.etag("books", "reviews", "users") == table_versions.etag(
+            "books", "reviews", "users"
+        )
+
+    async def test_lost_broadcast_is_counted_and_caught_up_by_sync(
+        self, client, owner, db_session
+    ):
+        other_worker = TableVersions()
+        failures = table_versions.publish_failures
+        await table_versions.attach(_LossyPubSub())
+        try:
+            await client.patch("/api/users/me", json={"city": "Київ"}, headers=owner["headers"])
+            await asyncio.gather(*table_versions._publishing)
+        finally:
+            await table_versions.detach()
+
+        assert table_versions.publish_failures == failures + 1
+        assert other_worker.get("users") == 0
+        await other_worker.sync(db_session)
+        assert other_worker.get("users") == table_versions.get("users") == 1
+
+    async def test_unsupported_dialect_fails_clearly(self, engine, db_session, monkeypatch):
+        monkeypatch.setattr(engine.sync_engine.dialect, "name", "mysql")
+        mark_changed(db_session, "books")
+
+        with pytest.raises(NotImplementedError, match="not supported on mysql"):
+            await db_session.commit()
+        await db_session.rollback()
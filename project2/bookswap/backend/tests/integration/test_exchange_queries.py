@@ -0,0 +1,120 @@
+"""
+Tests for the projection-based exchange read path.
+"""
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models import Book, BookGenre, Exchange, ExchangeStatus, Review, User
+from app.repositories.book import BookRepository
+
+
+@pytest.fixture
+async def users_and_books(db_session):
+    alice = User(email="a@bookswap.ua", username="alice", hashed_password="secret-hash")
+    bob = User(email="b@bookswap.ua", username="bob", hashed_password="secret-hash", city="Львів")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    books = [
+        Book(title=f"Book {i}", author="Author", genre=BookGenre.fiction, owner_id=bob.id)
+        for i in range(5)
+    ]
+    offered = Book(title="Offer", author="Author", genre=BookGenre.poetry, owner_id=alice.id)
+    db_session.add_all([*books, offered])
+    await db_session.flush()
+    db_session.add(Review(book_id=books[0].id, user_id=alice.id, rating=4))
+    await db_session.flush()
+    await BookRepository(db_session).recalculate_rating_stats()
+    await db_session.commit()
+    return alice, bob, books, offered
+
+
+def _headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+class TestExchangeProjections:
+    async def test_my_exchanges_is_one_query(
+        self, client, db_session, users_and_books, assert_max_queries
+    ):
+        alice, bob, books, offered = users_and_books
+        db_session.add_all(
+            Exchange(
+                requester_id=alice.id,
+                owner_id=bob.id,
+                requested_book_id=book.id,
+                offered_book_id=offered.id,
+            )
+            for book in books
+        )
+        await db_session.commit()
+        headers = _headers(alice)
+        await client.get("/api/users/me", headers=headers)  # warm the auth cache
+
+        with assert_max_queries(1):
+            response = await client.get("/api/exchanges/my", headers=headers)
+
+        assert response.status_code == 200
+        exchanges = response.json()
+        assert len(exchanges) == 5
+        by_book = {e["requested_book"]["title"]: e for e in exchanges}
+        assert by_book["Book 0"]["requested_book"]["average_rating"] == 4.0
+        assert by_book["Book 1"]["offered_book"]["owner"]["username"] == "alice"
+        assert by_book["Book 1"]["requested_book"]["owner"]["city"] == "Львів"
+        assert by_book["Book 1"]["requester"]["username"] == "alice"
+        assert "secret-hash" not in response.text
+
+    async def test_create_and_update_return_full_response(
+        self, client, users_and_books
+    ):
+        alice, bob, books, offered = users_and_books
+
+        response = await client.post(
+            "/api/exchanges",
+            json={"requested_book_id": books[0].id, "offered_book_id": offered.id},
+            headers=_headers(alice),
+        )
+        assert response.status_code == 201
+        created = response.json()
+        assert created["status"] == ExchangeStatus.pending.value
+        assert created["owner"]["username"] == "bob"
+        assert created["offered_book"]["title"] == "Offer"
+
+        response = await client.patch(
+            f"/api/exchanges/{created['id']}/accept", headers=_headers(bob)
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == ExchangeStatus.accepted.value
+
+    async def test_pending_and_between_listings(
+        self, client, db_session, users_and_books
+    ):
+        alice, bob, books, offered = users_and_books
+        db_session.add_all(
+            [
+                Exchange(
+                    requester_id=alice.id,
+                    owner_id=bob.id,
+                    offered_book_id=offered.id,
+                    requested_book_id=books[0].id,
+                ),
+                Exchange(
+                    requester_id=alice.id,
+                    owner_id=bob.id,
+                    offered_book_id=offered.id,
+                    requested_book_id=books[1].id,
+                    status=ExchangeStatus.rejected,
+                ),
+            ]
+        )
+        await db_session.commit()
+
+        pending = (await client.get("/api/exchanges")).json()
+        between = (
+            await client.get(
+                "/api/exchanges/between", params={"user1": bob.id, "user2": alice.id}
+            )
+        ).json()
+
+        assert [e["requested_book"]["title"] for e in pending] == ["Book 0"]
+        assert {e["requested_book"]["title"] for e in between} == {"Book 0", "Book 1"}
@@ -0,0 +1,71 @@
+"""
+Tests for the opt-in TypeAdapter/orjson serialization path.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.serialization import FastJSONResponse, get_adapter
+from app.models import Book, BookGenre, Exchange, Message, User, WishlistItem
+from app.schemas import BookResponse
+
+
+@pytest.fixture
+async def catalog(db_session):
+    alice = User(email="a@bookswap.ua", username="alice", hashed_password="x")
+    bob = User(email="b@bookswap.ua", username="bob", hashed_password="x", city="Київ")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    books = [
+        Book(title=f"Книга {i}", author="Автор", genre=BookGenre.fiction, owner_id=bob.id)
+        for i in range(3)
+    ]
+    offered = Book(title="Offer", author="A", genre=BookGenre.poetry, owner_id=alice.id)
+    db_session.add_all([*books, offered])
+    await db_session.flush()
+    exchange = Exchange(
+        requester_id=alice.id,
+        owner_id=bob.id,
+        offered_book_id=offered.id,
+        requested_book_id=books[0].id,
+    )
+    db_session.add_all([exchange, WishlistItem(user_id=alice.id, book_id=books[1].id)])
+    await db_session.flush()
+    db_session.add(Message(exchange_id=exchange.id, sender_id=alice.id, content="Привіт"))
+    await db_session.commit()
+    token = create_access_token({"sub": str(alice.id)})
+    return {"exchange": exchange, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+class TestFastJsonResponses:
+    async def test_fast_path_matches_default_serialization(
+        self, client, catalog, monkeypatch
+    ):
+        headers = catalog["headers"]
+        urls = [
+            "/api/books",
+            "/api/books?cursor=",
+            "/api/exchanges",
+            "/api/exchanges/my",
+            "/api/wishlist",
+            f"/api/chat/{catalog['exchange'].id}",
+        ]
+
+        default = [(await client.get(url, headers=headers)).json() for url in urls]
+        monkeypatch.setattr(settings, "fast_json_responses", True)
+        fast = [await client.get(url, headers=headers) for url in urls]
+
+        assert all(r.status_code == 200 for r in fast)
+        assert all(r.headers["content-type"] == "application/json" for r in fast)
+        assert [r.json() for r in fast] == default
+        assert default[0]["items"] and default[3] and default[4] and default[5]
+
+    def test_response_class_passes_bytes_through(self):
+        assert FastJSONResponse(b'{"a":1}').body == b'{"a":1}'
+        assert FastJSONResponse({"мова": "uk", 1: True}).body == (
+            '{"мова":"uk","1":true}'.encode()
+        )
+
+    def test_adapters_are_built_once(self):
+        assert get_adapter(list[BookResponse]) is get_adapter(list[BookResponse])
@@ -0,0 +1,36 @@
+"""
+Tests for the /metrics endpoint.
+"""
+
+from app.core.observer import Event, EventType, event_manager
+
+
+class TestMetricsEndpoint:
+    async def test_requests_are_timed_by_route_template(self, client):
+        await client.get("/api/books/12345")
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'bookswap_http_request_duration_seconds_count'
+            '{method="GET",route="/api/books/{book_id}",status="404"}'
+        ) in response.text
+        assert "/api/books/12345" not in response.text
+
+    async def test_component_statistics_are_exported(self, client):
+        await event_manager.notify(Event(EventType.FRIEND_ADDED, {"user_id": 1}))
+
+        text = (await client.get("/metrics")).text
+
+        assert 'bookswap_events_total{type="friend_added"}' in text
+        for metric in (
+            "bookswap_db_pool_checkouts",
+            "bookswap_event_queue_queue_depth",
+            "bookswap_password_hasher_",
+            "bookswap_message_buffer_pending",
+            "bookswap_websocket_connections",
+            "bookswap_token_cache_hits",
+        ):
+            assert metric in text
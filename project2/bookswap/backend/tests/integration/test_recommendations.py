@@ -0,0 +1,224 @@
+"""
+Tests for RecommendationService against a local Gemini stub server.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.singleflight import SingleFlight
+from app.services.gemini import GeminiClient
+from app.services.recommendations import (
+    FALLBACK_DATA_FILE,
+    FallbackIndex,
+    RecommendationService,
+)
+
+RECOMMENDATIONS = [
+    {
+        "title": "Тигролови",
+        "author": "Іван Багряний",
+        "genre": "Пригоди",
+        "reason": "Захоплива історія втечі.",
+        "description": "Класика української прози.",
+    }
+]
+
+
+class GeminiStub(ThreadingHTTPServer):
+    """Minimal generateContent endpoint that records load."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), GeminiStubHandler)
+        self.delay = 0.0
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/generate"
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            length = int(self.headers["Content-Length"])
+            server.requests.append(json.loads(self.rfile.read(length)))
+            time.sleep(server.delay)
+            text = "```json\n" + json.dumps(RECOMMENDATIONS, ensure_ascii=False) + "\n```"
+            body = json.dumps(
+                {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = GeminiStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def make_service(stub):
+    clients = []
+
+    def factory(**client_kwargs):
+        client = GeminiClient(api_url=stub.url, api_key="test", **client_kwargs)
+        clients.append(client)
+        return RecommendationService(
+            client=client, cache=TTLCache(maxsize=16, ttl=60), flights=SingleFlight()
+        )
+
+    yield factory
+    for client in clients:
+        await client.aclose()
+
+
+class TestRecommendationService:
+    async def test_returns_parsed_recommendations(self, stub, make_service):
+        result = await make_service().get_recommendations(["Пригоди"], [], 1)
+
+        assert result == RECOMMENDATIONS
+        assert "Пригоди".lower() in stub.requests[0]["contents"][0]["parts"][0]["text"]
+
+    async def test_equivalent_requests_hit_the_cache(self, stub, make_service):
+        service = make_service()
+
+        await service.get_recommendations(["Фентезі", "Поезія"], ["Кобзар"], 3)
+        await service.get_recommendations([" поезія", "фентезі "], ["Кобзар"], 3)
+        await service.get_recommendations(["Фентезі"], ["Кобзар"], 3)
+
+        assert len(stub.requests) == 2
+
+    async def test_timeout_falls_back_without_blocking_the_loop(
+        self, stub, make_service
+    ):
+        stub.delay = 1.0
+        service = make_service(timeout=0.2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        result = await service.get_recommendations(["детектив"], [], 2)
+        elapsed = time.perf_counter() - started
+        ticker_task.cancel()
+
+        assert elapsed < 0.8
+        assert ticks >= 5
+        assert len(result) == 2
+        assert result[0]["genre"] == "Детектив"
+
+    async def test_concurrency_is_bounded(self, stub, make_service):
+        stub.delay = 0.1
+        service = make_service(max_concurrency=2)
+
+        await asyncio.gather(
+            *(service.get_recommendations([f"genre {i}"], [], 1) for i in range(6))
+        )
+
+        assert len(stub.requests) == 6
+        assert stub.max_in_flight <= 2
+
+    async def test_identical_concurrent_requests_are_coalesced(
+        self, stub, make_service
+    ):
+        stub.delay = 0.2
+        service = make_service()
+
+        results = await asyncio.gather(
+            *(service.get_recommendations(["Поезія"], ["Кобзар"], 3) for _ in range(10))
+        )
+
+        assert len(stub.requests) == 1
+        assert all(result == RECOMMENDATIONS for result in results)
+        assert service.flights.get_statistics() == {
+            "origin_calls": 1,
+            "coalesced_calls": 9,
+            "in_flight": 0,
+        }
+
+
+class TestFallbackIndex:
+    @pytest.fixture
+    def index(self):
+        return FallbackIndex.load(FALLBACK_DATA_FILE)
+
+    def test_lookup_by_label_word_and_enum_value(self, index):
+        assert index.lookup("Наукова фантастика") == ["фантастика"]
+        assert index.lookup("Фентезі") == ["фантастика"]
+        assert index.lookup("mystery") == ["детектив"]
+        assert index.lookup("Трилер") == []
+
+    def test_selection_is_deterministic_and_rotated(self, index):
+        first = index.select(["Детектив"], ["Кобзар"], 2)
+
+        assert first == index.select(["детектив "], ["Кобзар"], 2)
+        assert all(book["genre"] == "Детектив" for book in first)
+        rotations = {
+            index.select(["Детектив"], [f"Book {i}"], 1)[0]["title"] for i in range(20)
+        }
+        assert len(rotations) > 1
+
+    def test_fills_from_default_pool_without_duplicates(self, index):
+        result = index.select(["Поезія", "Трилер"], [], 5)
+
+        titles = [book["title"] for book in result]
+        assert len(titles) == len(set(titles)) == 5
+        assert sum(book["genre"] == "Поезія" for book in result) == 3
+
+    def test_extra_data_file_extends_pools(self, index, tmp_path):
+        extra = tmp_path / "extra.json"
+        extra.write_text(
+            json.dumps(
+                {
+                    "pools": [
+                        {
+                            "name": "трилер",
+                            "genres": ["thriller"],
+                            "books": [{"title": "Мовчання ягнят", "genre": "Трилер"}],
+                        }
+                    ]
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        extended = FallbackIndex.load(FALLBACK_DATA_FILE, str(extra))
+
+        assert extended.select(["Трилер"], [], 1)[0]["title"] == "Мовчання ягнят"
+        assert len(extended.default) == len(index.default)
@@ -0,0 +1,82 @@
+"""
+Tests for the denormalized rating stats maintained by ReviewService.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Book, BookGenre, User
+from app.schemas import ReviewCreate, ReviewUpdate
+from app.services import ReviewService
+
+
+@pytest.fixture
+async def book_and_readers(db_session):
+    owner = User(email="owner@bookswap.ua", username="owner", hashed_password="x")
+    readers = [
+        User(email=f"r{i}@bookswap.ua", username=f"reader{i}", hashed_password="x")
+        for i in range(2)
+    ]
+    db_session.add_all([owner, *readers])
+    await db_session.flush()
+    book = Book(title="Дюна", author="Френк Герберт", genre=BookGenre.sci_fi, owner_id=owner.id)
+    db_session.add(book)
+    await db_session.commit()
+    return book, readers
+
+
+async def _stats(db_session, book):
+    await db_session.refresh(book)
+    return book.rating_sum, book.review_count
+
+
+class TestReviewRatingStats:
+    async def test_create_update_delete_keep_stats_in_sync(
+        self, db_session, book_and_readers
+    ):
+        book, readers = book_and_readers
+        service = ReviewService(db_session)
+
+        first = await service.create_review(
+            ReviewCreate(book_id=book.id, rating=4), readers[0].id
+        )
+        await service.create_review(ReviewCreate(book_id=book.id, rating=5), readers[1].id)
+        assert await _stats(db_session, book) == (9, 2)
+        assert book.average_rating == 4.5
+
+        await service.update_review(first.id, ReviewUpdate(rating=1), readers[0].id)
+        assert await _stats(db_session, book) == (6, 2)
+
+        await service.update_review(first.id, ReviewUpdate(content="ok"), readers[0].id)
+        assert await _stats(db_session, book) == (6, 2)
+
+        await service.delete_review(first.id, readers[0].id)
+        assert await _stats(db_session, book) == (5, 1)
+
+    async def test_stats_use_atomic_increments(
+        self, db_session, book_and_readers, statements
+    ):
+        """Counters are bumped in SQL, not read-modified-written in Python."""
+        book, readers = book_and_readers
+
+        await ReviewService(db_session).create_review(
+            ReviewCreate(book_id=book.id, rating=3), readers[0].id
+        )
+
+        updates = [s for s in statements if s.startswith("UPDATE books")]
+        assert len(updates) == 1
+        assert "rating_sum=(books.rating_sum +" in updates[0]
+        assert "review_count=(books.review_count +" in updates[0]
+
+    async def test_failed_review_does_not_touch_stats(
+        self, db_session, book_and_readers
+    ):
+        book, readers = book_and_readers
+        service = ReviewService(db_session)
+        await service.create_review(ReviewCreate(book_id=book.id, rating=3), readers[0].id)
+
+        with pytest.raises(HTTPException):
+            await service.create_review(
+                ReviewCreate(book_id=book.id, rating=5), readers[0].id
+            )
+        assert await _stats(db_session, book) == (3, 1)
@@ -0,0 +1,52 @@
+"""
+Tests for per-request SQL counters and the slow-query log.
+"""
+
+from sqlalchemy import select, text
+
+from app.db.instrumentation import slow_query_log, track_queries
+from app.models import User
+
+
+class TestQueryTracking:
+    async def test_statements_are_counted_per_context(self, db_session):
+        with track_queries() as stats:
+            await db_session.execute(select(User))
+            await db_session.execute(select(User).where(User.id == 1))
+
+        await db_session.execute(select(User))
+
+        assert stats.count == 2
+        assert stats.duration > 0
+        assert stats.server_timing().endswith('desc="2 queries"')
+
+    async def test_failed_statement_does_not_break_timing(self, db_session):
+        try:
+            await db_session.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            await db_session.rollback()
+
+        with track_queries() as stats:
+            await db_session.execute(select(User))
+        assert stats.count == 1
+
+    async def test_slow_queries_are_logged_without_parameters(
+        self, db_session, monkeypatch
+    ):
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 1e-6)
+        monkeypatch.setattr(slow_query_log, "entries", [])
+
+        await db_session.execute(
+            select(User).where(User.email == "secret@bookswap.ua")
+        )
+
+        elapsed_ms, sql = slow_query_log.entries[-1]
+        assert elapsed_ms > 0
+        assert sql.startswith("SELECT users.id")
+        assert "\n" not in sql
+        assert "secret@bookswap.ua" not in sql
+
+    async def test_response_carries_server_timing(self, client):
+        response = await client.get("/api/books")
+
+        assert response.headers["server-timing"].startswith("db;dur=")
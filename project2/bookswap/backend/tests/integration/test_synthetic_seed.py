@@ -0,0 +1,134 @@
+"""
+Tests for the deterministic synthetic dataset generator.
+"""
+
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.seed import (
+    SYNTHETIC_PASSWORD,
+    SyntheticDataGenerator,
+    isbn13,
+    synthetic_email,
+)
+from app.models import (
+    Book,
+    Exchange,
+    Friendship,
+    Message,
+    Review,
+    User,
+    WishlistItem,
+)
+
+COUNTS = {"users": 30, "books": 300}
+
+
+async def _snapshot(db_session) -> dict:
+    queries = {
+        "users": select(User.id, User.email, User.full_name, User.city, User.created_at),
+        "books": select(
+            Book.id, Book.title, Book.author, Book.genre, Book.isbn, Book.owner_id,
+            Book.created_at, Book.rating_sum, Book.review_count,
+        ),
+        "reviews": select(Review.user_id, Review.book_id, Review.rating, Review.content),
+        "wishlist_items": select(WishlistItem.user_id, WishlistItem.book_id),
+        "exchanges": select(
+            Exchange.id, Exchange.requester_id, Exchange.owner_id,
+            Exchange.offered_book_id, Exchange.requested_book_id, Exchange.status,
+        ),
+        "messages": select(Message.exchange_id, Message.sender_id, Message.content),
+        "friendships": select(
+            Friendship.requester_id, Friendship.addressee_id, Friendship.status
+        ),
+    }
+    return {
+        table: (await db_session.execute(query.order_by(*query.selected_columns))).all()
+        for table, query in queries.items()
+    }
+
+
+async def _clear(db_session) -> None:
+    for model in (Message, Exchange, WishlistItem, Review, Friendship, Book, User):
+        await db_session.execute(model.__table__.delete())
+
+
+@pytest.fixture
+async def dataset(db_session):
+    counts = await SyntheticDataGenerator(seed=7).generate(db_session, **COUNTS)
+    await db_session.commit()
+    return counts
+
+
+class TestSyntheticDataGenerator:
+    async def test_counts(self, db_session, dataset):
+        assert dataset["users"] == 30
+        assert dataset["books"] == 300
+        for table in ("reviews", "wishlist_items", "exchanges", "messages", "friendships"):
+            assert dataset[table] > 0
+        snapshot = await _snapshot(db_session)
+        assert {table: len(rows) for table, rows in snapshot.items()} == dataset
+
+    async def test_same_seed_same_rows(self, db_session, dataset):
+        first = await _snapshot(db_session)
+        await _clear(db_session)
+        await SyntheticDataGenerator(seed=7).generate(db_session, **COUNTS)
+        assert await _snapshot(db_session) == first
+
+        await _clear(db_session)
+        await SyntheticDataGenerator(seed=8).generate(db_session, **COUNTS)
+        assert (await _snapshot(db_session))["books"] != first["books"]
+
+    async def test_rows_are_consistent(self, db_session, dataset):
+        data = await _snapshot(db_session)
+        owners = {book_id: owner_id for book_id, *_, owner_id, _, _, _ in data["books"]}
+        assert sorted(isbn for *_, isbn, _, _, _, _ in data["books"]) == [
+            isbn13(i) for i in range(300)
+        ]
+
+        pairs = [(user_id, book_id) for user_id, book_id, *_ in data["reviews"]]
+        assert len(set(pairs)) == len(pairs)
+        assert all(owners[book_id] != user_id for user_id, book_id in pairs)
+        assert all(1 <= rating <= 5 for _, _, rating, _ in data["reviews"])
+
+        participants = {}
+        for exchange_id, requester, owner, offered, requested, _ in data["exchanges"]:
+            assert requester != owner
+            assert owners[offered] == requester
+            assert owners[requested] == owner
+            participants[exchange_id] = {requester, owner}
+        assert all(
+            sender_id in participants[exchange_id]
+            for exchange_id, sender_id, _ in data["messages"]
+        )
+
+        friends = [frozenset(pair) for *pair, _ in data["friendships"]]
+        assert len(set(friends)) == len(friends)
+        assert all(len(pair) == 2 for pair in friends)
+
+    async def test_rating_stats_match_reviews(self, db_session, dataset):
+        result = await db_session.execute(
+            select(Review.book_id, func.sum(Review.rating), func.count())
+            .group_by(Review.book_id)
+        )
+        expected = {book_id: (total, count) for book_id, total, count in result}
+        books = await db_session.execute(
+            select(Book.id, Book.rating_sum, Book.review_count)
+        )
+        for book_id, rating_sum, review_count in books:
+            assert (rating_sum, review_count) == expected.get(book_id, (0, 0))
+
+    async def test_activity_is_skewed(self, db_session, dataset):
+        books = (await _snapshot(db_session))["books"]
+        owners = Counter(owner_id for *_, owner_id, _, _, _ in books)
+        # The busiest owner holds far more than an even share of the shelf
+        assert owners.most_common(1)[0][1] > 3 * 300 / 30
+
+    async def test_users_can_log_in(self, client, dataset):
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": synthetic_email(3), "password": SYNTHETIC_PASSWORD},
+        )
+        assert response.status_code == 200
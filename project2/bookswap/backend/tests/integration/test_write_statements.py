@@ -0,0 +1,163 @@
+"""
+Statement-count tests for write endpoints: server defaults come back through
+INSERT/UPDATE ... RETURNING, never through a follow-up SELECT. Catalog writes
+also bump their ``table_versions`` rows with one upsert before the commit.
+"""
+
+import pytest
+
+from app.core.security import create_access_token
+from app.models import Book, BookGenre, User
+
+
+@pytest.fixture
+async def alice_and_bob(db_session):
+    alice = User(email="a@bookswap.ua", username="alice", hashed_password="x")
+    bob = User(email="b@bookswap.ua", username="bob", hashed_password="x")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    alice_book = Book(title="Poems", author="Author", genre=BookGenre.poetry, owner_id=alice.id)
+    bob_book = Book(title="Novel", author="Author", genre=BookGenre.fiction, owner_id=bob.id)
+    db_session.add_all([alice_book, bob_book])
+    await db_session.commit()
+    return alice, bob, alice_book, bob_book
+
+
+@pytest.fixture
+async def headers(client, alice_and_bob):
+    """Auth headers with the user cache warm, so counts cover only the write."""
+    alice, bob = alice_and_bob[:2]
+    result = []
+    for user in (alice, bob):
+        token = create_access_token({"sub": str(user.id)})
+        result.append({"Authorization": f"Bearer {token}"})
+        await client.get("/api/users/me", headers=result[-1])
+    return result
+
+
+def _no_select_after_write(executed: list[str]) -> None:
+    writes = [i for i, sql in enumerate(executed) if not sql.startswith("SELECT")]
+    assert writes, executed
+    assert all(not sql.startswith("SELECT") for sql in executed[writes[0]:]), executed
+
+
+class TestWriteStatements:
+    async def test_register_inserts_with_returning(
+        self, client, statements, assert_max_queries
+    ):
+        start = len(statements)
+        with assert_max_queries(3):
+            response = await client.post("/api/auth/register", json={
+                "email": "c@bookswap.ua", "username": "carol", "password": "password123",
+            })
+        assert response.status_code == 201
+        executed = statements[start:]
+        assert "RETURNING" in executed[-1]
+        _no_select_after_write(executed)
+
+    async def test_update_profile_is_one_update(
+        self, client, statements, headers, assert_max_queries
+    ):
+        start = len(statements)
+        with assert_max_queries(2):
+            response = await client.patch(
+                "/api/users/me", json={"city": "Львів"}, headers=headers[0]
+            )
+        assert response.status_code == 200
+        assert response.json()["city"] == "Львів"
+        assert statements[start].startswith("UPDATE users")
+        assert statements[start + 1].startswith("INSERT INTO table_versions")
+
+    async def test_create_and_update_book(
+        self, client, statements, headers, alice_and_bob, assert_max_queries
+    ):
+        with assert_max_queries(2):
+            response = await client.post("/api/books", json={
+                "title": "Кобзар", "author": "Тарас Шевченко", "genre": "poetry",
+            }, headers=headers[0])
+        assert response.status_code == 201
+        body = response.json()
+        assert body["owner"]["username"] == "alice"
+        assert body["created_at"]
+
+        start = len(statements)
+        with assert_max_queries(3):
+            response = await client.patch(
+                f"/api/books/{body['id']}", json={"description": "Збірка"},
+                headers=headers[0],
+            )
+        assert response.json()["description"] == "Збірка"
+        _no_select_after_write(statements[start:])
+
+    async def test_review_writes_return_timestamps(
+        self, client, statements, headers, alice_and_bob, assert_max_queries
+    ):
+        alice_book = alice_and_bob[2]
+        with assert_max_queries(5):
+            response = await client.post(
+                "/api/reviews", json={"book_id": alice_book.id, "rating": 4},
+                headers=headers[1],
+            )
+        assert response.status_code == 201
+        review = response.json()
+        assert review["created_at"] and review["updated_at"] is None
+        assert review["user"]["username"] == "bob"
+
+        start = len(statements)
+        with assert_max_queries(4):
+            response = await client.patch(
+                f"/api/reviews/{review['id']}", json={"rating": 5}, headers=headers[1]
+            )
+        assert response.json()["updated_at"] is not None
+        assert any(
+            sql.startswith("UPDATE reviews") and "RETURNING" in sql
+            for sql in statements[start:]
+        )
+        _no_select_after_write(statements[start:])
+
+    async def test_exchange_writes(
+        self, client, headers, alice_and_bob, assert_max_queries
+    ):
+        _, _, alice_book, bob_book = alice_and_bob
+        with assert_max_queries(4):
+            response = await client.post("/api/exchanges", json={
+                "requested_book_id": alice_book.id, "offered_book_id": bob_book.id,
+            }, headers=headers[1])
+        assert response.status_code == 201
+        exchange_id = response.json()["id"]
+
+        with assert_max_queries(3):
+            response = await client.patch(
+                f"/api/exchanges/{exchange_id}/accept", headers=headers[0]
+            )
+        assert response.json()["status"] == "accepted"
+        assert response.json()["updated_at"] is not None
+
+    async def test_add_to_wishlist_loads_only_the_book(
+        self, client, statements, headers, alice_and_bob, assert_max_queries
+    ):
+        alice_book = alice_and_bob[2]
+        start = len(statements)
+        with assert_max_queries(3):
+            response = await client.post(
+                f"/api/wishlist/{alice_book.id}", headers=headers[1]
+            )
+        assert response.status_code == 201
+        body = response.json()
+        assert body["added_at"]
+        assert body["book"]["id"] == alice_book.id
+        assert body["book"]["owner"]["username"] == "alice"
+        # The wishlist itself is never re-read
+        assert not any("ORDER BY wishlist_items" in sql for sql in statements[start:])
+
+    async def test_add_missing_book_to_wishlist(self, client, headers):
+        response = await client.post("/api/wishlist/999", headers=headers[1])
+        assert response.status_code == 404
+
+    async def test_add_friend_is_check_plus_insert(
+        self, client, headers, alice_and_bob, assert_max_queries
+    ):
+        alice = alice_and_bob[0]
+        with assert_max_queries(2):
+            response = await client.post(f"/api/friends/{alice.id}", headers=headers[1])
+        assert response.status_code == 201
@@ -0,0 +1,280 @@
+"""
+Tests for WebSocket rooms with per-connection send queues.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.connections import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+from app.core.pubsub import InMemoryPubSub, PostgresPubSub
+
+
+class FakeWebSocket:
+    """Records what the server sends; ``delay`` simulates a slow client."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[dict] = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message: dict):
+        await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+@pytest.fixture
+async def make_manager():
+    managers = []
+
+    def factory(queue_size: int = 8, pubsub=None) -> ConnectionManager:
+        manager = ConnectionManager(queue_size=queue_size, pubsub=pubsub)
+        managers.append(manager)
+        return manager
+
+    yield factory
+    for manager in managers:
+        await manager.close_all()
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestConnectionManager:
+    async def test_broadcast_skips_sender(self, make_manager):
+        manager = make_manager(8)
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alice, 1)
+        await manager.connect(bob, 1)
+
+        await manager.broadcast(1, {"content": "hi"}, exclude=alice)
+        await _drain()
+
+        assert alice.sent == []
+        assert bob.sent == [{"content": "hi"}]
+
+    async def test_disconnect_removes_socket_and_empty_room(self, make_manager):
+        manager = make_manager(8)
+        ws = FakeWebSocket()
+        await manager.connect(ws, 1)
+
+        manager.disconnect(ws, 1)
+        manager.disconnect(ws, 1)  # idempotent
+
+        assert manager.active == {}
+        assert manager.get_statistics()["connections"] == 0
+
+    async def test_slow_client_does_not_delay_the_room(self, make_manager):
+        manager = make_manager(4)
+        slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+        await manager.connect(slow, 1)
+        await manager.connect(fast, 1)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(3):
+            await manager.broadcast(1, {"n": i})
+        await _drain()
+
+        assert loop.time() - started < 0.5
+        assert [m["n"] for m in fast.sent] == [0, 1, 2]
+
+    async def test_slow_consumer_is_dropped_when_its_queue_is_full(self, make_manager):
+        manager = make_manager(2)
+        slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+        await manager.connect(slow, 1)
+        await manager.connect(fast, 1)
+
+        for i in range(5):
+            await manager.broadcast(1, {"n": i})
+            await _drain()
+
+        stats = manager.get_statistics()
+        assert slow not in manager.active[1]
+        assert slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+        assert len(fast.sent) == 5
+        assert stats["slow_consumers_dropped"] == 1
+        assert stats["messages_dropped"] == 1
+        assert stats["connections"] == 1
+
+    async def test_statistics_report_room_sizes(self, make_manager):
+        manager = make_manager(8)
+        for room, count in ((1, 3), (2, 1)):
+            for _ in range(count):
+                await manager.connect(FakeWebSocket(), room)
+
+        stats = manager.get_statistics()
+
+        assert stats["rooms"] == 2
+        assert stats["connections"] == 4
+        assert stats["max_room_size"] == 3
+
+
+class FakeNotifyBroker:
+    """Local stand-in for PostgreSQL LISTEN/NOTIFY shared by fake connections."""
+
+    def __init__(self):
+        self.connections: list["FakeNotifyConnection"] = []
+
+    async def connect(self) -> "FakeNotifyConnection":
+        connection = FakeNotifyConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+class FakeNotifyConnection:
+    """
+    Implements the slice of asyncpg.Connection used by PostgresPubSub,
+    including its refusal to run two operations at once.
+    """
+
+    def __init__(self, broker: FakeNotifyBroker):
+        self.broker = broker
+        self.listeners: dict[str, set] = {}
+        self.closed = False
+        self.fail = False
+        self._busy = False
+
+    async def _operation(self):
+        if self._busy:
+            raise RuntimeError("another operation is in progress")
+        self._busy = True
+        try:
+            # Round trip to the server
+            await asyncio.sleep(0)
+        finally:
+            self._busy = False
+
+    async def add_listener(self, channel, callback):
+        await self._operation()
+        self.listeners.setdefault(channel, set()).add(callback)
+
+    async def remove_listener(self, channel, callback):
+        await self._operation()
+        self.listeners.get(channel, set()).discard(callback)
+        if not self.listeners.get(channel):
+            self.listeners.pop(channel, None)
+
+    async def execute(self, query, channel, payload):
+        assert query == "SELECT pg_notify($1, $2)"
+        await self._operation()
+        if self.fail:
+            self.closed = True
+            raise ConnectionError("connection was closed in the middle of operation")
+        # NOTIFY reaches every listening session, including the sender's own
+        for connection in self.broker.connections:
+            if connection.closed:
+                continue
+            for callback in list(connection.listeners.get(channel, ())):
+                callback(connection, 1, channel, payload)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        await self._operation()
+        self.closed = True
+
+
+class TestPubSubBroadcast:
+    async def test_broadcast_reaches_other_workers(self, make_manager):
+        bus = InMemoryPubSub()
+        worker_a = make_manager(pubsub=bus)
+        worker_b = make_manager(pubsub=bus)
+        sender, local_peer, remote_peer = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(sender, 1)
+        await worker_a.connect(local_peer, 1)
+        await worker_b.connect(remote_peer, 1)
+
+        await worker_a.broadcast(1, {"content": "hi"}, exclude=sender)
+        await _drain()
+
+        assert sender.sent == []
+        assert local_peer.sent == [{"content": "hi"}]
+        assert remote_peer.sent == [{"content": "hi"}]
+
+    async def test_workers_subscribe_only_to_local_rooms(self, make_manager):
+        bus = InMemoryPubSub()
+        manager = make_manager(pubsub=bus)
+        ws = FakeWebSocket()
+
+        await manager.connect(ws, 7)
+        assert set(bus._handlers) == {"chat_exchange_7"}
+
+        manager.disconnect(ws, 7)
+        await _drain()
+        assert bus._handlers == {}
+        assert manager.get_statistics()["subscriptions"] == 0
+
+    async def test_postgres_bus_over_listen_notify(self, make_manager):
+        broker = FakeNotifyBroker()
+        worker_a = make_manager(pubsub=PostgresPubSub(broker.connect))
+        worker_b = make_manager(pubsub=PostgresPubSub(broker.connect))
+        sender, peer = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(sender, 3)
+        await worker_b.connect(peer, 3)
+
+        await worker_a.broadcast(3, {"content": "привіт"}, exclude=sender)
+        await _drain()
+
+        assert peer.sent == [{"content": "привіт"}]
+        assert sender.sent == []
+        assert [list(c.listeners) for c in broker.connections] == [
+            ["chat_exchange_3"],
+            ["chat_exchange_3"],
+        ]
+
+        worker_b.disconnect(peer, 3)
+        await _drain()
+        assert broker.connections[1].listeners == {}
+
+        await worker_a.pubsub.close()
+        assert broker.connections[0].closed
+
+    async def test_postgres_bus_serializes_connection_calls(self, make_manager):
+        broker = FakeNotifyBroker()
+        bus = PostgresPubSub(broker.connect)
+        worker = make_manager(pubsub=bus)
+        peers = [FakeWebSocket() for _ in range(3)]
+        await asyncio.gather(
+            *(worker.connect(peer, room) for room, peer in enumerate(peers))
+        )
+
+        await asyncio.gather(
+            *(worker.broadcast(room, {"n": n}) for n in range(5) for room in range(3))
+        )
+        await _drain()
+
+        assert [len(peer.sent) for peer in peers] == [5, 5, 5]
+        assert bus.get_statistics()["publish_errors"] == 0
+        assert len(broker.connections) == 1
+
+    async def test_failed_publish_falls_back_to_local_delivery(self, make_manager):
+        broker = FakeNotifyBroker()
+        bus = PostgresPubSub(broker.connect)
+        worker = make_manager(pubsub=bus)
+        sender, peer = FakeWebSocket(), FakeWebSocket()
+        await worker.connect(sender, 4)
+        await worker.connect(peer, 4)
+        broker.connections[0].fail = True
+
+        await worker.broadcast(4, {"content": "hi"}, exclude=sender)
+        await _drain()
+
+        assert peer.sent == [{"content": "hi"}]
+        assert sender.sent == []
+        assert bus.publish_errors == 1
+
+        # The dead connection is replaced and the room is listened to again
+        await worker.broadcast(4, {"content": "again"}, exclude=sender)
+        await _drain()
+        assert peer.sent == [{"content": "hi"}, {"content": "again"}]
+        assert list(broker.connections[1].listeners) == ["chat_exchange_4"]
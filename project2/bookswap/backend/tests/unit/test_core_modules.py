@@ -133,6 +133,109 @@ class TestObserverPattern:
         assert event_manager is not manager  # Different instances but both EventManager
 
 
+class TestQueuedEventManager:
+    """Test queue-backed event dispatch."""
+
+    @staticmethod
+    def _observer(delay: float = 0.0, fail: bool = False):
+        import asyncio
+        from app.core.observer import Observer
+
+        class RecordingObserver(Observer):
+            def __init__(self):
+                self.seen = []
+
+            async def update(self, event):
+                await asyncio.sleep(delay)
+                if fail:
+                    raise RuntimeError("observer failed")
+                self.seen.append(event)
+
+        return RecordingObserver()
+
+    async def test_notify_returns_before_slow_observer(self):
+        """Test that notify only enqueues once the manager is started."""
+        from app.core.observer import Event, EventType
+
+        manager = EventManager()
+        observer = self._observer(delay=0.05)
+        manager.attach(observer)
+        await manager.start(workers=2, queue_size=10, observer_timeout=1)
+
+        await manager.notify(Event(EventType.BOOK_CREATED, {"book_id": 1}))
+        assert observer.seen == []
+
+        await manager.stop(timeout=1)
+        assert len(observer.seen) == 1
+        assert manager.get_queue_statistics()["dispatched"] == 1
+        assert manager.get_queue_statistics()["mode"] == "inline"
+
+    async def test_slow_and_failing_observers_are_isolated(self):
+        """Test that timeouts and errors are counted without affecting others."""
+        from app.core.observer import Event, EventType
+
+        manager = EventManager()
+        healthy = self._observer()
+        manager.attach(self._observer(delay=1))
+        manager.attach(self._observer(fail=True))
+        manager.attach(healthy)
+        await manager.start(workers=1, queue_size=10, observer_timeout=0.02)
+
+        await manager.notify(Event(EventType.MESSAGE_SENT, {"message_id": 1}))
+        await manager.stop(timeout=1)
+
+        stats = manager.get_queue_statistics()
+        assert len(healthy.seen) == 1
+        assert stats["observer_timeouts"] == 1
+        assert stats["observer_errors"] == 1
+
+    async def test_drop_policy_discards_overflow(self):
+        """Test that a full queue drops events under the drop policy."""
+        from app.core.observer import Event, EventType
+
+        manager = EventManager()
+        observer = self._observer(delay=0.05)
+        manager.attach(observer)
+        await manager.start(
+            workers=1, queue_size=2, observer_timeout=1, overflow_policy="drop"
+        )
+
+        for i in range(6):
+            await manager.notify(Event(EventType.BOOK_CREATED, {"book_id": i}))
+        await manager.stop(timeout=1)
+
+        stats = manager.get_queue_statistics()
+        assert stats["dropped"] > 0
+        assert stats["dropped"] + stats["dispatched"] == 6
+        assert len(manager.get_event_history()) == 6
+
+    async def test_block_policy_applies_backpressure(self):
+        """Test that a full queue makes notify wait under the block policy."""
+        from app.core.observer import Event, EventType
+
+        manager = EventManager()
+        observer = self._observer(delay=0.01)
+        manager.attach(observer)
+        await manager.start(
+            workers=1, queue_size=1, observer_timeout=1, overflow_policy="block"
+        )
+
+        for i in range(5):
+            await manager.notify(Event(EventType.BOOK_CREATED, {"book_id": i}))
+        await manager.stop(timeout=1)
+
+        assert [e.data["book_id"] for e in observer.seen] == list(range(5))
+        assert manager.get_queue_statistics()["dropped"] == 0
+
+    async def test_unknown_overflow_policy_is_rejected(self):
+        """Test that start validates the overflow policy."""
+        import pytest
+
+        manager = EventManager()
+        with pytest.raises(ValueError):
+            await manager.start(overflow_policy="spill")
+
+
 # === Security Tests ===
 
 
@@ -185,6 +288,152 @@ class TestSecurity:
         assert result is None
 
 
+# === Password Hasher Tests ===
+
+
+class TestPasswordHasher:
+    """Test the bounded bcrypt executor."""
+
+    async def test_hashing_does_not_block_the_event_loop(self):
+        """Test that the loop keeps running while bcrypt works in a thread."""
+        import asyncio
+        from passlib.hash import bcrypt
+        from app.core.security import PasswordHasher
+
+        hasher = PasswordHasher(max_workers=2, max_pending=4)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        hashed = await hasher.run(bcrypt.using(rounds=10).hash, "secret")
+        ticker_task.cancel()
+        hasher.shutdown()
+
+        assert ticks >= 3
+        assert bcrypt.verify("secret", hashed)
+
+    async def test_rejects_calls_beyond_max_pending(self):
+        """Test that overflow is rejected and reflected in the statistics."""
+        import asyncio
+        import time
+        from app.core.security import PasswordHasher, PasswordHasherBusy
+
+        hasher = PasswordHasher(max_workers=1, max_pending=2)
+
+        results = await asyncio.gather(
+            *(hasher.run(time.sleep, 0.05) for _ in range(3)), return_exceptions=True
+        )
+        stats = hasher.get_statistics()
+        hasher.shutdown()
+
+        assert sum(isinstance(r, PasswordHasherBusy) for r in results) == 1
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["max_queue_depth"] == 1
+        assert stats["pending"] == 0
+
+
+# === Cache Tests ===
+
+
+class TestTTLCache:
+    """Test the in-process TTL + LRU cache."""
+
+    def test_get_and_set(self):
+        """Test that stored values are returned and counted as hits."""
+        from app.core.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("missing", "default") == "default"
+        assert cache.get_statistics()["hits"] == 1
+        assert cache.get_statistics()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        from app.core.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_expiry(self):
+        """Test that expired entries are treated as misses."""
+        from app.core.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+# === Single-flight Tests ===
+
+
+class TestSingleFlight:
+    """Test request coalescing."""
+
+    async def test_concurrent_calls_share_one_origin(self):
+        """Test that concurrent callers with one key await the same call."""
+        import asyncio
+        from app.core.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+
+        assert results == [1] * 5
+        assert flights.origin_calls == 1
+        assert flights.coalesced_calls == 4
+        assert flights.in_flight == 0
+
+    async def test_errors_propagate_and_are_not_remembered(self):
+        """Test that a failed call reaches every waiter and is retried later."""
+        import asyncio
+        import pytest
+        from app.core.singleflight import SingleFlight
+
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        async def succeed():
+            return "ok"
+
+        results = await asyncio.gather(
+            flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        with pytest.raises(RuntimeError):
+            await flights.do("other", fail)
+        assert await flights.do("key", succeed) == "ok"
+        assert flights.origin_calls == 3
+
+
 # === Dependencies Tests ===
 
 
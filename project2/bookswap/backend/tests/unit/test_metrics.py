@@ -0,0 +1,85 @@
+"""
+Unit tests for the metrics registry and histograms.
+"""
+
+import threading
+
+from app.core.metrics import Histogram, MetricsRegistry, flatten_statistics
+
+
+class TestHistogram:
+    def test_observations_land_in_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        buckets, count, total = histogram.snapshot()
+        assert buckets == [2, 1, 1]
+        assert count == 4
+        assert total == 3.65
+
+    def test_threads_write_separate_shards(self):
+        histogram = Histogram(buckets=(1.0,))
+
+        def work():
+            for _ in range(1000):
+                histogram.observe(0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        buckets, count, _ = histogram.snapshot()
+        assert count == 4000
+        assert buckets == [4000, 0]
+        # Idents of finished threads may be reused, never shared by live ones
+        assert 1 <= len(histogram._shards) <= 4
+
+
+class TestMetricsRegistry:
+    def test_render_histogram_is_cumulative(self):
+        registry = MetricsRegistry(namespace="test")
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), (0.1, 1.0))
+        latency.labels("/books").observe(0.05)
+        latency.labels("/books").observe(0.5)
+
+        text = registry.render()
+
+        assert "# TYPE test_latency_seconds histogram" in text
+        assert 'test_latency_seconds_bucket{route="/books",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{route="/books",le="1.0"} 2' in text
+        assert 'test_latency_seconds_bucket{route="/books",le="+Inf"} 2' in text
+        assert 'test_latency_seconds_count{route="/books"} 2' in text
+
+    def test_statistics_are_flattened_into_gauges(self):
+        registry = MetricsRegistry(namespace="test")
+        registry.register_statistics(
+            "buffer", lambda: {"pending": 3, "mode": "queued", "pool": {"size": 2}}
+        )
+
+        text = registry.render()
+
+        assert "# TYPE test_buffer_pending gauge" in text
+        assert "test_buffer_pending 3" in text
+        assert "test_buffer_pool_size 2" in text
+        assert "mode" not in text
+
+    def test_failing_collector_is_skipped(self):
+        registry = MetricsRegistry(namespace="test")
+        registry.register("broken", "gauge", "Broken", lambda: 1 / 0)
+        registry.register("ok", "counter", "Ok", lambda: [("", {"kind": "a"}, 1)])
+
+        text = registry.render()
+
+        assert 'test_ok{kind="a"} 1' in text
+        assert "test_broken" not in text
+
+    def test_flatten_statistics(self):
+        assert flatten_statistics({"a": 1, "b": {"c": 2.5, "d": "x"}, "e": True}) == {
+            "a": 1,
+            "b_c": 2.5,
+            "e": 1,
+        }
@@ -189,7 +189,7 @@ class TestObserverPattern:
         # Both observers should have been notified
         assert len(manager._event_history) == 1
 
-    def test_event_manager_history_filtering(self):
+    async def test_event_manager_history_filtering(self):
         """Test EventManager event history filtering."""
         manager = EventManager()
 
@@ -198,7 +198,8 @@ class TestObserverPattern:
         event2 = Event(EventType.BOOK_CREATED, {"book_id": 1})
         event3 = Event(EventType.USER_REGISTERED, {"user_id": 2})
 
-        manager._event_history = [event1, event2, event3]
+        for event in (event1, event2, event3):
+            await manager.notify(event)
 
         # Filter by event type
         user_events = manager.get_event_history(EventType.USER_REGISTERED)
@@ -210,6 +211,30 @@ class TestObserverPattern:
         assert len(limited_events) == 2
         assert limited_events == [event2, event3]
 
+        # Type filter and limit combine, newest last
+        assert manager.get_event_history(EventType.USER_REGISTERED, limit=1) == [event3]
+        assert manager.get_event_history(EventType.FRIEND_ADDED) == []
+
+    async def test_event_manager_history_ring_buffers(self):
+        """Test that history is capped globally and per event type."""
+        manager = EventManager(max_history=5)
+        manager.set_history_capacity(EventType.MESSAGE_SENT, 2)
+
+        for i in range(4):
+            await manager.notify(Event(EventType.MESSAGE_SENT, {"message_id": i}))
+        for i in range(4):
+            await manager.notify(Event(EventType.BOOK_CREATED, {"book_id": i}))
+
+        messages = manager.get_event_history(EventType.MESSAGE_SENT, limit=0)
+        assert [e.data["message_id"] for e in messages] == [2, 3]
+        books = manager.get_event_history(EventType.BOOK_CREATED)
+        assert [e.data["book_id"] for e in books] == [0, 1, 2, 3]
+        assert len(manager.get_event_history(limit=0)) == 5
+
+        manager.clear_history()
+        assert manager.get_event_history() == []
+        assert manager.get_event_history(EventType.BOOK_CREATED) == []
+
     def test_logging_observer(self):
         """Test LoggingObserver functionality."""
         observer = LoggingObserver()